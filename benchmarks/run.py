@@ -0,0 +1,218 @@
+"""
+Offline benchmark suite.
+
+For each catalog size it writes synthetic recipes / prices / wallet CSVs and
+times:
+- load_recipes_db               (CSV -> RecipeStore)
+- compile_catalog / load_catalog (write / memory-map the compiled catalog)
+- search_recipes                (search node, per query)
+- price_index_build / get_best_ingredient_prices (per basket)
+- wallet_import / wallet_ops    (authenticate + balance + deduct)
+- graph_invoke                  (full graph, deterministic StubLLM, per message)
+
+Usage (from the repository root):
+    python -m benchmarks.run --sizes 10000 100000 1000000
+    python -m benchmarks.run --sizes 10000 --update-baseline
+
+Results are printed (and written with --output) as JSON. When a baseline
+file exists, every metric is compared against it and the run exits non-zero
+if any is slower by more than --tolerance. Baselines are machine specific:
+regenerate them with --update-baseline on the machine that runs the check.
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import numpy as np
+from langchain_core.messages import HumanMessage
+
+from src.recipe_agent import graph as graph_mod
+from src.recipe_agent.data import recipes_db
+from src.recipe_agent.data.artifact import artifact_dir, compile_catalog, load_catalog
+from src.recipe_agent.data.manager import DataManager
+from src.recipe_agent.data.prices import PriceIndex
+from src.recipe_agent.data.wallet import WalletStore
+from src.recipe_agent.graph import build_recipe_graph
+from src.recipe_agent.lazy import Lazy
+from src.recipe_agent.nodes.search_recipes import search_recipes_factory
+
+from .stub_llm import StubLLM
+from .synthetic import DIETARY, ingredient_vocab, write_datasets
+
+BASELINE = Path(__file__).resolve().parent / "baseline.json"
+DEFAULT_SIZES = (10_000, 100_000, 1_000_000)
+# below this many milliseconds, differences are treated as timer noise
+NOISE_FLOOR_MS = 0.05
+
+
+def _timed(fn: Callable[[], object]) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def _summary(samples: List[float]) -> Dict[str, float]:
+    ms = sorted(s * 1000 for s in samples)
+    return {
+        "median_ms": statistics.median(ms),
+        "p95_ms": ms[min(len(ms) - 1, int(round(0.95 * (len(ms) - 1))))],
+    }
+
+
+def _queries(count: int, seed: int) -> List[dict]:
+    rng = np.random.default_rng(seed + 10)
+    vocab = ingredient_vocab()[:60]
+    out = []
+    for _ in range(count):
+        k = int(rng.integers(2, 5))
+        out.append({
+            "ingredients": [vocab[i] for i in rng.choice(len(vocab), size=k, replace=False)],
+            "dietary_restrictions": [DIETARY[int(rng.integers(0, 3))]] if rng.random() < 0.3 else [],
+            "max_cooking_time": int(rng.integers(15, 90)) if rng.random() < 0.5 else None,
+            "cuisine_preference": None,
+        })
+    return out
+
+
+def _message(query: dict) -> str:
+    parts = list(query["ingredients"]) + list(query["dietary_restrictions"])
+    if query["max_cooking_time"]:
+        parts.append(f"{query['max_cooking_time']} min")
+    return ", ".join(parts)
+
+
+@contextmanager
+def use_catalog(store, llm):
+    """
+    Point the lazily loaded catalog and the graph's LLM at benchmark stand-ins.
+    """
+    saved_data, saved_llm = recipes_db._DATA, graph_mod.get_llm
+    recipes_db._DATA = Lazy(lambda: DataManager(store=store))
+    graph_mod.get_llm = lambda: llm
+    try:
+        yield
+    finally:
+        recipes_db._DATA, graph_mod.get_llm = saved_data, saved_llm
+
+
+def bench_size(n: int, workdir: Path, queries: int = 200, graph_runs: int = 50, seed: int = 0) -> Dict[str, Dict[str, float]]:
+    paths = write_datasets(workdir / str(n), n, seed)
+    results: Dict[str, Dict[str, float]] = {}
+
+    store = None
+    def load():
+        nonlocal store
+        store = recipes_db.load_recipes_db(paths["recipes"], artifact="off")
+    results["load_recipes_db"] = {"seconds": _timed(load)}
+    results["compile_catalog"] = {"seconds": _timed(lambda: compile_catalog(paths["recipes"], store=store))}
+    results["load_catalog"] = {"seconds": _timed(lambda: load_catalog(artifact_dir(paths["recipes"])))}
+
+    states = _queries(queries, seed)
+    with use_catalog(store, StubLLM()):
+        search = search_recipes_factory()
+        search(states[0])  # first call resolves the catalog
+        results["search_recipes"] = _summary([_timed(lambda s=s: search(s)) for s in states])
+
+        prices = PriceIndex(paths["prices"], index=store.ingredient_index)
+        results["price_index_build"] = {"seconds": _timed(lambda: prices.lookup([]))}
+        results["get_best_ingredient_prices"] = _summary(
+            [_timed(lambda s=s: prices.lookup(s["ingredients"])) for s in states]
+        )
+
+        wallet = WalletStore(workdir / f"wallet_{n}.sqlite", paths["wallet"])
+        results["wallet_import"] = {"seconds": _timed(wallet.open)}
+        users = [f"user_{i:07d}" for i in np.random.default_rng(seed).integers(1, n + 1, size=queries)]
+        def wallet_ops(user):
+            wallet.authenticate(user, "0000")
+            wallet.balance(user)
+            try:
+                wallet.deduct(user, 0.01)
+            except ValueError:
+                pass
+        results["wallet_ops"] = _summary([_timed(lambda u=u: wallet_ops(u)) for u in users])
+
+        graph = build_recipe_graph()
+        messages = [_message(s) for s in states[:graph_runs]]
+        graph.invoke({"messages": [HumanMessage(content=messages[0])]})
+        results["graph_invoke"] = _summary(
+            [_timed(lambda m=m: graph.invoke({"messages": [HumanMessage(content=m)]})) for m in messages]
+        )
+    return results
+
+
+def run(sizes, queries: int = 200, graph_runs: int = 50, seed: int = 0) -> dict:
+    out = {
+        "meta": {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "platform": platform.platform(),
+            "queries": queries,
+            "graph_runs": graph_runs,
+            "seed": seed,
+        },
+        "results": {},
+    }
+    with tempfile.TemporaryDirectory(prefix="recipe-bench-") as tmp:
+        for n in sizes:
+            out["results"][str(n)] = bench_size(n, Path(tmp), queries, graph_runs, seed)
+    return out
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> List[str]:
+    """
+    Metrics more than `tolerance` (0.5 = 50%) slower than the baseline.
+    Sizes or metrics missing from the baseline are skipped.
+    """
+    regressions = []
+    for size, benches in current["results"].items():
+        for bench, metrics in benches.items():
+            base = baseline.get("results", {}).get(size, {}).get(bench, {})
+            for metric, value in metrics.items():
+                if metric not in base:
+                    continue
+                old = base[metric]
+                floor = NOISE_FLOOR_MS if metric.endswith("_ms") else NOISE_FLOOR_MS / 1000
+                if value > old * (1 + tolerance) and value - old > floor:
+                    regressions.append(f"{size}/{bench}/{metric}: {old:.4g} -> {value:.4g}")
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--graph-runs", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path)
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument("--tolerance", type=float, default=0.5)
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args(argv)
+
+    result = run(args.sizes, args.queries, args.graph_runs, args.seed)
+    text = json.dumps(result, indent=2)
+    print(text)
+    if args.output:
+        args.output.write_text(text + "\n")
+
+    if args.update_baseline:
+        args.baseline.write_text(text + "\n")
+        return 0
+    if args.baseline.exists():
+        regressions = compare(result, json.loads(args.baseline.read_text()), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,72 @@
+"""
+Startup cost of the recipe_agent package.
+
+Each run is a fresh interpreter, so module caches do not hide import work:
+- import time of the package, the app module and the runtime module;
+- time spent in `runtime.warmup()`, per step.
+
+Usage (from the repository root):
+    python benchmarks/startup.py [--runs 5] [--max-import-seconds 0.5]
+
+Prints the median of each measurement as JSON. With --max-import-seconds the
+script exits non-zero when importing the package is slower than that.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+PROBE = r"""
+import json, time
+t0 = time.perf_counter()
+import src.recipe_agent
+t1 = time.perf_counter()
+import src.recipe_agent.app
+t2 = time.perf_counter()
+import src.recipe_agent.runtime as runtime
+t3 = time.perf_counter()
+out = {"import_package": t1 - t0, "import_app": t2 - t1, "import_runtime": t3 - t2}
+if WARMUP:
+    out.update({f"warmup_{k}": v for k, v in runtime.warmup().items()})
+print(json.dumps(out))
+"""
+
+
+def measure(runs: int, warmup: bool) -> dict:
+    env = dict(os.environ)
+    # warmup builds the chat client, which only needs a key to be present
+    env.setdefault("OPENAI_API_KEY", "benchmark")
+    samples = []
+    for _ in range(runs):
+        proc = subprocess.run(
+            [sys.executable, "-c", f"WARMUP = {warmup!r}\n{PROBE}"],
+            cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+        )
+        samples.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+    return {key: statistics.median(s[key] for s in samples) for key in samples[0]}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--no-warmup", action="store_true", help="only measure imports")
+    parser.add_argument("--max-import-seconds", type=float, default=None)
+    args = parser.parse_args()
+
+    result = measure(args.runs, warmup=not args.no_warmup)
+    print(json.dumps({k: round(v, 4) for k, v in result.items()}, indent=2))
+
+    if args.max_import_seconds is not None and result["import_package"] > args.max_import_seconds:
+        print(f"import_package {result['import_package']:.3f}s > {args.max_import_seconds}s", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,126 @@
+"""
+Deterministic stand-in for the chat model, so graph benchmarks measure our
+code rather than the network. It understands the prompts the nodes send:
+
+- structured `UserInput`: comma-separated ingredients, "N min", diet words;
+- structured `RankedRecommendation`: keeps the candidate table order;
+- plain calls (ranker / recommendation): answers from the candidate table.
+
+`delay` adds a fixed per-call latency to model a remote API.
+"""
+
+import asyncio
+import re
+import time
+from typing import Iterator, List
+
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.runnables import RunnableLambda
+
+from src.recipe_agent.nodes.generate_recommendation import format_recommendation
+from src.recipe_agent.schemas import RankedRecommendation, UserInput
+
+_TIME = re.compile(r"(\d+)\s*min")
+_DIETS = ("vegan", "vegetarian", "gluten-free")
+
+
+def _text(messages) -> str:
+    parts = []
+    for m in messages:
+        parts.append(m.get("content", "") if isinstance(m, dict) else getattr(m, "content", ""))
+    return "\n".join(str(p) for p in parts)
+
+
+def _last_user(messages) -> str:
+    for m in reversed(list(messages)):
+        role = m.get("role") if isinstance(m, dict) else getattr(m, "type", "")
+        if role in ("human", "user"):
+            return m.get("content", "") if isinstance(m, dict) else m.content
+    return ""
+
+
+def _table(prompt: str) -> List[dict]:
+    """
+    Rows of the candidate table (see src/recipe_agent/prompt_format.py).
+    """
+    lines = prompt.splitlines()
+    for i, line in enumerate(lines):
+        if "|" in line and "name" in line.split("|"):
+            header = line.split("|")
+            rows = []
+            for row in lines[i + 1:]:
+                if "|" not in row:
+                    break
+                rows.append(dict(zip(header, row.split("|"))))
+            return rows
+    return []
+
+
+class StubLLM:
+    model_name = "stub"
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.calls = 0
+
+    # ---------------- structured output ----------------
+    def _structured(self, schema, messages):
+        self.calls += 1
+        if self.delay:
+            time.sleep(self.delay)
+        if schema is UserInput:
+            text = _last_user(messages).lower()
+            found = _TIME.search(text)
+            words = [w.strip() for w in re.split(r",| and ", text)]
+            return UserInput(
+                ingredients=[w for w in words if w and not _TIME.search(w) and w not in _DIETS],
+                dietary_restrictions=[d for d in _DIETS if d in text],
+                max_cooking_time=int(found.group(1)) if found else None,
+            )
+        if schema is RankedRecommendation:
+            rows = _table(_text(messages))
+            return RankedRecommendation(
+                recipe_ids=[int(r["id"]) for r in rows if r.get("id", "").isdigit()],
+            )
+        raise TypeError(f"StubLLM has no structured output for {schema!r}")
+
+    def with_structured_output(self, schema):
+        async def ainvoke(messages):
+            if self.delay:
+                await asyncio.sleep(self.delay)
+            return self._structured(schema, messages)
+
+        return RunnableLambda(lambda messages: self._structured(schema, messages), afunc=ainvoke)
+
+    # ---------------- plain chat ----------------
+    def _reply(self, messages) -> str:
+        prompt = _text(messages)
+        rows = _table(prompt)
+        if "comma-separated" in prompt:
+            return ", ".join(r["name"] for r in rows)
+        return format_recommendation([
+            {"name": r.get("name"), "cooking_time": r.get("time"), "cuisine": r.get("cuisine")} for r in rows
+        ])
+
+    def invoke(self, messages, config=None, **kwargs) -> AIMessage:
+        self.calls += 1
+        if self.delay:
+            time.sleep(self.delay)
+        return AIMessage(content=self._reply(messages))
+
+    async def ainvoke(self, messages, config=None, **kwargs) -> AIMessage:
+        self.calls += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        return AIMessage(content=self._reply(messages))
+
+    def stream(self, messages, config=None, **kwargs) -> Iterator[AIMessageChunk]:
+        for word in self.invoke(messages).content.split(" "):
+            yield AIMessageChunk(content=word + " ")
+
+    async def astream(self, messages, config=None, **kwargs):
+        for word in (await self.ainvoke(messages)).content.split(" "):
+            yield AIMessageChunk(content=word + " ")
+
+    def batch(self, inputs, config=None, return_exceptions=False, **kwargs) -> List[AIMessage]:
+        return [self.invoke(m) for m in inputs]
@@ -0,0 +1,100 @@
+"""
+Synthetic recipe, price and wallet datasets in the same CSV layouts as
+`src/recipe_agent/data`, generated deterministically from a seed.
+"""
+
+from pathlib import Path
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+BASE_INGREDIENTS = [
+    "rice", "egg", "tomato", "onion", "garlic", "ginger", "tofu", "chicken", "spinach", "broccoli",
+    "carrot", "pasta", "bread", "cheese", "lentils", "chickpeas", "cucumber", "lemon", "olive oil",
+    "soy sauce", "bell pepper", "avocado", "yogurt", "paneer", "honey", "berries", "nuts", "cumin",
+    "spices", "mushroom", "potato", "beans", "corn", "peas", "zucchini", "salmon", "shrimp", "beef",
+    "pork", "noodles", "coconut milk", "basil", "cilantro", "spring onion", "sesame oil", "chili",
+]
+MODIFIERS = ["red", "green", "smoked", "wild", "baby", "sweet", "dried", "fresh", "roasted", "pickled"]
+CUISINES = ["Italian", "Chinese", "Indian", "Mexican", "Thai", "Japanese", "French", "Greek",
+            "American", "Mediterranean", "Middle Eastern", "Korean"]
+DIETARY = ["vegan", "vegetarian", "gluten-free"]
+STORES = ["Walmart", "Target", "Costco", "Aldi", "Kroger", "Safeway", "Whole Foods", "Trader Joe's"]
+UNITS = ["each", "lb", "kg", "can", "bag", "bunch", "bottle"]
+
+
+def ingredient_vocab(size: int = 400) -> List[str]:
+    """
+    Base ingredients plus "<modifier> <base>" variants, `size` names in total.
+    """
+    names = list(BASE_INGREDIENTS)
+    for mod in MODIFIERS:
+        for base in BASE_INGREDIENTS:
+            if len(names) >= size:
+                return names
+            names.append(f"{mod} {base}")
+    return names[:size]
+
+
+def recipes_frame(n: int, seed: int = 0, vocab_size: int = 400) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    vocab = np.array(ingredient_vocab(vocab_size), dtype=object)
+
+    # Zipf-ish popularity so common ingredients have long posting lists
+    weights = 1.0 / np.arange(1, len(vocab) + 1)
+    weights /= weights.sum()
+    counts = rng.integers(3, 9, size=n)
+    picks = rng.choice(len(vocab), size=int(counts.sum()), p=weights)
+    bounds = np.concatenate([[0], np.cumsum(counts)])
+    ingredients = ["|".join(dict.fromkeys(vocab[picks[bounds[i]:bounds[i + 1]]])) for i in range(n)]
+
+    diet_bits = rng.integers(0, 8, size=n)
+    dietary = ["|".join(t for b, t in enumerate(DIETARY) if bits >> b & 1) for bits in diet_bits]
+
+    return pd.DataFrame({
+        "id": np.arange(1, n + 1),
+        "name": [f"Recipe {i}" for i in range(1, n + 1)],
+        "cuisine": np.array(CUISINES, dtype=object)[rng.integers(0, len(CUISINES), size=n)],
+        "cooking_time": rng.integers(5, 121, size=n),
+        "dietary": dietary,
+        "ingredients": ingredients,
+        "instructions": "Prepare the ingredients, cook until done, season and serve.",
+    })
+
+
+def prices_frame(n: int, seed: int = 0, vocab_size: int = 400) -> pd.DataFrame:
+    rng = np.random.default_rng(seed + 1)
+    vocab = np.array(ingredient_vocab(vocab_size), dtype=object)
+    return pd.DataFrame({
+        "ingredient": vocab[rng.integers(0, len(vocab), size=n)],
+        "store": np.array(STORES, dtype=object)[rng.integers(0, len(STORES), size=n)],
+        "price_usd": np.round(rng.uniform(0.25, 25.0, size=n), 2),
+        "unit": np.array(UNITS, dtype=object)[rng.integers(0, len(UNITS), size=n)],
+    })
+
+
+def wallet_frame(n: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed + 2)
+    return pd.DataFrame({
+        "user_id": [f"user_{i:07d}" for i in range(1, n + 1)],
+        "balance_usd": np.round(rng.uniform(0, 500, size=n), 2),
+        "pin": [f"{p:04d}" for p in rng.integers(0, 10000, size=n)],
+    })
+
+
+def write_datasets(directory, n: int, seed: int = 0) -> dict:
+    """
+    Write recipes.csv, ingredient_prices.csv and wallet.csv with `n` rows each.
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    paths = {
+        "recipes": directory / "recipes.csv",
+        "prices": directory / "ingredient_prices.csv",
+        "wallet": directory / "wallet.csv",
+    }
+    recipes_frame(n, seed).to_csv(paths["recipes"], index=False)
+    prices_frame(n, seed).to_csv(paths["prices"], index=False)
+    wallet_frame(n, seed).to_csv(paths["wallet"], index=False)
+    return paths
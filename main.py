@@ -1,9 +1,13 @@
+import argparse
 import asyncio
 import logging
+import time
 from datetime import datetime
 from typing import Optional
 
-from src.recipe_agent import create_session, call_adk
+from src.recipe_agent import create_session, call_adk, call_adk_stream
+from src.recipe_agent.config import METRICS_HOST, METRICS_PORT
+from src.recipe_agent.metrics import serve_prometheus
 
 
 logging.basicConfig(
@@ -18,10 +22,11 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-async def chat_loop() -> None:
+async def chat_loop(stream: bool = True) -> None:
     """
     Interactive CLI that routes requests through the ADK runner
     (root_agent) instead of invoking the LangGraph directly.
+    With `stream=True` the answer is printed as it is generated.
     """
     logger.info("Starting Recipe Recommendation ADK App")
 
@@ -44,21 +49,41 @@ async def chat_loop() -> None:
 
         logger.info("User input: %s", user_input)
 
+        start = time.perf_counter()
         try:
-            response = await call_adk(
-                user_input,
-                session_id=session.id,
-                user_id=session.user_id,
-            )
-            print(f"\nAssistant:\n{response}\n")
-            logger.info("Assistant response: %s", response)
+            if stream:
+                print("\nAssistant:")
+                parts = []
+                async for chunk in call_adk_stream(
+                    user_input,
+                    session_id=session.id,
+                    user_id=session.user_id,
+                ):
+                    parts.append(chunk)
+                    print(chunk, end="", flush=True)
+                print("\n")
+                response = "".join(parts)
+            else:
+                response = await call_adk(
+                    user_input,
+                    session_id=session.id,
+                    user_id=session.user_id,
+                )
+                print(f"\nAssistant:\n{response}\n")
+            logger.info("Assistant response (%.2fs): %s", time.perf_counter() - start, response)
         except Exception:
             logger.exception("Error during ADK execution")
             print(" Something went wrong. Please try again.")
 
 
 def main() -> None:
-    asyncio.run(chat_loop())
+    parser = argparse.ArgumentParser(description="Recipe Recommendation Assistant (ADK)")
+    parser.add_argument("--no-stream", action="store_true", help="print each answer only once it is complete")
+    args = parser.parse_args()
+    if METRICS_PORT is not None:
+        serve_prometheus(METRICS_PORT, METRICS_HOST)
+        logger.info("Serving metrics on %s:%d/metrics", METRICS_HOST, METRICS_PORT)
+    asyncio.run(chat_loop(stream=not args.no_stream))
 
 
 if __name__ == "__main__":
@@ -1,4 +1,73 @@
-from google.adk.a2a.wrapper import A2AWrapper
-from waste_reduction_agent import waste_reduction_agent
+"""
+A2A server for the ADK agents.
 
-app = A2AWrapper(agent=waste_reduction_agent).app
+    python server.py                                   # waste_reduction_agent, RECIPE_SERVER_WORKERS processes
+    python server.py --agent recipe_manager --workers 4 --port 8001
+    uvicorn server:app                                 # single process, waste_reduction_agent
+
+Each worker warms up (data, graph, runner, LLM connections) before it accepts
+traffic and reports it on GET /ready.
+"""
+
+import argparse
+import logging
+from typing import Dict, List, Optional
+
+from src.recipe_agent.config import SERVER_HOST, SERVER_PORT, SERVER_WORKERS
+from src.recipe_agent.serving import create_app, serve, warm_llm_connections
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)s | %(process)d | %(message)s")
+
+
+def waste_reduction_app(host: str = SERVER_HOST, port: int = SERVER_PORT):
+    import waste_reduction_agent as waste
+
+    async def warmup() -> Dict[str, float]:
+        return {"llm": await warm_llm_connections(waste.llm)}
+
+    return create_app(waste.waste_reduction_agent, host=host, port=port, warmup=warmup)
+
+
+def recipe_manager_app(host: str = SERVER_HOST, port: int = SERVER_PORT):
+    from src.recipe_agent import runtime
+    from src.recipe_agent.executor import run_blocking
+    from src.recipe_agent.graph import get_llm
+
+    async def warmup() -> Dict[str, float]:
+        # catalog (memory-mapped), price index, wallet, graph, runner
+        timings = await run_blocking(runtime.warmup)
+        timings["llm"] = await warm_llm_connections(get_llm())
+        return timings
+
+    return create_app(runtime.root_agent, host=host, port=port, warmup=warmup, runner=runtime.get_runner())
+
+
+# agent -> (app factory, whether it reads the recipe / price data)
+AGENTS = {
+    "waste_reduction": ("server:waste_reduction_app", False),
+    "recipe_manager": ("server:recipe_manager_app", True),
+}
+
+
+def __getattr__(name: str):
+    # `uvicorn server:app` keeps serving the waste reduction agent
+    if name == "app":
+        globals()["app"] = waste_reduction_app()
+        return globals()["app"]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Serve an ADK agent over A2A")
+    parser.add_argument("--agent", choices=sorted(AGENTS), default="waste_reduction")
+    parser.add_argument("--workers", type=int, default=SERVER_WORKERS)
+    parser.add_argument("--host", default=SERVER_HOST)
+    parser.add_argument("--port", type=int, default=SERVER_PORT)
+    args = parser.parse_args(argv)
+
+    factory, shared_data = AGENTS[args.agent]
+    serve(factory, workers=args.workers, host=args.host, port=args.port, shared_data=shared_data)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,27 @@
-from .app import root_agent
-from .runtime import runner, create_session, call_adk
+"""
+Public entry points. Submodules are imported on first attribute access, so
+`import src.recipe_agent` stays cheap; see `runtime.warmup()` to build the
+data stores, graph and runner ahead of the first request.
+"""
 
-__all__ = ["root_agent", "runner", "create_session", "call_adk"]
+import importlib
+
+_EXPORTS = {
+    "root_agent": ".app",
+    "runner": ".runtime",
+    "create_session": ".runtime",
+    "call_adk": ".runtime",
+    "call_adk_stream": ".runtime",
+    "warmup": ".runtime",
+    "recommend_recipes_batch": ".batch",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
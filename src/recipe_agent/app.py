@@ -2,7 +2,10 @@ from __future__ import annotations
 from google.adk import Agent
 from langchain_core.messages import HumanMessage
 
-from .graph import build_recipe_graph
+from .executor import run_blocking
+from .lazy import Lazy
+from .streaming import current_sink, emit
+from .data import recipes_db
 from .data.recipes_db import (
     get_best_ingredient_prices,
     authenticate_wallet,
@@ -10,14 +13,40 @@ from .data.recipes_db import (
     deduct_wallet,
 )
 
-# Build LangGraph once
-_graph = build_recipe_graph()
+def _build_graph():
+    from .graph import build_recipe_graph
 
-def recommend_recipes(user_message: str) -> str:
+    # streaming nodes; plain ainvoke still returns the full reply
+    return build_recipe_graph(streaming=True)
+
+# Built once, on the first recommendation (or by runtime.warmup())
+_GRAPH = Lazy(_build_graph)
+
+def get_graph():
+    return _GRAPH.get()
+
+async def recommend_recipes(user_message: str) -> str:
     """
     ADK tool wrapper: calls LangGraph recipe manager and returns final assistant message.
     """
-    out = _graph.invoke({"messages": [HumanMessage(content=user_message)]})
+    # ainvoke keeps the event loop free: LLM nodes await the async client and
+    # CPU-bound search runs in the bounded blocking pool.
+    # the first call builds the graph (and loads the catalog) off the event loop
+    graph = _GRAPH.get() if _GRAPH.initialized else await run_blocking(_GRAPH.get)
+    inputs = {"messages": [HumanMessage(content=user_message)]}
+    # one catalog generation for the whole run, even if data is reloaded meanwhile
+    with recipes_db.pinned_snapshot():
+        if current_sink() is None:
+            out = await graph.ainvoke(inputs)
+        else:
+            # a streaming caller (runtime.call_adk_stream) is listening: forward
+            # generation tokens as they arrive
+            out = {}
+            async for mode, chunk in graph.astream(inputs, stream_mode=["custom", "values"]):
+                if mode == "custom":
+                    emit(chunk)
+                else:
+                    out = chunk
     msgs = out.get("messages") or []
     return msgs[-1].content if msgs else "No response."
 
@@ -0,0 +1,178 @@
+"""
+Batch recommendations over the recipe pipeline (nightly jobs, bulk pantry lists).
+
+Same stages as the graph (extract -> search -> rank -> generate), but each
+stage runs across the whole batch:
+- identical messages (after normalization) are processed once;
+- extraction tries the lexicon fast path, then the extract cache; generation
+  tries the recommend cache. These are the caches the interactive graph uses
+  (sequential mode), so a request served either way is a hit the other way;
+- the remaining extractions and generations go through the LLM's `batch`
+  interface with bounded concurrency;
+- all extracted preferences are searched against the store in one vectorized
+  pass (`RecipeStore.search_many`);
+- LLM calls are queued at batch priority, behind interactive requests.
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import Any, Dict, List, Optional
+
+from langchain_core.messages import HumanMessage, SystemMessage
+
+from .cache import normalize_text
+from .config import (
+    BATCH_MAX_CONCURRENCY,
+    SEARCH_TOP_K,
+    CANDIDATE_TOKEN_BUDGET,
+    RANKER_MODE,
+    FAST_PATH_THRESHOLD,
+)
+from .data import recipes_db
+from .gateway import BATCH, priority
+from .nodes.extract_user_preferences import build_extractor, extraction_cache_key, parse_fast_path
+from .nodes.generate_recommendation import (
+    NO_INGREDIENTS_REPLY,
+    NO_MATCH_REPLY,
+    build_recommendation_prompt,
+    recommendation_cache_key,
+)
+from .nodes.rank_recipes import LLMRanker, get_ranker
+from .nodes.search_recipes import search_query, select_candidates
+from .prompts import EXTRACTION_SYSTEM
+from .schemas import UserInput
+
+logger = logging.getLogger(__name__)
+
+FAILED_REPLY = "Sorry, I couldn't process this request."
+
+
+@priority(BATCH)
+def recommend_recipes_batch(
+    messages: List[str],
+    *,
+    llm=None,
+    max_concurrency: int = BATCH_MAX_CONCURRENCY,
+    top_k: Optional[int] = SEARCH_TOP_K,
+    candidate_token_budget: Optional[int] = CANDIDATE_TOKEN_BUDGET,
+    ranker: str = RANKER_MODE,
+    fast_path_threshold: float = FAST_PATH_THRESHOLD,
+) -> List[str]:
+    """
+    Return one recommendation text per input message, in input order.
+    A failed item gets FAILED_REPLY instead of failing the whole batch.
+    `fast_path_threshold` > 1 always extracts with the LLM, as in the graph.
+    """
+    from .graph import get_extract_cache, get_lexicon, get_recommend_cache
+
+    if llm is None:
+        from .graph import get_llm
+        llm = get_llm()
+    config = {"max_concurrency": max_concurrency}
+
+    # 1) dedupe identical inputs before spending any LLM calls
+    slot_of: Dict[str, int] = {}
+    unique: List[str] = []
+    slots = []
+    for msg in messages:
+        key = normalize_text(msg)
+        if key not in slot_of:
+            slot_of[key] = len(unique)
+            unique.append(msg)
+        slots.append(slot_of[key])
+
+    # 2) extraction: lexicon fast path, then the extract cache, then the LLM
+    #    batch interface for the rest
+    extract_cache = get_extract_cache()
+    lexicon = get_lexicon() if fast_path_threshold <= 1 else None
+    extracted: List[Any] = [None] * len(unique)
+    extract_keys: Dict[int, str] = {}
+    for i, msg in enumerate(unique):
+        fast = parse_fast_path(lexicon, msg, fast_path_threshold) if lexicon is not None else None
+        if fast is not None:
+            extracted[i] = fast
+            continue
+        extract_keys[i] = extraction_cache_key(llm, [HumanMessage(content=msg)])
+        cached = extract_cache.get(extract_keys[i])
+        if cached is not None:
+            extracted[i] = UserInput.model_validate_json(cached)
+    pending = [i for i in range(len(unique)) if extracted[i] is None]
+    results = build_extractor(llm).batch(
+        [[{"role": "system", "content": EXTRACTION_SYSTEM}, HumanMessage(content=unique[i])] for i in pending],
+        config=config,
+        return_exceptions=True,
+    )
+    for i, prefs in zip(pending, results):
+        if isinstance(prefs, UserInput):
+            extract_cache.set(extract_keys[i], prefs.model_dump_json())
+        extracted[i] = prefs
+
+    states: List[Optional[Dict[str, Any]]] = []
+    for msg, prefs in zip(unique, extracted):
+        if isinstance(prefs, Exception):
+            logger.warning("Batch extraction failed: %s", prefs)
+            states.append(None)
+            continue
+        states.append({
+            "messages": [HumanMessage(content=msg)],
+            "ingredients": prefs.ingredients,
+            "dietary_restrictions": prefs.dietary_restrictions,
+            "max_cooking_time": prefs.max_cooking_time,
+            "cuisine_preference": prefs.cuisine_preference,
+        })
+
+    # 3) one vectorized search pass for every extracted preference set
+    store = recipes_db.get_recipes_db()
+    live = [i for i, s in enumerate(states) if s is not None]
+    found = store.search_many([search_query(states[i]) for i in live])
+    for i, (rows, scores) in zip(live, found):
+        states[i].update(select_candidates(store, rows, scores, top_k, candidate_token_budget))
+
+    # 4) ranking (LLM rankers are batched too)
+    rank = get_ranker(ranker, llm)
+    to_rank = [i for i in live if states[i]["matched_recipes"]]
+    if isinstance(rank, LLMRanker):
+        responses = llm.batch(
+            [[SystemMessage(content=rank.build_prompt(states[i], states[i]["matched_recipes"]))] for i in to_rank],
+            config=config,
+            return_exceptions=True,
+        )
+        for i, resp in zip(to_rank, responses):
+            content = "" if isinstance(resp, Exception) else resp.content
+            states[i]["matched_recipes"] = rank.apply_response(states[i]["matched_recipes"], content)
+    else:
+        for i in to_rank:
+            states[i]["matched_recipes"] = rank.rank(states[i], states[i]["matched_recipes"])
+
+    # 5) generation: the recommend cache, then the LLM batch interface
+    recommend_cache = get_recommend_cache("sequential")
+    replies: List[str] = [FAILED_REPLY] * len(unique)
+    recommend_keys: Dict[int, str] = {}
+    to_generate = []
+    for i in live:
+        if not states[i]["ingredients"]:
+            replies[i] = NO_INGREDIENTS_REPLY
+        elif not states[i]["matched_recipes"]:
+            replies[i] = NO_MATCH_REPLY
+        else:
+            recommend_keys[i] = recommendation_cache_key(llm, states[i], states[i]["matched_recipes"])
+            cached = recommend_cache.get(recommend_keys[i])
+            if cached is not None:
+                replies[i] = cached
+            else:
+                to_generate.append(i)
+
+    responses = llm.batch(
+        [[SystemMessage(content=build_recommendation_prompt(states[i], states[i]["matched_recipes"]))] for i in to_generate],
+        config=config,
+        return_exceptions=True,
+    )
+    for i, resp in zip(to_generate, responses):
+        if isinstance(resp, Exception):
+            logger.warning("Batch generation failed: %s", resp)
+        else:
+            replies[i] = resp.content
+            recommend_cache.set(recommend_keys[i], resp.content)
+
+    return [replies[slot] for slot in slots]
@@ -0,0 +1,242 @@
+"""
+Response caches for LLM-backed nodes.
+
+- `LRUCache`: in-process, LRU with optional TTL, entry and byte limits.
+- `SQLiteCache`: persistent second tier with TTL and entry-count eviction.
+- `TieredCache`: memory first, then SQLite (hits are promoted to memory).
+- `VersionBoundCache`: namespaces another cache by a version string (e.g. the
+  catalog generation in use); entries of older versions are left to age out
+  of the LRU / TTL. `FileBoundCache` uses a file's fingerprint as the version.
+
+Keys and values are strings; callers serialize (e.g. pydantic JSON) themselves.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Optional, Tuple
+
+from .config import CACHE_DIR, CACHE_TTL_SECONDS
+
+
+def normalize_text(text: str) -> str:
+    return " ".join(str(text).lower().split())
+
+
+def make_cache_key(*parts: Any) -> str:
+    payload = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def model_name(llm: Any) -> str:
+    for attr in ("model_name", "model"):
+        value = getattr(llm, attr, None)
+        if isinstance(value, str):
+            return value
+    return type(llm).__name__
+
+
+def file_fingerprint(path) -> str:
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return "missing"
+    return f"{st.st_mtime_ns}:{st.st_size}"
+
+
+class LRUCache:
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        max_bytes: Optional[int] = None,
+        ttl: Optional[float] = None,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._data: "OrderedDict[str, Tuple[Optional[float], str]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at is not None and expires_at < time.time():
+                self._remove(key)
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str) -> None:
+        size = len(value.encode("utf-8"))
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+        expires_at = time.time() + self.ttl if self.ttl else None
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+            self._data[key] = (expires_at, value)
+            self._bytes += size
+            while len(self._data) > self.max_entries or (
+                self.max_bytes is not None and self._bytes > self.max_bytes
+            ):
+                self._remove(next(iter(self._data)))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def _remove(self, key: str) -> None:
+        _, value = self._data.pop(key)
+        self._bytes -= len(value.encode("utf-8"))
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SQLiteCache:
+    # entry-count eviction runs every N writes instead of on each one
+    EVICT_EVERY = 64
+
+    def __init__(self, path, max_entries: int = 100_000, ttl: Optional[float] = None):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS cache_accessed ON cache(accessed)")
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT value, created FROM cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            value, created = row
+            if self.ttl and created + self.ttl < now:
+                self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute("UPDATE cache SET accessed = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            return value
+
+    def set(self, key: str, value: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, created, accessed) VALUES (?, ?, ?, ?)",
+                (key, value, now, now),
+            )
+            self._writes += 1
+            if self._writes % self.EVICT_EVERY == 0:
+                self._evict(now)
+            self._conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM cache")
+            self._conn.commit()
+
+    def _evict(self, now: float) -> None:
+        if self.ttl:
+            self._conn.execute("DELETE FROM cache WHERE created < ?", (now - self.ttl,))
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()
+        if count > self.max_entries:
+            self._conn.execute(
+                "DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY accessed ASC LIMIT ?)",
+                (count - self.max_entries,),
+            )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+
+
+class TieredCache:
+    def __init__(self, memory: LRUCache, persistent: Optional[SQLiteCache] = None):
+        self.memory = memory
+        self.persistent = persistent
+
+    def get(self, key: str) -> Optional[str]:
+        value = self.memory.get(key)
+        if value is None and self.persistent is not None:
+            value = self.persistent.get(key)
+            if value is not None:
+                self.memory.set(key, value)
+        return value
+
+    def set(self, key: str, value: str) -> None:
+        self.memory.set(key, value)
+        if self.persistent is not None:
+            self.persistent.set(key, value)
+
+    def clear(self) -> None:
+        self.memory.clear()
+        if self.persistent is not None:
+            self.persistent.clear()
+
+
+class VersionBoundCache:
+    """
+    Keys are namespaced by `version()`. The inner cache is never cleared on a
+    version change: requests pinned to an older generation still use it, and
+    its SQLite tier may be shared with processes on other versions.
+    """
+    def __init__(self, inner, version: Callable[[], str]):
+        self.inner = inner
+        self.version = version
+
+    def _namespace(self) -> str:
+        return self.version()
+
+    def get(self, key: str) -> Optional[str]:
+        return self.inner.get(f"{self._namespace()}:{key}")
+
+    def set(self, key: str, value: str) -> None:
+        self.inner.set(f"{self._namespace()}:{key}", value)
+
+    def clear(self) -> None:
+        self.inner.clear()
+
+
+class FileBoundCache(VersionBoundCache):
+    def __init__(self, inner, path):
+        self.path = path
+        super().__init__(inner, lambda: file_fingerprint(path))
+
+
+def build_response_cache(
+    name: str,
+    max_entries: int = 1024,
+    max_bytes: Optional[int] = None,
+    ttl: Optional[float] = CACHE_TTL_SECONDS,
+    persistent_max_entries: int = 100_000,
+) -> TieredCache:
+    """
+    Memory LRU, plus a SQLite tier at CACHE_DIR/<name>.sqlite when
+    RECIPE_AGENT_CACHE_DIR is set.
+    """
+    persistent = None
+    if CACHE_DIR is not None:
+        persistent = SQLiteCache(CACHE_DIR / f"{name}.sqlite", max_entries=persistent_max_entries, ttl=ttl)
+    return TieredCache(LRUCache(max_entries=max_entries, max_bytes=max_bytes, ttl=ttl), persistent)
@@ -1,4 +1,5 @@
 from __future__ import annotations
+import os
 from pathlib import Path
 
 # project: .../src/recipe_agent/config.py
@@ -8,3 +9,67 @@ DATA_DIR = PACKAGE_DIR / "data"
 RECIPES_CSV = DATA_DIR / "recipes.csv"
 PRICES_CSV = DATA_DIR / "ingredient_prices.csv"
 WALLET_CSV = DATA_DIR / "wallet.csv"
+# Compiled, memory-mapped catalog next to recipes.csv: "auto" (use when fresh,
+# rebuild when stale), "use" (use when fresh, never write) or "off"
+CATALOG_ARTIFACT = os.getenv("RECIPE_CATALOG_ARTIFACT", "auto")
+# Seconds between checks of recipes.csv / ingredient_prices.csv for edits
+# (applied without a restart); 0 disables the watcher
+DATA_RELOAD_INTERVAL = float(os.getenv("RECIPE_DATA_RELOAD_INTERVAL", "2"))
+# wallet.csv is imported into this database once; the database is authoritative after that
+WALLET_DB = Path(os.getenv("RECIPE_WALLET_DB", str(DATA_DIR / "wallet.sqlite")))
+
+# Candidate set passed from search to the LLM nodes
+SEARCH_TOP_K = int(os.getenv("RECIPE_SEARCH_TOP_K", "20"))
+CANDIDATE_TOKEN_BUDGET = int(os.getenv("RECIPE_CANDIDATE_TOKEN_BUDGET", "2000"))
+
+# Token budget of the candidate table in each LLM node's prompt
+RANK_PROMPT_TOKENS = int(os.getenv("RECIPE_RANK_PROMPT_TOKENS", "600"))
+RECOMMEND_PROMPT_TOKENS = int(os.getenv("RECIPE_RECOMMEND_PROMPT_TOKENS", "1200"))
+RANK_AND_RECOMMEND_PROMPT_TOKENS = int(os.getenv("RECIPE_RANK_AND_RECOMMEND_PROMPT_TOKENS", "800"))
+
+# "local" (feature-based, no LLM call) or "llm"
+RANKER_MODE = os.getenv("RECIPE_RANKER", "local")
+# "sequential" (rank, then generate) or "fused" (one call ranks and writes the reply)
+GRAPH_MODE = os.getenv("RECIPE_GRAPH_MODE", "sequential")
+
+# Local preference parser: skip the extraction LLM call at or above this confidence (> 1 disables)
+FAST_PATH_THRESHOLD = float(os.getenv("RECIPE_FAST_PATH_THRESHOLD", "0.9"))
+
+# LLM response caches: in-memory LRU, plus SQLite files here when set
+CACHE_DIR = Path(os.environ["RECIPE_AGENT_CACHE_DIR"]) if os.getenv("RECIPE_AGENT_CACHE_DIR") else None
+CACHE_TTL_SECONDS = float(os.getenv("RECIPE_AGENT_CACHE_TTL", str(7 * 24 * 3600)))
+EXTRACT_CACHE_SIZE = int(os.getenv("RECIPE_EXTRACT_CACHE_SIZE", "4096"))
+RECOMMEND_CACHE_SIZE = int(os.getenv("RECIPE_RECOMMEND_CACHE_SIZE", "1024"))
+RECOMMEND_CACHE_MAX_BYTES = int(os.getenv("RECIPE_RECOMMEND_CACHE_MAX_BYTES", str(8 * 1024 * 1024)))
+
+# Thread pool for blocking work reached from the async tool path
+BLOCKING_WORKERS = int(os.getenv("RECIPE_BLOCKING_WORKERS", str(min(32, (os.cpu_count() or 1) + 4))))
+
+# Parallel LLM calls per stage in recommend_recipes_batch
+BATCH_MAX_CONCURRENCY = int(os.getenv("RECIPE_BATCH_MAX_CONCURRENCY", "8"))
+
+# LLM gateway (per process): request and token rates (0 disables a limit),
+# calls in flight, retries of 429 / 5xx / connection errors
+LLM_REQUESTS_PER_MINUTE = float(os.getenv("RECIPE_LLM_REQUESTS_PER_MINUTE", "500"))
+LLM_TOKENS_PER_MINUTE = float(os.getenv("RECIPE_LLM_TOKENS_PER_MINUTE", "200000"))
+LLM_MAX_CONCURRENCY = int(os.getenv("RECIPE_LLM_MAX_CONCURRENCY", "16"))
+LLM_MAX_RETRIES = int(os.getenv("RECIPE_LLM_MAX_RETRIES", "4"))
+
+# ADK sessions: events kept per session, idle seconds before a session leaves
+# memory, memory budget for all sessions; plus a SQLite tier (sessions survive
+# eviction and restarts) when RECIPE_SESSION_DB is set
+SESSION_MAX_EVENTS = int(os.getenv("RECIPE_SESSION_MAX_EVENTS", "200"))
+SESSION_IDLE_TTL = float(os.getenv("RECIPE_SESSION_IDLE_TTL", "3600"))
+SESSION_MAX_BYTES = int(os.getenv("RECIPE_SESSION_MAX_BYTES", str(64 * 1024 * 1024)))
+SESSION_DB = Path(os.environ["RECIPE_SESSION_DB"]) if os.getenv("RECIPE_SESSION_DB") else None
+
+# A2A server (`server.py`): bind address and worker processes
+SERVER_HOST = os.getenv("RECIPE_SERVER_HOST", "127.0.0.1")
+SERVER_PORT = int(os.getenv("RECIPE_SERVER_PORT", "8000"))
+SERVER_WORKERS = int(os.getenv("RECIPE_SERVER_WORKERS", str(os.cpu_count() or 1)))
+
+# Instrumentation: append every metrics event to this JSONL file; serve
+# Prometheus text at HOST:PORT/metrics from the CLI when a port is set
+METRICS_JSONL = os.getenv("RECIPE_METRICS_JSONL") or None
+METRICS_PORT = int(os.environ["RECIPE_METRICS_PORT"]) if os.getenv("RECIPE_METRICS_PORT") else None
+METRICS_HOST = os.getenv("RECIPE_METRICS_HOST", SERVER_HOST)
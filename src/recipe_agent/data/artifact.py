@@ -0,0 +1,198 @@
+"""
+Compiled, memory-mapped form of the recipe catalog.
+
+`compile_catalog(csv)` writes a directory of `.npy` files next to the CSV:
+the RecipeStore columns, its derived search arrays (dietary bitmask, cuisine
+codes, posting lists) and UTF-8 string pools (offsets + bytes) for names,
+instructions and the small vocabularies. `load_catalog` maps the arrays with
+`np.load(mmap_mode="r")`, so loading does no parsing and the pages are shared
+by every process that maps the same files.
+
+The CSV stays the source of truth: the artifact records the CSV fingerprint
+(mtime + size) and is ignored once it no longer matches.
+
+`recipes.catalog` is a symlink to a versioned directory
+(`recipes.catalog.v-*`). A compile writes a new version and swaps the link
+with one rename, so a reader sees either the old or the new catalog. The
+version just replaced is kept for readers that are still opening it, and
+older ones are deleted.
+
+    python -m src.recipe_agent.data.artifact [recipes.csv] [--out DIR]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import shutil
+import tempfile
+from collections.abc import Sequence
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+
+from ..cache import file_fingerprint
+from ..config import RECIPES_CSV
+from .ingredients import IngredientIndex
+from .store import RecipeStore
+
+logger = logging.getLogger(__name__)
+
+# bumped when the layout or the ingredient ids behind the postings change
+FORMAT_VERSION = 2
+
+ARRAYS = (
+    "ids", "cooking_time", "cuisine_codes",
+    "dietary_offsets", "dietary_ids", "ing_offsets", "ing_ids",
+)
+DERIVED = ("dietary_mask", "cuisine_lower_codes", "postings_rows", "postings_offsets", "postings_key_codes")
+POOLS = ("names", "instructions", "cuisines", "dietary_tags", "ingredient_vocab")
+# materialized as Python lists on load (vocabulary sized, not catalog sized)
+SMALL_POOLS = ("cuisines", "dietary_tags", "ingredient_vocab")
+
+
+class StringPool(Sequence):
+    """
+    Read-only sequence of strings over (offsets, utf-8 bytes) arrays; items
+    are decoded on access.
+    """
+    def __init__(self, offsets: np.ndarray, data: np.ndarray):
+        self.offsets = offsets
+        self.data = data
+
+    @classmethod
+    def build(cls, strings) -> "StringPool":
+        encoded = [str(s).encode("utf-8") for s in strings]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(b) for b in encoded], out=offsets[1:])
+        data = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+        return cls(offsets, data)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("string pool index out of range")
+        return self.data[self.offsets[i]:self.offsets[i + 1]].tobytes().decode("utf-8")
+
+
+def artifact_dir(csv_path) -> Path:
+    csv_path = Path(csv_path)
+    return csv_path.with_name(csv_path.stem + ".catalog")
+
+
+def compile_catalog(csv_path=RECIPES_CSV, out_dir=None, store: Optional[RecipeStore] = None) -> Path:
+    """
+    Write the artifact for `csv_path` (atomically replacing an old one) and
+    return its directory. Pass `store` to reuse an already parsed catalog.
+    """
+    csv_path = Path(csv_path)
+    out_dir = Path(out_dir) if out_dir is not None else artifact_dir(csv_path)
+    # fingerprint first: a CSV edited while compiling leaves a stale artifact
+    fingerprint = file_fingerprint(csv_path)
+    if store is None:
+        import pandas as pd
+        store = RecipeStore.from_frame(pd.read_csv(csv_path))
+
+    out_dir.parent.mkdir(parents=True, exist_ok=True)
+    tmp = Path(tempfile.mkdtemp(prefix=out_dir.name + ".tmp-", dir=out_dir.parent))
+    try:
+        for name in ARRAYS + DERIVED:
+            np.save(tmp / f"{name}.npy", np.ascontiguousarray(getattr(store, name)))
+        for name in POOLS:
+            pool = StringPool.build(getattr(store, name))
+            np.save(tmp / f"{name}.offsets.npy", pool.offsets)
+            np.save(tmp / f"{name}.bytes.npy", pool.data)
+        (tmp / "meta.json").write_text(json.dumps({
+            "format": FORMAT_VERSION,
+            "source": str(csv_path),
+            "source_fingerprint": fingerprint,
+            "rows": len(store),
+        }))
+        # mkdtemp creates the directory 0700; the catalog is shared by every process
+        os.chmod(tmp, 0o755)
+        version = out_dir.with_name(out_dir.name + ".v-" + tmp.name.rsplit("-", 1)[-1])
+        os.rename(tmp, version)
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+    _publish(out_dir, version)
+    return out_dir
+
+
+def _publish(out_dir: Path, version: Path) -> None:
+    """
+    Point the `out_dir` symlink at `version` atomically, then delete versions
+    other than the current and the one it replaced.
+    """
+    previous = os.readlink(out_dir) if out_dir.is_symlink() else None
+    if out_dir.exists() and not out_dir.is_symlink():
+        # a plain directory from an older build: move it out of the way first
+        legacy = out_dir.with_name(out_dir.name + ".legacy-" + version.name.rsplit("-", 1)[-1])
+        os.rename(out_dir, legacy)
+        shutil.rmtree(legacy, ignore_errors=True)
+    link = out_dir.with_name(out_dir.name + ".link-" + version.name.rsplit("-", 1)[-1])
+    os.symlink(version.name, link)
+    try:
+        os.replace(link, out_dir)
+    except BaseException:
+        link.unlink(missing_ok=True)
+        shutil.rmtree(version, ignore_errors=True)
+        raise
+    # re-read: another process may have published meanwhile
+    keep = {version.name, previous, os.readlink(out_dir) if out_dir.is_symlink() else None}
+    for stale in out_dir.parent.glob(out_dir.name + ".v-*"):
+        if stale.name not in keep:
+            shutil.rmtree(stale, ignore_errors=True)
+
+
+def is_fresh(csv_path, out_dir=None) -> bool:
+    out_dir = Path(out_dir) if out_dir is not None else artifact_dir(csv_path)
+    try:
+        meta = json.loads((out_dir / "meta.json").read_text())
+    except (OSError, ValueError):
+        return False
+    return meta.get("format") == FORMAT_VERSION and meta.get("source_fingerprint") == file_fingerprint(csv_path)
+
+
+def load_catalog(out_dir, ingredient_index: Optional[IngredientIndex] = None) -> RecipeStore:
+    # one version for every file, even if a new one is published meanwhile
+    out_dir = Path(out_dir).resolve()
+
+    def array(name: str) -> np.ndarray:
+        return np.load(out_dir / f"{name}.npy", mmap_mode="r")
+
+    def pool(name: str) -> StringPool:
+        return StringPool(array(f"{name}.offsets"), array(f"{name}.bytes"))
+
+    small: dict = {name: list(pool(name)) for name in SMALL_POOLS}
+    return RecipeStore(
+        **{name: array(name) for name in ARRAYS},
+        names=pool("names"),
+        instructions=pool("instructions"),
+        cuisines=small["cuisines"],
+        dietary_tags=small["dietary_tags"],
+        ingredient_vocab=small["ingredient_vocab"],
+        ingredient_index=ingredient_index,
+        derived={name: array(name) for name in DERIVED},
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Compile recipes.csv into a memory-mappable catalog")
+    parser.add_argument("csv", nargs="?", default=str(RECIPES_CSV))
+    parser.add_argument("--out", default=None, help="output directory (default: <csv stem>.catalog next to the CSV)")
+    args = parser.parse_args(argv)
+    print(compile_catalog(args.csv, args.out))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""
+Row-level diffs between two loads of a CSV file.
+
+Each load is summarized as (keys, hashes): a unique key per row (recipe id,
+or ingredient + store for prices) and a 64-bit hash of the row's contents.
+Comparing two summaries tells which rows were added, changed or removed
+without keeping the previous file's contents around.
+"""
+
+from __future__ import annotations
+
+from typing import NamedTuple, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+
+class RowDiff(NamedTuple):
+    changed: np.ndarray   # bool per new row: added or modified
+    deleted: np.ndarray   # bool per old row: key no longer present
+
+    @property
+    def empty(self) -> bool:
+        return not self.changed.any() and not self.deleted.any()
+
+
+def row_hashes(df: pd.DataFrame, columns: Optional[Sequence[str]] = None) -> np.ndarray:
+    frame = df if columns is None else df[list(columns)]
+    # categorize=False: factorizing mostly-unique text columns costs more than it saves
+    return pd.util.hash_pandas_object(frame, index=False, categorize=False).to_numpy()
+
+
+def diff_rows(old_keys: pd.Index, old_hashes: np.ndarray, new_keys: pd.Index, new_hashes: np.ndarray) -> RowDiff:
+    """
+    Compare two (unique keys, hashes) summaries.
+    """
+    pos = old_keys.get_indexer(new_keys)
+    known = pos >= 0
+    changed = ~known
+    changed[known] = old_hashes[pos[known]] != new_hashes[known]
+    deleted = new_keys.get_indexer(old_keys) < 0
+    return RowDiff(changed, deleted)
@@ -0,0 +1,216 @@
+"""
+Ingredient normalization shared by the recipe store and the price index.
+
+Free-text names ("Roma tomatoes", "tomato", "Tomatoes ") resolve to one
+canonical ingredient id:
+1. canonical key: lowercase, punctuation stripped, each word singularized;
+2. exact key or synonym table hit;
+3. leading descriptive words (MODIFIERS) dropped one at a time
+   ("fresh ripe tomato" -> "tomato"); other leading words name a different
+   product ("garlic bread", "rice flour") and are kept;
+4. typos of single-word names: trigram similarity plus a small edit
+   distance against single-word keys ("brocoli" -> "broccoli").
+Resolutions are memoized, so repeated lookups are a single dict access.
+`resolve_exact` stops after step 2 (prices must not be guessed).
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, Optional
+
+# alias -> canonical name; both sides go through canonical_key
+SYNONYMS: Dict[str, str] = {
+    "roma tomato": "tomato",
+    "cherry tomato": "tomato",
+    "plum tomato": "tomato",
+    "scallion": "spring onion",
+    "green onion": "spring onion",
+    "garbanzo": "chickpeas",
+    "garbanzo bean": "chickpeas",
+    "chick pea": "chickpeas",
+    "capsicum": "bell pepper",
+    "sweet pepper": "bell pepper",
+    "bean curd": "tofu",
+    "yoghurt": "yogurt",
+    "evoo": "olive oil",
+    "spaghetti": "pasta",
+    "penne": "pasta",
+    "macaroni": "pasta",
+    "basmati": "rice",
+    "chicken breast": "chicken",
+    "chicken thigh": "chicken",
+    "shoyu": "soy sauce",
+    "soya sauce": "soy sauce",
+}
+
+# leading words that describe an ingredient without changing what it is
+MODIFIERS = frozenset({
+    "fresh", "ripe", "raw", "whole", "organic", "plain", "lean", "baby",
+    "large", "medium", "small", "big",
+    "chopped", "diced", "sliced", "minced", "grated", "shredded", "crushed",
+    "boneless", "skinless", "extra", "virgin", "free", "range",
+    "salted", "unsalted", "red", "white", "yellow",
+})
+
+FUZZY_THRESHOLD = 0.75
+MIN_FUZZY_LENGTH = 4
+# edits allowed for a typo: 1, or 2 for names of at least LONG_NAME letters
+LONG_NAME = 8
+MEMO_SIZE = 65536
+
+_PUNCT = re.compile(r"[^a-z0-9 ]+")
+
+
+def singularize(word: str) -> str:
+    if len(word) <= 3:
+        return word
+    if word.endswith("ies"):
+        return word[:-3] + "y"
+    if word.endswith(("oes", "ches", "shes", "xes", "sses")):
+        return word[:-2]
+    if word.endswith("s") and not word.endswith(("ss", "us", "is")):
+        return word[:-1]
+    return word
+
+
+def canonical_key(name: str) -> str:
+    text = _PUNCT.sub(" ", str(name).lower().replace("-", " "))
+    return " ".join(singularize(w) for w in text.split())
+
+
+def _trigrams(key: str) -> Counter:
+    padded = f"  {key} "
+    return Counter(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+def _within_edits(a: str, b: str, limit: int) -> bool:
+    """
+    Whether the Levenshtein distance between `a` and `b` is at most `limit`.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return False
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        if min(current) > limit:
+            return False
+        previous = current
+    return previous[-1] <= limit
+
+
+class IngredientIndex:
+    """
+    Maps ingredient names to dense canonical ids (`names[id]` is the display
+    name of the first spelling seen). `add` registers new ingredients; the
+    price index uses it for items that no recipe mentions.
+    """
+    def __init__(self, names: Iterable[str] = (), synonyms: Optional[Dict[str, str]] = None,
+                 fuzzy_threshold: float = FUZZY_THRESHOLD):
+        self.names: List[str] = []
+        self.fuzzy_threshold = fuzzy_threshold
+        self._keys: Dict[str, int] = {}
+        self._key_of: List[str] = []
+        self._aliases: Dict[str, str] = {
+            canonical_key(alias): canonical_key(target)
+            for alias, target in (SYNONYMS if synonyms is None else synonyms).items()
+        }
+        self._grams: Dict[str, List[int]] = {}
+        self._gram_totals: List[int] = []
+        self._memo: Dict[str, Optional[int]] = {}
+        self._lock = threading.Lock()
+        for name in names:
+            self.add(name)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def add(self, name: str) -> int:
+        """
+        Id for `name`, registering it as a new canonical ingredient if it does
+        not resolve exactly (no fuzzy matching here). A synonym registers its
+        target, so the ids do not depend on which spelling is added first.
+        """
+        key = canonical_key(name)
+        found = self._exact(key)
+        if found is not None:
+            return found
+        key = self._aliases.get(key, key)
+        with self._lock:
+            found = self._keys.get(key)
+            if found is not None:
+                return found
+            cid = len(self.names)
+            self.names.append(str(name).strip())
+            self._keys[key] = cid
+            self._key_of.append(key)
+            grams = _trigrams(key)
+            if " " not in key:
+                # only single-word names are typo candidates
+                for gram in grams:
+                    self._grams.setdefault(gram, []).append(cid)
+            self._gram_totals.append(sum(grams.values()))
+            # a negative memo entry may now resolve
+            self._memo.clear()
+            return cid
+
+    def _exact(self, key: str) -> Optional[int]:
+        cid = self._keys.get(key)
+        if cid is None and key in self._aliases:
+            cid = self._keys.get(self._aliases[key])
+        return cid
+
+    def _fuzzy(self, key: str) -> Optional[int]:
+        if len(key) < MIN_FUZZY_LENGTH or " " in key:
+            return None
+        limit = 2 if len(key) >= LONG_NAME else 1
+        grams = _trigrams(key)
+        shared: Counter = Counter()
+        for gram, count in grams.items():
+            for cid in self._grams.get(gram, ()):
+                shared[cid] += count
+        total = sum(grams.values())
+        best, best_score = None, self.fuzzy_threshold
+        for cid, common in shared.items():
+            # Dice coefficient over trigram multisets
+            score = 2 * common / (total + self._gram_totals[cid])
+            if score < best_score or not _within_edits(key, self._key_of[cid], limit):
+                continue
+            if score > best_score or (score == best_score and best is not None and cid < best):
+                best, best_score = cid, score
+        return best
+
+    def resolve(self, name: str) -> Optional[int]:
+        key = canonical_key(name)
+        if key in self._memo:
+            return self._memo[key]
+
+        cid = self._exact(key)
+        words = key.split()
+        for i in range(1, len(words)):
+            if cid is not None or words[i - 1] not in MODIFIERS:
+                break
+            cid = self._exact(" ".join(words[i:]))
+        if cid is None:
+            cid = self._fuzzy(key)
+
+        if len(self._memo) >= MEMO_SIZE:
+            self._memo.clear()
+        self._memo[key] = cid
+        return cid
+
+    def resolve_exact(self, name: str) -> Optional[int]:
+        """
+        Id of `name` by canonical key or synonym only.
+        """
+        return self._exact(canonical_key(name))
+
+    def resolve_many(self, names: Iterable[str]) -> List[Optional[int]]:
+        return [self.resolve(n) for n in names]
+
+    def name(self, cid: int) -> str:
+        return self.names[cid]
@@ -0,0 +1,200 @@
+"""
+Hot reload of the recipe catalog and the price index.
+
+`DataManager` publishes immutable generations (`Snapshot`: recipe store +
+price index). A watcher thread polls both CSV files; when one changes, its
+rows are diffed against the previous load (recipes by `id`, prices by
+ingredient + store) and only the added, changed and deleted rows are applied
+to a copy of the indexes, which becomes the next generation. Nothing that a
+reader holds is modified.
+
+Row hashes are only taken when a file is read for a change, so an unchanged
+catalog is never re-parsed; the first recipe change after startup is a full
+rebuild and later ones are diffed.
+
+A request pins one generation for its whole run with `pin()`; everything it
+reads through `recipes_db.get_recipes_db()` / `get_price_index()` comes from
+that snapshot even if a newer one is published meanwhile.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterator, NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+
+from ..cache import file_fingerprint
+from ..config import PRICES_CSV, RECIPES_CSV
+from .changes import diff_rows, row_hashes
+from .prices import PriceIndex
+from .recipes_db import load_recipes_db
+from .store import RecipeStore
+
+logger = logging.getLogger(__name__)
+
+
+class Snapshot(NamedTuple):
+    generation: int
+    recipes: RecipeStore
+    prices: PriceIndex
+    # state of recipes.csv that `recipes` reflects
+    recipes_fingerprint: str
+
+
+class DataManager:
+    def __init__(
+        self,
+        recipes_path=RECIPES_CSV,
+        prices_path=PRICES_CSV,
+        load_recipes: Callable[..., RecipeStore] = load_recipes_db,
+        store: Optional[RecipeStore] = None,
+    ):
+        """
+        `store`, when given, is used as the first generation's catalog (it
+        must match `recipes_path` as it is now).
+        """
+        self.recipes_path = recipes_path
+        self.prices_path = prices_path
+        self._load_recipes = load_recipes
+        self._initial_store = store
+        self._snapshot: Optional[Snapshot] = None
+        # (ids, row hashes) of the recipes.csv contents behind the current catalog
+        self._keys: Optional[pd.Index] = None
+        self._hashes: Optional[np.ndarray] = None
+        self._lock = threading.RLock()
+        self._pinned: ContextVar[Optional[Snapshot]] = ContextVar(f"recipe_agent_snapshot_{id(self)}", default=None)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # ---------------------- generations ----------------------
+    def _load(self) -> Snapshot:
+        fingerprint = file_fingerprint(self.recipes_path)
+        store = self._initial_store if self._initial_store is not None else self._load_recipes(self.recipes_path)
+        self._initial_store = None
+        prices = PriceIndex(self.prices_path, index=store.ingredient_index, watch=False)
+        return Snapshot(0, store, prices, fingerprint)
+
+    def current(self) -> Snapshot:
+        """
+        Latest generation (loaded on first use).
+        """
+        snap = self._snapshot
+        if snap is None:
+            with self._lock:
+                if self._snapshot is None:
+                    self._snapshot = self._load()
+                snap = self._snapshot
+        return snap
+
+    def snapshot(self) -> Snapshot:
+        """
+        The generation pinned by the running request, else the latest.
+        """
+        return self._pinned.get() or self.current()
+
+    @contextmanager
+    def pin(self) -> Iterator[Snapshot]:
+        """
+        Serve one generation to the enclosed code (including tasks and pool
+        threads that copy the context). Nested pins reuse the outer one.
+        """
+        pinned = self._pinned.get()
+        if pinned is not None:
+            yield pinned
+            return
+        snap = self.current()
+        token = self._pinned.set(snap)
+        try:
+            yield snap
+        finally:
+            self._pinned.reset(token)
+
+    # ---------------------- reloading ----------------------
+    def _read_recipes(self):
+        df = pd.read_csv(self.recipes_path)
+        keys = pd.Index(df["id"])
+        if not keys.is_unique:
+            # rows cannot be matched up; rebuild from scratch
+            logger.warning("%s has duplicate recipe ids; reloading it in full", self.recipes_path)
+            return df, None, None
+        return df, keys, row_hashes(df)
+
+    def _refresh_recipes(self, snap: Snapshot):
+        fingerprint = file_fingerprint(self.recipes_path)
+        if fingerprint == snap.recipes_fingerprint:
+            return snap.recipes, snap.recipes_fingerprint
+        if fingerprint == "missing":
+            logger.warning("%s is missing; keeping generation %d", self.recipes_path, snap.generation)
+            return snap.recipes, snap.recipes_fingerprint
+
+        df, keys, hashes = self._read_recipes()
+        old = snap.recipes
+        # no row hashes yet (first change since startup, the catalog was not
+        # parsed here) or no usable ones: rebuild; later changes are diffed
+        if self._keys is None or keys is None:
+            store = RecipeStore.from_frame(df, ingredient_index=old.ingredient_index)
+        else:
+            diff = diff_rows(self._keys, self._hashes, keys, hashes)
+            if diff.empty:
+                store = old
+            else:
+                store = old.apply_changes(df[diff.changed], self._keys[diff.deleted].to_numpy())
+                logger.info(
+                    "Applied recipe changes: %d added or updated, %d deleted",
+                    int(diff.changed.sum()), int(diff.deleted.sum()),
+                )
+        self._keys, self._hashes = keys, hashes
+        return store, fingerprint
+
+    def refresh(self) -> bool:
+        """
+        Apply any changes to the CSV files as a new generation. Returns
+        whether a new generation was published.
+        """
+        with self._lock:
+            snap = self.current()
+            recipes, recipes_fingerprint = self._refresh_recipes(snap)
+            prices = snap.prices
+            # an index that was never used loads the current file on first use
+            if prices.fingerprint is not None and file_fingerprint(self.prices_path) != prices.fingerprint:
+                prices = prices.reloaded()
+            if recipes is snap.recipes and prices is snap.prices:
+                return False
+            self._snapshot = Snapshot(snap.generation + 1, recipes, prices, recipes_fingerprint)
+            logger.info("Published data generation %d", snap.generation + 1)
+            return True
+
+    # ---------------------- watcher ----------------------
+    def start(self, interval: float) -> None:
+        """
+        Poll the files every `interval` seconds from a daemon thread.
+        """
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._watch, args=(interval,), name="recipe-agent-data-watcher", daemon=True,
+            )
+            self._thread.start()
+
+    def stop(self) -> None:
+        thread = self._thread
+        if thread is None:
+            return
+        self._stop.set()
+        thread.join()
+        self._thread = None
+
+    def _watch(self, interval: float) -> None:
+        while not self._stop.wait(interval):
+            try:
+                self.refresh()
+            except Exception:
+                # e.g. a file caught mid-write; the current generation keeps serving
+                logger.exception("Reloading recipe / price data failed")
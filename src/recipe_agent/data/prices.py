@@ -0,0 +1,173 @@
+"""
+In-memory ingredient price index.
+
+Loaded once from `ingredient_prices.csv` and reloaded only when the file's
+mtime or size changes. Offers are keyed on canonical ingredient ids from an
+`IngredientIndex` (shared with the recipe store when given), so "Tomatoes"
+finds the "tomato" rows. Names are matched by canonical key or synonym
+only, with no typo or modifier fallback, so a different product never gets a
+price. Per ingredient it keeps the k cheapest offers (cheapest first, ties in
+file order), so a basket lookup is one resolve plus one dict access per
+ingredient.
+
+Reloads are incremental: rows are diffed by (ingredient, store) against the
+previous load and only the ingredients they touch are re-ranked. The offers
+dict is replaced, never mutated, so a lookup in progress keeps a consistent
+view. `reloaded()` returns an updated copy instead of changing the index in
+place (the data manager keeps one per generation).
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Any, Dict, List, NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+
+from ..cache import file_fingerprint
+from ..config import PRICES_CSV
+from .changes import diff_rows, row_hashes
+from .ingredients import IngredientIndex
+
+Offer = Dict[str, Any]
+
+PRICE_COLUMNS = ("ingredient", "store", "price_usd", "unit")
+
+
+class _Loaded(NamedTuple):
+    fingerprint: Optional[str]
+    offers: Dict[int, List[Offer]]
+    keys: Optional[pd.Index] = None
+    hashes: Optional[np.ndarray] = None
+    cids: Optional[np.ndarray] = None
+
+
+_UNLOADED = _Loaded(None, {})
+
+
+def normalize_ingredient(name: str) -> str:
+    return str(name).lower().strip()
+
+
+class PriceIndex:
+    """
+    `watch=False` freezes the index after its first load (no file checks).
+    """
+    def __init__(
+        self,
+        path=PRICES_CSV,
+        k: int = 3,
+        index: Optional[IngredientIndex] = None,
+        watch: bool = True,
+    ):
+        self.path = path
+        self.k = k
+        self.index = index if index is not None else IngredientIndex()
+        self.watch = watch
+        self._state: _Loaded = _UNLOADED
+        self._lock = threading.Lock()
+
+    @property
+    def fingerprint(self) -> Optional[str]:
+        """
+        Fingerprint of the file contents currently indexed (None before the first load).
+        """
+        return self._state.fingerprint
+
+    def _read(self) -> pd.DataFrame:
+        df = pd.read_csv(self.path)
+        df["ingredient"] = df["ingredient"].map(normalize_ingredient)
+        df["store"] = df["store"].map(str)
+        cids = {ing: self.index.add(ing) for ing in df["ingredient"].unique()}
+        df["cid"] = df["ingredient"].map(cids)
+        return df
+
+    def _rank(self, df: pd.DataFrame) -> Dict[int, List[Offer]]:
+        df = df.sort_values(["cid", "price_usd"], kind="mergesort")
+        df = df.groupby("cid", sort=False).head(self.k)
+
+        offers: Dict[int, List[Offer]] = {}
+        rows = zip(df["cid"], df["ingredient"], df["store"], df["price_usd"], df["unit"])
+        for cid, ing, store, price, unit in rows:
+            offers.setdefault(int(cid), []).append({
+                "ingredient": ing,
+                "store": str(store),
+                "price_usd": float(price),
+                "unit": str(unit),
+            })
+        return offers
+
+    def _load(self, previous: _Loaded) -> _Loaded:
+        fingerprint = file_fingerprint(self.path)
+        df = self._read()
+        # repeated (ingredient, store) rows are told apart by their occurrence number
+        occurrence = df.groupby(["ingredient", "store"], sort=False).cumcount()
+        keys = pd.Index(df["ingredient"] + "\x1f" + df["store"] + "\x1f" + occurrence.map(str))
+        hashes = row_hashes(df, PRICE_COLUMNS)
+        cids = df["cid"].to_numpy()
+
+        if previous.keys is None:
+            return _Loaded(fingerprint, self._rank(df), keys, hashes, cids)
+
+        diff = diff_rows(previous.keys, previous.hashes, keys, hashes)
+        affected = set(cids[diff.changed].tolist()) | set(previous.cids[diff.deleted].tolist())
+        if not affected:
+            return _Loaded(fingerprint, previous.offers, keys, hashes, cids)
+        offers = {cid: found for cid, found in previous.offers.items() if cid not in affected}
+        offers.update(self._rank(df[df["cid"].isin(affected)]))
+        return _Loaded(fingerprint, offers, keys, hashes, cids)
+
+    def _offers(self) -> Dict[int, List[Offer]]:
+        state = self._state
+        if state.fingerprint is not None and not self.watch:
+            return state.offers
+        fingerprint = file_fingerprint(self.path)
+        if fingerprint != state.fingerprint:
+            with self._lock:
+                state = self._state
+                if fingerprint != state.fingerprint:
+                    state = self._load(state)
+                    self._state = state
+        return state.offers
+
+    def reloaded(self) -> "PriceIndex":
+        """
+        A frozen copy brought up to date with the file; offer lists of
+        untouched ingredients are shared with this index.
+        """
+        with self._lock:
+            state = self._load(self._state)
+        fresh = PriceIndex(self.path, self.k, self.index, watch=False)
+        fresh._state = state
+        return fresh
+
+    def offers(self, ingredient: str, k: Optional[int] = None) -> List[Offer]:
+        """
+        Up to `k` (default: the index's k) cheapest offers for one ingredient.
+        """
+        found = self._offers().get(self.index.resolve_exact(ingredient), [])
+        return [dict(o) for o in found[: k or self.k]]
+
+    def best(self, ingredient: str) -> Optional[Offer]:
+        found = self._offers().get(self.index.resolve_exact(ingredient))
+        return dict(found[0]) if found else None
+
+    def lookup(self, ingredients: List[str]) -> List[Offer]:
+        """
+        Cheapest offer per ingredient, or a row of None values when unknown.
+        """
+        offers = self._offers()
+        results = []
+        for ing in ingredients:
+            found = offers.get(self.index.resolve_exact(ing))
+            if found:
+                results.append(dict(found[0]))
+            else:
+                results.append({
+                    "ingredient": normalize_ingredient(ing),
+                    "store": None,
+                    "price_usd": None,
+                    "unit": None,
+                })
+        return results
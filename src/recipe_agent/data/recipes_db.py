@@ -31,83 +31,118 @@
 #      "dietary": ["vegan", "gluten-free"], "cuisine": "Comfort", "cooking_time": 35},
 # ]
 
+"""
+Shared data for the agents' tools. The recipe catalog, price index and wallet
+store are built on first use (thread-safe), not at import; `RECIPES_DB`,
+`PRICE_INDEX` and `WALLET` remain available as module attributes.
+
+The catalog and price index come from a `DataManager` (manager.py), which
+applies edits to the CSV files without a restart. Wrap a request in
+`pinned_snapshot()` so all of its reads see the same generation.
+"""
+
 from __future__ import annotations
-from typing import List, Dict, Any
-import pandas as pd
 
-from ..config import RECIPES_CSV, PRICES_CSV, WALLET_CSV
+import logging
+from typing import TYPE_CHECKING, ContextManager, List
+
+from ..config import CATALOG_ARTIFACT, DATA_RELOAD_INTERVAL, RECIPES_CSV, PRICES_CSV, WALLET_CSV, WALLET_DB
+from ..lazy import Lazy
+
+if TYPE_CHECKING:
+    from .manager import DataManager, Snapshot
+    from .prices import PriceIndex
+    from .store import RecipeStore
+    from .wallet import WalletStore
+
+logger = logging.getLogger(__name__)
+
+def load_recipes_db(path=RECIPES_CSV, artifact: str = CATALOG_ARTIFACT) -> RecipeStore:
+    """
+    Load the recipe catalog into a columnar RecipeStore.
+    Rows are available as dicts via indexing / iteration or `store.record(row)`.
+
+    With `artifact` "auto" or "use", a compiled catalog next to the CSV is
+    memory-mapped when it matches the CSV; "auto" also (re)compiles it after
+    parsing the CSV. "off" always parses the CSV.
+    """
+    from .artifact import artifact_dir, compile_catalog, is_fresh, load_catalog
+
+    if artifact != "off" and is_fresh(path):
+        try:
+            return load_catalog(artifact_dir(path))
+        except (OSError, ValueError) as exc:
+            # e.g. its version was deleted by a concurrent compile mid-load
+            logger.warning("Could not load the compiled catalog for %s (%s); parsing the CSV", path, exc)
+
+    import pandas as pd
+    from .store import RecipeStore
+
+    store = RecipeStore.from_frame(pd.read_csv(path))
+    if artifact == "auto":
+        try:
+            compile_catalog(path, store=store)
+        except OSError as exc:
+            logger.warning("Could not write the compiled catalog for %s: %s", path, exc)
+    return store
+
+def _load_data() -> DataManager:
+    from .manager import DataManager
+
+    manager = DataManager(RECIPES_CSV, PRICES_CSV)
+    if DATA_RELOAD_INTERVAL > 0:
+        manager.start(DATA_RELOAD_INTERVAL)
+    return manager
+
+def _load_wallet() -> WalletStore:
+    from .wallet import WalletStore
+
+    return WalletStore(WALLET_DB, WALLET_CSV)
+
+_DATA: Lazy[DataManager] = Lazy(_load_data)
+_WALLET: Lazy[WalletStore] = Lazy(_load_wallet)
+
+def get_data_manager() -> DataManager:
+    return _DATA.get()
+
+def get_recipes_db() -> RecipeStore:
+    return get_data_manager().snapshot().recipes
 
-def load_recipes_db(path=RECIPES_CSV) -> List[Dict[str, Any]]:
-    df = pd.read_csv(path)
-    out: List[Dict[str, Any]] = []
+def get_price_index() -> PriceIndex:
+    # shares the catalog's ingredient ids, so prices resolve names the same way search does
+    return get_data_manager().snapshot().prices
 
-    for _, r in df.iterrows():
-        dietary = []
-        if isinstance(r.get("dietary"), str) and r["dietary"].strip():
-            dietary = [x.strip() for x in r["dietary"].split("|") if x.strip()]
+def get_wallet() -> WalletStore:
+    return _WALLET.get()
 
-        ingredients = [x.strip() for x in str(r["ingredients"]).split("|") if x.strip()]
+def pinned_snapshot() -> ContextManager[Snapshot]:
+    return get_data_manager().pin()
 
-        out.append({
-            "id": int(r["id"]),
-            "name": str(r["name"]),
-            "cuisine": str(r["cuisine"]),
-            "cooking_time": int(r["cooking_time"]),
-            "dietary": dietary,
-            "ingredients": ingredients,
-            "instructions": str(r.get("instructions", "")),
-        })
+def catalog_version() -> str:
+    """
+    Fingerprint of the recipes.csv contents behind the catalog in use.
+    """
+    return get_data_manager().snapshot().recipes_fingerprint
 
-    return out
+_LAZY_ATTRS = {"RECIPES_DB": get_recipes_db, "PRICE_INDEX": get_price_index, "WALLET": get_wallet}
 
-# Load once at import time (same idea as your RECIPES_DB)
-RECIPES_DB = load_recipes_db()
+def __getattr__(name: str):
+    if name in _LAZY_ATTRS:
+        return _LAZY_ATTRS[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 # -------- Agent3 tool: ingredient prices --------
 def get_best_ingredient_prices(ingredients: List[str]):
-    df = pd.read_csv(PRICES_CSV)
-    df["ingredient"] = df["ingredient"].astype(str).str.lower().str.strip()
-
-    results = []
-    for ing in ingredients:
-        ing2 = ing.lower().strip()
-        sub = df[df["ingredient"] == ing2]
-        if sub.empty:
-            results.append({"ingredient": ing2, "store": None, "price_usd": None, "unit": None})
-        else:
-            best = sub.sort_values("price_usd", ascending=True).iloc[0]
-            results.append({
-                "ingredient": ing2,
-                "store": str(best["store"]),
-                "price_usd": float(best["price_usd"]),
-                "unit": str(best["unit"]),
-            })
-    return results
+    return get_price_index().lookup(ingredients)
 
 
 # -------- Agent4 tools: wallet --------
 def authenticate_wallet(user_id: str, pin: str) -> bool:
-    df = pd.read_csv(WALLET_CSV)
-    row = df[df["user_id"] == user_id]
-    return (not row.empty) and (str(row.iloc[0]["pin"]) == str(pin))
+    return get_wallet().authenticate(user_id, pin)
 
 def get_wallet_balance(user_id: str) -> float:
-    df = pd.read_csv(WALLET_CSV)
-    row = df[df["user_id"] == user_id]
-    return float(row.iloc[0]["balance_usd"])
+    return get_wallet().balance(user_id)
 
 def deduct_wallet(user_id: str, amount: float) -> float:
-    df = pd.read_csv(WALLET_CSV)
-    idx = df.index[df["user_id"] == user_id]
-    if len(idx) == 0:
-        raise ValueError("User not found")
-    i = idx[0]
-
-    bal = float(df.loc[i, "balance_usd"])
-    if amount > bal:
-        raise ValueError("Insufficient funds")
-
-    df.loc[i, "balance_usd"] = round(bal - amount, 2)
-    df.to_csv(WALLET_CSV, index=False)
-    return float(df.loc[i, "balance_usd"])
+    return get_wallet().deduct(user_id, amount)
@@ -0,0 +1,527 @@
+"""
+Columnar, NumPy-backed recipe catalog.
+
+Each column is stored once for the whole catalog instead of once per row dict:
+- `cooking_time` as an int array
+- `cuisine` as categorical codes into `cuisines`
+- `dietary` as a bitmask over `dietary_tags` (plus CSR ids to keep tag order)
+- `ingredients` as CSR-style id arrays into `ingredient_vocab`
+
+An ingredient -> recipe posting list (also CSR) is built on load, keyed on
+canonical ingredient ids from `IngredientIndex`, so "Tomatoes" in a query hits
+"tomato" in the catalog. The search filters and overlap counts run as
+vectorized masks. `record(row)` gives the
+original dict view of one row for existing callers.
+
+Stores are never modified in place: `apply_changes` returns a new store with
+rows added, replaced or removed, encoding only the changed rows and merging
+them into the existing columns and posting lists.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .ingredients import IngredientIndex
+
+MAX_DIETARY_TAGS = 64
+
+
+def _csr(rows: np.ndarray, values: Iterable[str], n_rows: int) -> Tuple[np.ndarray, np.ndarray, List[str]]:
+    """
+    Encode (row, value) pairs that are already grouped by row into
+    (offsets, ids, vocab). Vocab ids follow first appearance.
+    """
+    codes, uniques = pd.factorize(pd.Index(list(values), dtype=object))
+    counts = np.bincount(rows, minlength=n_rows) if len(rows) else np.zeros(n_rows, dtype=np.int64)
+    offsets = np.zeros(n_rows + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    return offsets, codes.astype(np.int32), [str(x) for x in uniques]
+
+
+def _split_column(col: pd.Series) -> Tuple[np.ndarray, List[str]]:
+    """
+    Split a '|' separated column into (row positions, stripped non-empty values).
+    """
+    parts = col.str.split("|").explode()
+    parts = parts.str.strip()
+    parts = parts[parts.notna() & (parts != "")]
+    return parts.index.to_numpy(dtype=np.int64), parts.tolist()
+
+
+def _merge_vocab(vocab: List[str], extra: List[str]) -> Tuple[List[str], np.ndarray]:
+    """
+    Append the unseen values of `extra` to `vocab`; return (merged vocab,
+    ids of `extra` in it). Existing ids are unchanged.
+    """
+    lookup = {v: i for i, v in enumerate(vocab)}
+    merged = list(vocab)
+    remap = np.empty(len(extra), dtype=np.int32)
+    for i, value in enumerate(extra):
+        if value not in lookup:
+            lookup[value] = len(merged)
+            merged.append(value)
+        remap[i] = lookup[value]
+    return merged, remap
+
+
+def _take_csr(offsets: np.ndarray, values: np.ndarray, order: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Rows `order` of a CSR (offsets, values) pair, as a new CSR pair. Values
+    are copied per run of consecutive rows; `apply_changes` orders are
+    mostly such runs.
+    """
+    lengths = np.diff(offsets)[order]
+    new_offsets = np.zeros(len(order) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=new_offsets[1:])
+    breaks = np.flatnonzero(np.diff(order) != 1) + 1
+    starts = np.concatenate([[0], breaks])
+    ends = np.concatenate([breaks, [len(order)]])
+    pieces = [values[offsets[order[lo]]:offsets[order[hi - 1] + 1]] for lo, hi in zip(starts, ends) if hi > lo]
+    return new_offsets, np.concatenate(pieces) if pieces else values[:0].copy()
+
+
+def _take_strings(old: Sequence, new: List[str], order: np.ndarray):
+    """
+    Rows `order` of `old` followed by `new`; string pools stay string pools.
+    """
+    from .artifact import StringPool
+
+    if isinstance(old, StringPool):
+        extra = StringPool.build(new)
+        return StringPool(*_take_csr(*_concat_csr(old.offsets, old.data, extra.offsets, extra.data), order))
+    combined = list(old) + list(new)
+    return [combined[i] for i in order]
+
+
+def _concat_csr(a_offsets, a_values, b_offsets, b_values) -> Tuple[np.ndarray, np.ndarray]:
+    return (
+        np.concatenate([a_offsets[:-1], b_offsets + a_offsets[-1]]),
+        np.concatenate([a_values, b_values]),
+    )
+
+
+class RecipeStore(Sequence):
+    def __init__(
+        self,
+        *,
+        ids: np.ndarray,
+        names: List[str],
+        cooking_time: np.ndarray,
+        cuisine_codes: np.ndarray,
+        cuisines: List[str],
+        dietary_offsets: np.ndarray,
+        dietary_ids: np.ndarray,
+        dietary_tags: List[str],
+        ing_offsets: np.ndarray,
+        ing_ids: np.ndarray,
+        ingredient_vocab: List[str],
+        instructions: List[str],
+        records: Optional[List[Dict[str, Any]]] = None,
+        ingredient_index: Optional[IngredientIndex] = None,
+        derived: Optional[Dict[str, np.ndarray]] = None,
+    ):
+        self.ids = ids
+        self.names = names
+        self.cooking_time = cooking_time
+        self.cuisine_codes = cuisine_codes
+        self.cuisines = cuisines
+        self.dietary_offsets = dietary_offsets
+        self.dietary_ids = dietary_ids
+        self.dietary_tags = dietary_tags
+        self.ing_offsets = ing_offsets
+        self.ing_ids = ing_ids
+        self.ingredient_vocab = ingredient_vocab
+        self.instructions = instructions
+        # Kept only when built from dicts, so record() returns them unchanged.
+        self._records = records
+        self.ingredient_index = ingredient_index if ingredient_index is not None else IngredientIndex()
+
+        self._build_derived(derived or {})
+
+    # ---------------------- construction ----------------------
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, ingredient_index: Optional[IngredientIndex] = None) -> "RecipeStore":
+        df = df.reset_index(drop=True)
+        n = len(df)
+
+        cuisine_codes, cuisines = pd.factorize(df["cuisine"].astype(str))
+
+        dietary_col = df["dietary"] if "dietary" in df else pd.Series([None] * n)
+        dietary_col = dietary_col.where(dietary_col.map(lambda x: isinstance(x, str)), "")
+        d_rows, d_values = _split_column(dietary_col.astype(object))
+        d_offsets, d_ids, d_tags = _csr(d_rows, d_values, n)
+
+        i_rows, i_values = _split_column(df["ingredients"].map(str).astype(object))
+        i_offsets, i_ids, i_vocab = _csr(i_rows, i_values, n)
+
+        instructions = df["instructions"].map(str).tolist() if "instructions" in df else [""] * n
+
+        return cls(
+            ids=df["id"].to_numpy(dtype=np.int64),
+            names=df["name"].map(str).tolist(),
+            cooking_time=df["cooking_time"].to_numpy(dtype=np.int64),
+            cuisine_codes=cuisine_codes.astype(np.int32),
+            cuisines=[str(x) for x in cuisines],
+            dietary_offsets=d_offsets,
+            dietary_ids=d_ids,
+            dietary_tags=d_tags,
+            ing_offsets=i_offsets,
+            ing_ids=i_ids,
+            ingredient_vocab=i_vocab,
+            instructions=instructions,
+            ingredient_index=ingredient_index,
+        )
+
+    @classmethod
+    def from_records(cls, records: List[Dict[str, Any]], ingredient_index: Optional[IngredientIndex] = None) -> "RecipeStore":
+        n = len(records)
+        d_rows: List[int] = []
+        d_values: List[str] = []
+        i_rows: List[int] = []
+        i_values: List[str] = []
+        for pos, r in enumerate(records):
+            for tag in r.get("dietary", []):
+                d_rows.append(pos)
+                d_values.append(tag)
+            for ing in r["ingredients"]:
+                i_rows.append(pos)
+                i_values.append(ing)
+
+        d_offsets, d_ids, d_tags = _csr(np.asarray(d_rows, dtype=np.int64), d_values, n)
+        i_offsets, i_ids, i_vocab = _csr(np.asarray(i_rows, dtype=np.int64), i_values, n)
+        cuisine_codes, cuisines = pd.factorize(pd.Index([str(r["cuisine"]) for r in records], dtype=object))
+
+        return cls(
+            ids=np.asarray([int(r.get("id", pos)) for pos, r in enumerate(records)], dtype=np.int64),
+            names=[str(r["name"]) for r in records],
+            cooking_time=np.asarray([int(r["cooking_time"]) for r in records], dtype=np.int64),
+            cuisine_codes=cuisine_codes.astype(np.int32),
+            cuisines=[str(x) for x in cuisines],
+            dietary_offsets=d_offsets,
+            dietary_ids=d_ids,
+            dietary_tags=d_tags,
+            ing_offsets=i_offsets,
+            ing_ids=i_ids,
+            ingredient_vocab=i_vocab,
+            instructions=[str(r.get("instructions", "")) for r in records],
+            records=records,
+            ingredient_index=ingredient_index,
+        )
+
+    def _build_derived(self, derived: Dict[str, np.ndarray]) -> None:
+        """
+        Build the search structures. Arrays in `derived` (a compiled artifact,
+        see artifact.py) are used as-is instead of being recomputed.
+        """
+        n = len(self.ids)
+        if len(self.dietary_tags) > MAX_DIETARY_TAGS:
+            raise ValueError(f"At most {MAX_DIETARY_TAGS} distinct dietary tags are supported")
+
+        # dietary bitmask
+        self.dietary_bits = {tag: np.uint64(1) << np.uint64(i) for i, tag in enumerate(self.dietary_tags)}
+        if "dietary_mask" in derived:
+            self.dietary_mask = derived["dietary_mask"]
+        else:
+            d_rows = np.repeat(np.arange(n, dtype=np.int64), np.diff(self.dietary_offsets))
+            self.dietary_mask = np.zeros(n, dtype=np.uint64)
+            np.bitwise_or.at(self.dietary_mask, d_rows, np.left_shift(np.uint64(1), self.dietary_ids.astype(np.uint64)))
+
+        # lowercase cuisine codes for case-insensitive matching
+        lower_codes, lower_cuisines = pd.factorize(pd.Index([c.lower() for c in self.cuisines], dtype=object))
+        self.cuisine_lookup = {str(c): i for i, c in enumerate(lower_cuisines)}
+        if "cuisine_lower_codes" in derived:
+            self.cuisine_lower_codes = derived["cuisine_lower_codes"]
+        else:
+            self.cuisine_lower_codes = lower_codes[self.cuisine_codes] if n else np.zeros(0, dtype=np.int64)
+
+        # ingredient posting lists keyed on canonical ingredient ids
+        key_codes = np.asarray([self.ingredient_index.add(x) for x in self.ingredient_vocab], dtype=np.int64)
+        self.postings_key_codes = key_codes
+        self._n_keys = len(self.ingredient_index)
+        stored = derived.get("postings_key_codes")
+        # compiled postings are only valid for the same id assignment (a shared
+        # index may already hold other ingredients)
+        if stored is not None and np.array_equal(stored, key_codes) and len(derived["postings_offsets"]) == self._n_keys + 1:
+            self.postings_rows = derived["postings_rows"]
+            self.postings_offsets = derived["postings_offsets"]
+            return
+        i_rows = np.repeat(np.arange(n, dtype=np.int64), np.diff(self.ing_offsets))
+        pairs = np.unique(key_codes[self.ing_ids].astype(np.int64) * max(n, 1) + i_rows)
+        self.postings_rows = pairs % max(n, 1)
+        self.postings_offsets = np.zeros(self._n_keys + 1, dtype=np.int64)
+        np.cumsum(np.bincount(pairs // max(n, 1), minlength=self._n_keys), out=self.postings_offsets[1:])
+
+    # ---------------------- incremental updates ----------------------
+    def apply_changes(self, upserts: pd.DataFrame, deleted_ids: Iterable[int] = ()) -> "RecipeStore":
+        """
+        Return a new store with `upserts` (recipes.csv rows, unique ids)
+        replacing the rows with the same id or appended after the existing
+        ones, and `deleted_ids` removed. This store is left unchanged.
+
+        Only the upserted rows are parsed; the other rows' columns and
+        postings are carried over with array gathers, so the cost grows with
+        the catalog size only through linear copies.
+        """
+        delta = RecipeStore.from_frame(upserts, ingredient_index=self.ingredient_index)
+        n_old = len(self)
+
+        # vocabularies only grow, so existing codes (and dietary bits) stay valid
+        cuisines, cuisine_remap = _merge_vocab(self.cuisines, delta.cuisines)
+        dietary_tags, dietary_remap = _merge_vocab(self.dietary_tags, delta.dietary_tags)
+        vocab, vocab_remap = _merge_vocab(self.ingredient_vocab, delta.ingredient_vocab)
+        if len(dietary_tags) > MAX_DIETARY_TAGS:
+            raise ValueError(f"At most {MAX_DIETARY_TAGS} distinct dietary tags are supported")
+
+        # old rows followed by the delta rows; `order` picks the final rows
+        replace_with = pd.Index(delta.ids).get_indexer(self.ids)
+        keep = ~np.isin(self.ids, np.fromiter(deleted_ids, dtype=np.int64))
+        order = np.where(replace_with >= 0, n_old + replace_with, np.arange(n_old))[keep]
+        appended = n_old + np.flatnonzero(~np.isin(delta.ids, self.ids))
+        order = np.concatenate([order, appended]).astype(np.int64)
+
+        d_offsets, d_ids = _concat_csr(self.dietary_offsets, self.dietary_ids, delta.dietary_offsets, dietary_remap[delta.dietary_ids])
+        i_offsets, i_ids = _concat_csr(self.ing_offsets, self.ing_ids, delta.ing_offsets, vocab_remap[delta.ing_ids])
+        d_offsets, d_ids = _take_csr(d_offsets, d_ids, order)
+        i_offsets, i_ids = _take_csr(i_offsets, i_ids, order)
+
+        delta_mask = np.zeros(len(delta), dtype=np.uint64)
+        d_rows = np.repeat(np.arange(len(delta), dtype=np.int64), np.diff(delta.dietary_offsets))
+        np.bitwise_or.at(delta_mask, d_rows, np.left_shift(np.uint64(1), dietary_remap[delta.dietary_ids].astype(np.uint64)))
+
+        derived = {
+            "dietary_mask": np.concatenate([self.dietary_mask, delta_mask])[order],
+            **self._merged_postings(delta, keep, replace_with, appended - n_old, vocab),
+        }
+        return RecipeStore(
+            ids=np.concatenate([self.ids, delta.ids])[order],
+            names=_take_strings(self.names, delta.names, order),
+            cooking_time=np.concatenate([self.cooking_time, delta.cooking_time])[order],
+            cuisine_codes=np.concatenate([self.cuisine_codes, cuisine_remap[delta.cuisine_codes]]).astype(np.int32)[order],
+            cuisines=cuisines,
+            dietary_offsets=d_offsets,
+            dietary_ids=d_ids,
+            dietary_tags=dietary_tags,
+            ing_offsets=i_offsets,
+            ing_ids=i_ids,
+            ingredient_vocab=vocab,
+            instructions=_take_strings(self.instructions, delta.instructions, order),
+            ingredient_index=self.ingredient_index,
+            derived=derived,
+        )
+
+    def _merged_postings(self, delta: "RecipeStore", keep, replace_with, appended, vocab) -> Dict[str, np.ndarray]:
+        """
+        Posting lists for `apply_changes`: the surviving old entries are
+        renumbered (which keeps them sorted) and the delta's entries are
+        merged in with a binary search.
+        """
+        n_kept = int(keep.sum())
+        n_new = n_kept + len(appended)
+        width = max(n_new, 1)
+        new_pos = np.cumsum(keep) - 1
+
+        old_keys = np.repeat(np.arange(self._n_keys, dtype=np.int64), np.diff(self.postings_offsets))
+        old_rows = np.asarray(self.postings_rows)
+        live = keep[old_rows] & (replace_with[old_rows] < 0)
+        old_pairs = old_keys[live] * width + new_pos[old_rows[live]]
+
+        # final position of each delta row (deleted ids in the delta are dropped)
+        delta_pos = np.full(len(delta), -1, dtype=np.int64)
+        replaced = np.flatnonzero(keep & (replace_with >= 0))
+        delta_pos[replace_with[replaced]] = new_pos[replaced]
+        delta_pos[appended] = n_kept + np.arange(len(appended))
+        d_keys = np.repeat(np.arange(delta._n_keys, dtype=np.int64), np.diff(delta.postings_offsets))
+        d_rows = delta_pos[delta.postings_rows]
+        d_pairs = np.sort(d_keys[d_rows >= 0] * width + d_rows[d_rows >= 0])
+
+        pairs = np.insert(old_pairs, np.searchsorted(old_pairs, d_pairs), d_pairs)
+        n_keys = len(self.ingredient_index)
+        offsets = np.zeros(n_keys + 1, dtype=np.int64)
+        np.cumsum(np.bincount(pairs // width, minlength=n_keys), out=offsets[1:])
+        return {
+            "postings_rows": pairs % width,
+            "postings_offsets": offsets,
+            "postings_key_codes": np.asarray([self.ingredient_index.add(x) for x in vocab], dtype=np.int64),
+        }
+
+    def ingredient_key_ids(self, ingredients: Iterable[str]) -> List[int]:
+        """
+        Distinct canonical ids of the query ingredients that have postings.
+        """
+        ids = set()
+        for name in ingredients:
+            cid = self.ingredient_index.resolve(name)
+            # ids added to a shared index after this store was built have no postings
+            if cid is not None and cid < self._n_keys:
+                ids.add(cid)
+        return sorted(ids)
+
+    # ---------------------- row views ----------------------
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __getitem__(self, row):
+        if isinstance(row, slice):
+            return [self.record(i) for i in range(*row.indices(len(self)))]
+        return self.record(row)
+
+    def ingredients(self, row: int) -> List[str]:
+        lo, hi = self.ing_offsets[row], self.ing_offsets[row + 1]
+        return [self.ingredient_vocab[i] for i in self.ing_ids[lo:hi]]
+
+    def dietary(self, row: int) -> List[str]:
+        lo, hi = self.dietary_offsets[row], self.dietary_offsets[row + 1]
+        return [self.dietary_tags[i] for i in self.dietary_ids[lo:hi]]
+
+    def record(self, row: int) -> Dict[str, Any]:
+        if row < 0:
+            row += len(self)
+        if not 0 <= row < len(self):
+            raise IndexError("recipe row out of range")
+        if self._records is not None:
+            return dict(self._records[row])
+        return {
+            "id": int(self.ids[row]),
+            "name": self.names[row],
+            "cuisine": self.cuisines[self.cuisine_codes[row]],
+            "cooking_time": int(self.cooking_time[row]),
+            "dietary": self.dietary(row),
+            "ingredients": self.ingredients(row),
+            "instructions": self.instructions[row],
+        }
+
+    # ---------------------- vectorized search ----------------------
+    def overlap_counts(self, ingredients: Iterable[str]) -> np.ndarray:
+        """
+        Number of distinct (canonical) query ingredients each recipe contains.
+        """
+        keys = self.ingredient_key_ids(ingredients)
+        if not keys:
+            return np.zeros(len(self), dtype=np.int64)
+        rows = np.concatenate([
+            self.postings_rows[self.postings_offsets[k]:self.postings_offsets[k + 1]] for k in keys
+        ])
+        return np.bincount(rows, minlength=len(self))
+
+    def filter_mask(self, dietary: Iterable[str], max_time: Optional[int]) -> np.ndarray:
+        mask = np.ones(len(self), dtype=bool)
+        dietary = set(dietary)
+        if dietary:
+            if not dietary.issubset(self.dietary_bits):
+                return np.zeros(len(self), dtype=bool)
+            need = np.uint64(0)
+            for tag in dietary:
+                need |= self.dietary_bits[tag]
+            mask &= (self.dietary_mask & need) == need
+        if max_time is not None:
+            mask &= self.cooking_time <= max_time
+        return mask
+
+    def search(
+        self,
+        ingredients: Iterable[str],
+        dietary: Iterable[str],
+        max_time: Optional[int],
+        cuisine_pref: Optional[str],
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Return (rows, scores) of matching recipes in catalog order.
+        """
+        ingredients = list(ingredients)
+        mask = self.filter_mask(dietary, max_time)
+        counts = self.overlap_counts(ingredients)
+        if ingredients:
+            mask &= counts > 0
+
+        scores = counts.copy()
+        cuisine_code = self.cuisine_lookup.get((cuisine_pref or "").lower()) if cuisine_pref else None
+        if cuisine_code is not None:
+            scores += 2 * (self.cuisine_lower_codes == cuisine_code)
+
+        rows = np.flatnonzero(mask)
+        return rows, scores[rows]
+
+    def search_many(
+        self,
+        queries: List[Tuple[Iterable[str], Iterable[str], Optional[int], Optional[str]]],
+        max_cells: int = 8_000_000,
+    ) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """
+        `search` for many (ingredients, dietary, max_time, cuisine_pref) queries at
+        once: overlap counts, filters and cuisine bonus are computed as
+        (queries x recipes) matrices, in chunks of at most `max_cells` cells.
+        """
+        n = len(self)
+        chunk = max(1, max_cells // max(n, 1))
+        out: List[Tuple[np.ndarray, np.ndarray]] = []
+        for start in range(0, len(queries), chunk):
+            out.extend(self._search_chunk(queries[start:start + chunk]))
+        return out
+
+    def _search_chunk(self, queries) -> List[Tuple[np.ndarray, np.ndarray]]:
+        n, m = len(self), len(queries)
+        no_limit = np.iinfo(np.int64).max
+
+        q_rows: List[np.ndarray] = []
+        q_ids: List[np.ndarray] = []
+        has_ingredients = np.zeros(m, dtype=bool)
+        max_times = np.full(m, no_limit, dtype=np.int64)
+        need = np.zeros(m, dtype=np.uint64)
+        impossible = np.zeros(m, dtype=bool)
+        cuisine_codes = np.full(m, -1, dtype=np.int64)
+
+        for q, (ingredients, dietary, max_time, cuisine_pref) in enumerate(queries):
+            ingredients = list(ingredients)
+            has_ingredients[q] = bool(ingredients)
+            for k in self.ingredient_key_ids(ingredients):
+                rows = self.postings_rows[self.postings_offsets[k]:self.postings_offsets[k + 1]]
+                q_rows.append(rows)
+                q_ids.append(np.full(len(rows), q, dtype=np.int64))
+            if max_time is not None:
+                max_times[q] = max_time
+            for tag in set(dietary):
+                if tag in self.dietary_bits:
+                    need[q] |= self.dietary_bits[tag]
+                else:
+                    impossible[q] = True
+            if cuisine_pref:
+                cuisine_codes[q] = self.cuisine_lookup.get(cuisine_pref.lower(), -1)
+
+        if q_rows:
+            flat = np.concatenate(q_ids) * n + np.concatenate(q_rows)
+            counts = np.bincount(flat, minlength=m * n).reshape(m, n)
+        else:
+            counts = np.zeros((m, n), dtype=np.int64)
+
+        mask = (self.cooking_time[None, :] <= max_times[:, None])
+        mask &= (self.dietary_mask[None, :] & need[:, None]) == need[:, None]
+        mask &= ~impossible[:, None]
+        mask &= ~has_ingredients[:, None] | (counts > 0)
+        scores = counts + 2 * ((self.cuisine_lower_codes[None, :] == cuisine_codes[:, None]) & (cuisine_codes[:, None] >= 0))
+
+        results = []
+        for q in range(m):
+            rows = np.flatnonzero(mask[q])
+            results.append((rows, scores[q, rows]))
+        return results
+
+
+_STORE_CACHE: Tuple[Any, Optional[RecipeStore]] = (None, None)
+
+def as_recipe_store(recipes) -> RecipeStore:
+    """
+    Return `recipes` as a RecipeStore, converting (and caching) a plain list of dicts.
+    """
+    global _STORE_CACHE
+    if isinstance(recipes, RecipeStore):
+        return recipes
+    cached_for, store = _STORE_CACHE
+    if cached_for is not recipes or store is None:
+        store = RecipeStore.from_records(list(recipes))
+        _STORE_CACHE = (recipes, store)
+    return store
@@ -0,0 +1,116 @@
+"""
+SQLite-backed wallet store.
+
+- WAL mode, one connection per thread, primary-key lookups by user_id.
+- Balances are stored as integer cents; deductions run inside
+  `BEGIN IMMEDIATE` so concurrent sessions cannot lose updates.
+- On first open the table is imported once from `wallet.csv`; after that the
+  database is the source of truth.
+"""
+
+from __future__ import annotations
+
+import csv
+import sqlite3
+import threading
+from pathlib import Path
+
+from ..config import WALLET_CSV, WALLET_DB
+
+
+def _to_cents(amount: float) -> int:
+    return int(round(float(amount) * 100))
+
+
+class WalletStore:
+    def __init__(self, db_path=WALLET_DB, csv_path=WALLET_CSV):
+        self.db_path = Path(db_path)
+        self.csv_path = Path(csv_path)
+        self._local = threading.local()
+        self._init_lock = threading.Lock()
+        self._initialized = False
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.db_path), timeout=30, isolation_level=None)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        if not self._initialized:
+            with self._init_lock:
+                if not self._initialized:
+                    # switching the journal mode does not wait on the busy
+                    # timeout, so only one thread does it (it persists in the file)
+                    conn.execute("PRAGMA journal_mode=WAL")
+                    self._init_schema(conn)
+                    self._initialized = True
+        return conn
+
+    def _init_schema(self, conn: sqlite3.Connection) -> None:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS wallets ("
+                "user_id TEXT PRIMARY KEY, pin TEXT NOT NULL, balance_cents INTEGER NOT NULL)"
+            )
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            imported = conn.execute("SELECT value FROM meta WHERE key = 'csv_imported'").fetchone()
+            if imported is None and self.csv_path.exists():
+                with open(self.csv_path, newline="") as f:
+                    rows = [
+                        (r["user_id"].strip(), r["pin"].strip(), _to_cents(r["balance_usd"]))
+                        for r in csv.DictReader(f)
+                    ]
+                conn.executemany("INSERT OR IGNORE INTO wallets VALUES (?, ?, ?)", rows)
+                conn.execute("INSERT INTO meta VALUES ('csv_imported', ?)", (str(self.csv_path),))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def open(self) -> None:
+        """
+        Open this thread's connection and run the one-time schema/CSV import now.
+        """
+        self._conn()
+
+    def _row(self, user_id: str):
+        return self._conn().execute(
+            "SELECT pin, balance_cents FROM wallets WHERE user_id = ?", (str(user_id),)
+        ).fetchone()
+
+    def authenticate(self, user_id: str, pin: str) -> bool:
+        row = self._row(user_id)
+        return row is not None and row[0] == str(pin).strip()
+
+    def balance(self, user_id: str) -> float:
+        row = self._row(user_id)
+        if row is None:
+            raise ValueError("User not found")
+        return row[1] / 100
+
+    def deduct(self, user_id: str, amount: float) -> float:
+        cents = _to_cents(amount)
+        if cents < 0:
+            raise ValueError("Amount must be positive")
+
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT balance_cents FROM wallets WHERE user_id = ?", (str(user_id),)
+            ).fetchone()
+            if row is None:
+                raise ValueError("User not found")
+            if cents > row[0]:
+                raise ValueError("Insufficient funds")
+            new_balance = row[0] - cents
+            conn.execute(
+                "UPDATE wallets SET balance_cents = ? WHERE user_id = ?", (new_balance, str(user_id))
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return new_balance / 100
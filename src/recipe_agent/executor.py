@@ -0,0 +1,36 @@
+"""
+Bounded thread pool for blocking work (CPU-bound search, sync-only clients)
+reached from async code, so it never runs on the event loop thread.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from .config import BLOCKING_WORKERS
+
+_executor: Optional[ThreadPoolExecutor] = None
+_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=BLOCKING_WORKERS, thread_name_prefix="recipe-agent")
+    return _executor
+
+
+async def run_blocking(fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """
+    Run `fn` in the bounded pool, keeping the caller's context variables.
+    """
+    ctx = contextvars.copy_context()
+    call = functools.partial(ctx.run, fn, *args, **kwargs)
+    return await asyncio.get_running_loop().run_in_executor(get_executor(), call)
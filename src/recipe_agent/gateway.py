@@ -0,0 +1,501 @@
+"""
+One gateway in front of every LLM call in the process.
+
+`LLMGateway` admits calls from a priority queue (interactive before batch,
+first come first served within a priority) when all limits allow:
+- a requests-per-minute and a tokens-per-minute token bucket (tokens are
+  estimated up front and corrected with the reported usage afterwards);
+- a cap on calls in flight.
+
+Failed calls that are worth repeating (429, 5xx, connection errors) are
+retried with full-jitter exponential backoff, honouring `Retry-After`; a 429
+also pauses admissions for everyone for that delay. Identical concurrent
+calls (same `key`) are coalesced: one upstream call, every caller gets a copy
+of its result.
+
+Priority is a context variable, so it follows the code into tasks and pool
+threads:
+
+    with priority(BATCH):
+        llm.batch(...)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import copy
+import heapq
+import itertools
+import logging
+import random
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Awaitable, Callable, Iterator, List, Optional, TypeVar
+
+from .config import LLM_MAX_CONCURRENCY, LLM_MAX_RETRIES, LLM_REQUESTS_PER_MINUTE, LLM_TOKENS_PER_MINUTE
+from .lazy import Lazy
+from .metrics import METRICS
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+INTERACTIVE = 0
+BATCH = 1
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BATCH: "batch"}
+
+_PRIORITY: ContextVar[int] = ContextVar("recipe_agent_llm_priority", default=INTERACTIVE)
+# set while a call admitted by the gateway runs (e.g. _generate delegating to _stream)
+_ADMITTED: ContextVar[bool] = ContextVar("recipe_agent_llm_admitted", default=False)
+
+
+@contextmanager
+def priority(level: int) -> Iterator[None]:
+    """
+    LLM calls made inside the block are queued with `level`.
+    """
+    token = _PRIORITY.set(level)
+    try:
+        yield
+    finally:
+        _PRIORITY.reset(token)
+
+
+class TokenBucket:
+    """
+    Refills `per_minute` units per minute, holding at most `capacity` (one
+    minute's worth by default). Not thread-safe; the gateway locks around it.
+    """
+    def __init__(self, per_minute: float, capacity: Optional[float] = None, clock=time.monotonic):
+        self.rate = per_minute / 60.0
+        self.capacity = float(capacity if capacity is not None else per_minute)
+        self.level = self.capacity
+        self._clock = clock
+        self._updated = clock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """
+        Seconds until `amount` units are available (0 if they are now). An
+        amount over the capacity only waits for a full bucket.
+        """
+        self._refill()
+        missing = min(amount, self.capacity) - self.level
+        return max(0.0, missing / self.rate)
+
+    def take(self, amount: float) -> None:
+        self._refill()
+        self.level -= amount
+
+    def adjust(self, amount: float) -> None:
+        """
+        Take `amount` more units (or give them back when negative); the level
+        may go below zero, which delays the next callers.
+        """
+        self._refill()
+        self.level = min(self.capacity, self.level - amount)
+
+
+@dataclass(order=True)
+class _Waiter:
+    priority: int
+    seq: int
+    tokens: int = field(compare=False)
+    wake: Callable[[], None] = field(compare=False)
+    granted: bool = field(default=False, compare=False)
+
+
+def _retryable(exc: BaseException) -> bool:
+    try:
+        import openai
+    except ImportError:
+        return False
+    return isinstance(exc, (openai.RateLimitError, openai.APIConnectionError, openai.InternalServerError))
+
+
+def _retry_after(exc: BaseException) -> Optional[float]:
+    headers = getattr(getattr(exc, "response", None), "headers", None) or {}
+    try:
+        if "retry-after-ms" in headers:
+            return float(headers["retry-after-ms"]) / 1000
+        if "retry-after" in headers:
+            return float(headers["retry-after"])
+    except ValueError:
+        pass
+    return None
+
+
+class LLMGateway:
+    def __init__(
+        self,
+        requests_per_minute: Optional[float] = LLM_REQUESTS_PER_MINUTE,
+        tokens_per_minute: Optional[float] = LLM_TOKENS_PER_MINUTE,
+        max_concurrency: Optional[int] = LLM_MAX_CONCURRENCY,
+        max_retries: int = LLM_MAX_RETRIES,
+        base_delay: float = 0.5,
+        max_delay: float = 30.0,
+        clock=time.monotonic,
+    ):
+        """
+        A falsy limit disables it.
+        """
+        self.requests = TokenBucket(requests_per_minute, clock=clock) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute, clock=clock) if tokens_per_minute else None
+        self.max_concurrency = max_concurrency or None
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._queue: List[_Waiter] = []
+        self._seq = itertools.count()
+        self._active = 0
+        self._paused_until = 0.0
+        self._inflight: dict = {}
+        # calls, coalesced, retries, rate_limited
+        self.stats: Counter = Counter()
+
+    # ---------------------- admission ----------------------
+    def _delay(self, tokens: int) -> Optional[float]:
+        """
+        Seconds until a call of `tokens` fits the limits; None while it waits
+        for a call to finish.
+        """
+        if self.max_concurrency is not None and self._active >= self.max_concurrency:
+            return None
+        waits = [0.0, self._paused_until - self._clock()]
+        if self.requests is not None:
+            waits.append(self.requests.wait_time(1))
+        if self.tokens is not None:
+            waits.append(self.tokens.wait_time(tokens))
+        return max(waits)
+
+    def _dispatch(self, polling: Optional[_Waiter] = None) -> Optional[float]:
+        """
+        Admit waiters from the head of the queue while the limits allow.
+        Returns the head's delay, if it has to wait for time to pass.
+        """
+        while self._queue:
+            head = self._queue[0]
+            delay = self._delay(head.tokens)
+            if delay is None:
+                return None
+            if delay > 0:
+                if head is not polling:
+                    # it may be waiting for a release that already happened:
+                    # wake it up so it sleeps on the delay instead
+                    head.wake()
+                return delay
+            heapq.heappop(self._queue)
+            if self.requests is not None:
+                self.requests.take(1)
+            if self.tokens is not None:
+                self.tokens.take(head.tokens)
+            self._active += 1
+            head.granted = True
+            head.wake()
+        return None
+
+    def _enqueue(self, tokens: int, wake: Callable[[], None]) -> _Waiter:
+        waiter = _Waiter(_PRIORITY.get(), next(self._seq), tokens, wake)
+        with self._lock:
+            heapq.heappush(self._queue, waiter)
+        return waiter
+
+    def _poll(self, waiter: _Waiter) -> Optional[float]:
+        with self._lock:
+            return None if waiter.granted else self._dispatch(waiter)
+
+    def _abandon(self, waiter: _Waiter) -> None:
+        with self._lock:
+            if waiter.granted:
+                self._active -= 1
+            else:
+                self._queue.remove(waiter)
+                heapq.heapify(self._queue)
+            self._dispatch()
+
+    def _admitted(self, waiter: _Waiter, start: float) -> None:
+        level = PRIORITY_NAMES.get(waiter.priority, str(waiter.priority))
+        METRICS.record("gateway", "queue", time.perf_counter() - start, priority=level)
+
+    def _acquire(self, tokens: int) -> None:
+        start = time.perf_counter()
+        event = threading.Event()
+        waiter = self._enqueue(tokens, event.set)
+        try:
+            while True:
+                event.clear()
+                delay = self._poll(waiter)
+                if waiter.granted:
+                    break
+                event.wait(delay)
+        except BaseException:
+            self._abandon(waiter)
+            raise
+        self._admitted(waiter, start)
+
+    async def _aacquire(self, tokens: int) -> None:
+        start = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        event = asyncio.Event()
+        waiter = self._enqueue(tokens, lambda: loop.call_soon_threadsafe(event.set))
+        try:
+            while True:
+                event.clear()
+                delay = self._poll(waiter)
+                if waiter.granted:
+                    break
+                try:
+                    await asyncio.wait_for(event.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+        except BaseException:
+            self._abandon(waiter)
+            raise
+        self._admitted(waiter, start)
+
+    def _release(self, estimated: int, used: Optional[int]) -> None:
+        with self._lock:
+            self._active -= 1
+            if used is not None and self.tokens is not None:
+                self.tokens.adjust(used - estimated)
+            self._dispatch()
+
+    # ---------------------- retries ----------------------
+    def _backoff(self, attempt: int, exc: BaseException) -> Optional[float]:
+        """
+        Seconds the caller sleeps before retrying after `exc`, or None to give
+        up. After a 429 the whole queue is paused instead (and this returns 0).
+        """
+        if attempt >= self.max_retries or not _retryable(exc):
+            return None
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        retry_after = _retry_after(exc)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        logger.warning("LLM call failed (%s), retry %d in %.2fs", type(exc).__name__, attempt + 1, delay)
+        METRICS.record("gateway", "retry", delay, error=type(exc).__name__)
+        with self._lock:
+            self.stats["retries"] += 1
+            if getattr(exc, "status_code", None) == 429:
+                # the provider is over its limit for everyone: hold the whole queue
+                self.stats["rate_limited"] += 1
+                self._paused_until = max(self._paused_until, self._clock() + delay)
+                return 0.0
+        return delay
+
+    # ---------------------- coalescing ----------------------
+    def _join(self, key: str):
+        """
+        (future, leader): the first caller for `key` leads, the others wait on
+        its future.
+        """
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                self.stats["coalesced"] += 1
+                return future, False
+            future = self._inflight[key] = concurrent.futures.Future()
+            return future, True
+
+    def _settle(self, key: str, future: concurrent.futures.Future, result=None, exc: Optional[BaseException] = None) -> None:
+        with self._lock:
+            self._inflight.pop(key, None)
+        if exc is None:
+            future.set_result(result)
+        elif isinstance(exc, Exception):
+            future.set_exception(exc)
+        else:
+            # the leader was cancelled: followers make the call themselves
+            future.cancel()
+
+    # ---------------------- calls ----------------------
+    def _call(self, call: Callable[[], T], tokens: int, usage: Callable[[T], Optional[int]]) -> T:
+        for attempt in itertools.count():
+            self._acquire(tokens)
+            used = None
+            admitted = _ADMITTED.set(True)
+            try:
+                result = call()
+                used = usage(result)
+                return result
+            except Exception as exc:
+                delay = self._backoff(attempt, exc)
+                if delay is None:
+                    raise
+            finally:
+                _ADMITTED.reset(admitted)
+                self._release(tokens, used)
+            time.sleep(delay)
+        raise AssertionError("unreachable")
+
+    async def _acall(self, call: Callable[[], Awaitable[T]], tokens: int, usage: Callable[[T], Optional[int]]) -> T:
+        for attempt in itertools.count():
+            await self._aacquire(tokens)
+            used = None
+            admitted = _ADMITTED.set(True)
+            try:
+                result = await call()
+                used = usage(result)
+                return result
+            except Exception as exc:
+                delay = self._backoff(attempt, exc)
+                if delay is None:
+                    raise
+            finally:
+                _ADMITTED.reset(admitted)
+                self._release(tokens, used)
+            await asyncio.sleep(delay)
+        raise AssertionError("unreachable")
+
+    def invoke(
+        self,
+        call: Callable[[], T],
+        *,
+        tokens: int = 0,
+        key: Optional[str] = None,
+        usage: Callable[[T], Optional[int]] = lambda result: None,
+    ) -> T:
+        """
+        Run `call` once admitted, retrying failures that are worth it.
+        `tokens` is the estimated cost, `usage(result)` the reported one;
+        concurrent calls with the same `key` share one run.
+        """
+        if _ADMITTED.get():
+            return call()
+        while key is not None:
+            future, leader = self._join(key)
+            if leader:
+                break
+            try:
+                return copy.deepcopy(future.result())
+            except concurrent.futures.CancelledError:
+                continue
+        self.stats["calls"] += 1
+        if key is None:
+            return self._call(call, tokens, usage)
+        try:
+            result = self._call(call, tokens, usage)
+        except BaseException as exc:
+            self._settle(key, future, exc=exc)
+            raise
+        self._settle(key, future, result)
+        return result
+
+    async def ainvoke(
+        self,
+        call: Callable[[], Awaitable[T]],
+        *,
+        tokens: int = 0,
+        key: Optional[str] = None,
+        usage: Callable[[T], Optional[int]] = lambda result: None,
+    ) -> T:
+        """
+        Async `invoke`.
+        """
+        if _ADMITTED.get():
+            return await call()
+        while key is not None:
+            future, leader = self._join(key)
+            if leader:
+                break
+            try:
+                # shielded: a cancelled follower must not cancel the shared call
+                return copy.deepcopy(await asyncio.shield(asyncio.wrap_future(future)))
+            except asyncio.CancelledError:
+                if not future.cancelled() or asyncio.current_task().cancelling():
+                    raise
+        self.stats["calls"] += 1
+        if key is None:
+            return await self._acall(call, tokens, usage)
+        try:
+            result = await self._acall(call, tokens, usage)
+        except BaseException as exc:
+            self._settle(key, future, exc=exc)
+            raise
+        self._settle(key, future, result)
+        return result
+
+    def stream(
+        self,
+        open_stream: Callable[[], Iterator[T]],
+        *,
+        tokens: int = 0,
+        usage: Callable[[T], Optional[int]] = lambda chunk: None,
+    ) -> Iterator[T]:
+        """
+        Admit a streamed call. It is retried only until its first chunk
+        (a partial answer cannot be taken back), and never coalesced.
+        """
+        if _ADMITTED.get():
+            yield from open_stream()
+            return
+        self.stats["calls"] += 1
+        for attempt in itertools.count():
+            self._acquire(tokens)
+            used, started = None, False
+            try:
+                for chunk in open_stream():
+                    started = True
+                    used = usage(chunk) or used
+                    yield chunk
+                return
+            except Exception as exc:
+                delay = None if started else self._backoff(attempt, exc)
+                if delay is None:
+                    raise
+            finally:
+                self._release(tokens, used)
+            time.sleep(delay)
+
+    async def astream(
+        self,
+        open_stream: Callable[[], AsyncIterator[T]],
+        *,
+        tokens: int = 0,
+        usage: Callable[[T], Optional[int]] = lambda chunk: None,
+    ) -> AsyncIterator[T]:
+        """
+        Async `stream`.
+        """
+        if _ADMITTED.get():
+            async for chunk in open_stream():
+                yield chunk
+            return
+        self.stats["calls"] += 1
+        for attempt in itertools.count():
+            await self._aacquire(tokens)
+            used, started = None, False
+            try:
+                async for chunk in open_stream():
+                    started = True
+                    used = usage(chunk) or used
+                    yield chunk
+                return
+            except Exception as exc:
+                delay = None if started else self._backoff(attempt, exc)
+                if delay is None:
+                    raise
+            finally:
+                self._release(tokens, used)
+            await asyncio.sleep(delay)
+
+
+_GATEWAY: Lazy[LLMGateway] = Lazy(LLMGateway)
+
+
+def get_gateway() -> LLMGateway:
+    """
+    The process-wide gateway shared by every chat model.
+    """
+    return _GATEWAY.get()
@@ -1,40 +1,141 @@
 from __future__ import annotations
 import os
+from typing import TYPE_CHECKING, Dict
 from dotenv import load_dotenv
 
-from langchain_openai import ChatOpenAI
+from langchain_core.runnables import RunnableLambda
 from langgraph.graph import StateGraph, END
 
+from .cache import TieredCache, VersionBoundCache, build_response_cache
+from .config import (
+    SEARCH_TOP_K,
+    CANDIDATE_TOKEN_BUDGET,
+    RANKER_MODE,
+    EXTRACT_CACHE_SIZE,
+    RECOMMEND_CACHE_SIZE,
+    RECOMMEND_CACHE_MAX_BYTES,
+    GRAPH_MODE,
+    FAST_PATH_THRESHOLD,
+)
+from .data import recipes_db
+from .lazy import Lazy
+from .lexicon import Lexicon, VersionBoundLexicon
+from .metrics import instrument_node
 from .state import RecipeAgentState
-from .nodes.search_recipes import search_recipes
+from .nodes.search_recipes import search_recipes_factory
 from .nodes.extract_user_preferences import extract_user_preferences_factory
-from .nodes.rank_recipes import rank_recipes_factory
+from .nodes.rank_recipes import rank_recipes_factory, get_ranker
 from .nodes.generate_recommendation import generate_recommendation_factory
+from .nodes.rank_and_recommend import rank_and_recommend_factory
 
+if TYPE_CHECKING:
+    from langchain_openai import ChatOpenAI
 
 load_dotenv()
 
-def get_llm() -> ChatOpenAI:
-    return ChatOpenAI(
+def _make_llm() -> ChatOpenAI:
+    from .llm import chat_model
+
+    return chat_model(
         model="gpt-4o-mini",
         api_key=os.getenv("OPENAI_API_KEY"),
         temperature=0,
+        stream_usage=True,
+    )
+
+_LLM: Lazy[ChatOpenAI] = Lazy(_make_llm)
+
+def get_llm() -> ChatOpenAI:
+    """
+    Shared chat client (on the LLM gateway), created on first use.
+    """
+    return _LLM.get()
+
+def as_node(fn):
+    """
+    Wrap a node function so the graph runs its `afunc` (if any) under ainvoke.
+    Every run records a "node" metrics event.
+    """
+    fn = instrument_node(fn)
+    return RunnableLambda(fn, afunc=getattr(fn, "afunc", None), name=fn.__name__)
+
+def _recommend_cache(name: str) -> VersionBoundCache:
+    # replies depend on recipe contents, so entries are tied to the catalog
+    # version the request searched (hot reloads start a new namespace)
+    return VersionBoundCache(
+        build_response_cache(name, max_entries=RECOMMEND_CACHE_SIZE, max_bytes=RECOMMEND_CACHE_MAX_BYTES),
+        recipes_db.catalog_version,
     )
 
-def build_recipe_graph():
+# Shared by every graph and by recommend_recipes_batch, so a request served
+# one way is a cache hit the other way
+_EXTRACT_CACHE: Lazy[TieredCache] = Lazy(lambda: build_response_cache("extract", max_entries=EXTRACT_CACHE_SIZE))
+_RECOMMEND_CACHES: Dict[str, Lazy[VersionBoundCache]] = {
+    "sequential": Lazy(lambda: _recommend_cache("recommend")),
+    "fused": Lazy(lambda: _recommend_cache("rank_and_recommend")),
+}
+# fast-path lexicon of the catalog generation in use, rebuilt after hot reloads
+_LEXICON: Lazy[VersionBoundLexicon] = Lazy(lambda: VersionBoundLexicon(
+    lambda: Lexicon.from_store(recipes_db.get_recipes_db()),
+    recipes_db.catalog_version,
+))
+
+def get_extract_cache() -> TieredCache:
+    return _EXTRACT_CACHE.get()
+
+def get_recommend_cache(mode: str = "sequential") -> VersionBoundCache:
+    return _RECOMMEND_CACHES[mode].get()
+
+def get_lexicon() -> VersionBoundLexicon:
+    lexicon = _LEXICON.get()
+    lexicon.get()  # built with the graph (startup warmup), not on the first request
+    return lexicon
+
+def build_recipe_graph(
+    top_k=SEARCH_TOP_K,
+    candidate_token_budget=CANDIDATE_TOKEN_BUDGET,
+    ranker=RANKER_MODE,
+    streaming=False,
+    mode=GRAPH_MODE,
+    fast_path_threshold=FAST_PATH_THRESHOLD,
+):
+    """
+    mode="sequential": extract -> search -> rank -> generate.
+    mode="fused": extract -> search -> rank_and_recommend (one structured LLM
+    call returns the ranking and the final text; `ranker` is not used).
+
+    Extraction tries the catalog lexicon first; `fast_path_threshold` > 1
+    always goes to the LLM.
+    """
+    if mode not in ("sequential", "fused"):
+        raise ValueError(f"Unknown graph mode: {mode!r}")
     llm = get_llm()
 
     g = StateGraph(RecipeAgentState)
-    g.add_node("extract_user_preferences", extract_user_preferences_factory(llm))
-    g.add_node("search_recipes", search_recipes)
-    g.add_node("rank_recipes", rank_recipes_factory(llm))
-    g.add_node("generate_recommendation", generate_recommendation_factory(llm))
-
+    g.add_node(
+        "extract_user_preferences",
+        as_node(extract_user_preferences_factory(
+            llm,
+            cache=get_extract_cache(),
+            lexicon=get_lexicon() if fast_path_threshold <= 1 else None,
+            threshold=fast_path_threshold,
+        )),
+    )
+    g.add_node("search_recipes", as_node(search_recipes_factory(top_k, candidate_token_budget)))
+    recommend_cache = get_recommend_cache(mode)
 
     g.set_entry_point("extract_user_preferences")
     g.add_edge("extract_user_preferences", "search_recipes")
-    g.add_edge("search_recipes", "rank_recipes")
-    g.add_edge("rank_recipes", "generate_recommendation")
-    g.add_edge("generate_recommendation", END)
+
+    if mode == "fused":
+        g.add_node("rank_and_recommend", as_node(rank_and_recommend_factory(llm, cache=recommend_cache, streaming=streaming)))
+        g.add_edge("search_recipes", "rank_and_recommend")
+        g.add_edge("rank_and_recommend", END)
+    else:
+        g.add_node("rank_recipes", as_node(rank_recipes_factory(ranker=get_ranker(ranker, llm))))
+        g.add_node("generate_recommendation", as_node(generate_recommendation_factory(llm, cache=recommend_cache, streaming=streaming)))
+        g.add_edge("search_recipes", "rank_recipes")
+        g.add_edge("rank_recipes", "generate_recommendation")
+        g.add_edge("generate_recommendation", END)
 
     return g.compile()
@@ -0,0 +1,40 @@
+"""
+Build-once values for expensive module state (data stores, LLM clients, the
+compiled graph, the ADK runner), so importing the package stays cheap and the
+work happens on first use or in `runtime.warmup()`.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Callable, Generic, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class Lazy(Generic[T]):
+    """
+    Thread-safe lazy value: `factory` runs at most once, on the first `get()`.
+    """
+    def __init__(self, factory: Callable[[], T]):
+        self._factory = factory
+        self._value: Optional[T] = None
+        self._ready = False
+        self._lock = threading.Lock()
+
+    @property
+    def initialized(self) -> bool:
+        return self._ready
+
+    def get(self) -> T:
+        if not self._ready:
+            with self._lock:
+                if not self._ready:
+                    self._value = self._factory()
+                    self._ready = True
+        return self._value
+
+    def reset(self) -> None:
+        with self._lock:
+            self._value = None
+            self._ready = False
@@ -0,0 +1,242 @@
+"""
+Local fast-path preference parser.
+
+The vocabulary (ingredients, cuisines, dietary tags) comes from the recipe
+catalog and is matched with an Aho-Corasick automaton in one pass over the
+message; cooking times are pulled out with regexes. `Lexicon.parse` returns a
+`UserInput` plus a confidence: the share of content words the parse explains.
+The extractor only skips the LLM when the confidence clears a threshold.
+
+`VersionBoundLexicon` rebuilds the lexicon when the catalog version changes
+(hot reloads), so the vocabulary is that of the catalog a request searches.
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+from collections import deque
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from .schemas import UserInput
+
+INGREDIENT, CUISINE, DIETARY = "ingredient", "cuisine", "dietary"
+
+# words that carry no preference information on their own
+FILLER = frozenset("""
+a an the and or with some i i'm im have has got we me my our you can could would
+please want wanna need something anything make cook give suggest recipe recipes meal
+dish dishes for to of in on at under within less than max maximum up about around
+only just also plus minutes minute mins min hours hour hrs hr quick fast easy
+dinner lunch breakfast today tonight what is are there any that it food left over
+leftover leftovers fridge pantry at most diet style like
+""".split())
+
+# words that change the meaning of nearby terms; the parser does not model them
+NEGATIONS = frozenset("no not without except avoid allergic don't dont isn't never but".split())
+
+_TOKEN = re.compile(r"[a-z0-9]+(?:['-][a-z0-9]+)*")
+_TIME = re.compile(
+    r"\b(\d{1,3})\s*-?\s*(minutes?|mins?|m|hours?|hrs?|h)\b"
+    r"|\b(half an hour|an hour|one hour)\b"
+)
+
+
+def _inflections(term: str) -> List[str]:
+    """
+    The term plus its naive singular/plural counterpart ("egg" <-> "eggs").
+    """
+    forms = [term]
+    if term.endswith("ies"):
+        forms.append(term[:-3] + "y")
+    elif term.endswith("oes"):
+        forms.append(term[:-2])
+    elif term.endswith("s") and not term.endswith("ss"):
+        forms.append(term[:-1])
+    elif term.endswith("y") and len(term) > 2 and term[-2] not in "aeiou":
+        forms.append(term[:-1] + "ies")
+    elif term.endswith(("x", "ch", "sh", "o")):
+        forms.append(term + "es")
+    else:
+        forms.append(term + "s")
+    return forms
+
+
+class _Automaton:
+    """
+    Aho-Corasick automaton over lowercase patterns.
+    """
+    def __init__(self, patterns: Dict[str, Tuple[str, str]]):
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.out: List[List[Tuple[int, Tuple[str, str]]]] = [[]]
+
+        for pattern, value in patterns.items():
+            state = 0
+            for ch in pattern:
+                nxt = self.goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto[state][ch] = nxt
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append([])
+                state = nxt
+            self.out[state].append((len(pattern), value))
+
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self.goto[state].items():
+                queue.append(nxt)
+                f = self.fail[state]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[nxt] = self.goto[f].get(ch, 0)
+                self.out[nxt] = self.out[nxt] + self.out[self.fail[nxt]]
+
+    def find(self, text: str) -> Iterable[Tuple[int, int, Tuple[str, str]]]:
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(ch, 0)
+            for length, value in self.out[state]:
+                yield i - length + 1, i + 1, value
+
+
+def _is_boundary(text: str, i: int) -> bool:
+    return i < 0 or i >= len(text) or not text[i].isalnum()
+
+
+class Lexicon:
+    def __init__(self, ingredients: Iterable[str], cuisines: Iterable[str], dietary: Iterable[str]):
+        patterns: Dict[str, Tuple[str, str]] = {}
+        for tag in dietary:
+            for form in {tag.lower(), tag.lower().replace("-", " ")}:
+                patterns[form] = (DIETARY, tag)
+        for cuisine in cuisines:
+            patterns.setdefault(cuisine.lower(), (CUISINE, cuisine))
+        for ing in ingredients:
+            for form in _inflections(ing.lower()):
+                patterns.setdefault(form, (INGREDIENT, ing))
+        self._automaton = _Automaton(patterns)
+
+    @classmethod
+    def from_store(cls, store) -> "Lexicon":
+        return cls(store.ingredient_vocab, store.cuisines, store.dietary_tags)
+
+    def _spans(self, text: str) -> List[Tuple[int, int, Tuple[str, str]]]:
+        """
+        Leftmost-longest, non-overlapping, whole-word matches.
+        """
+        found = [
+            (start, end, value) for start, end, value in self._automaton.find(text)
+            if _is_boundary(text, start - 1) and _is_boundary(text, end)
+        ]
+        found.sort(key=lambda m: (m[0], -(m[1] - m[0])))
+        spans, last_end = [], 0
+        for start, end, value in found:
+            if start >= last_end:
+                spans.append((start, end, value))
+                last_end = end
+        return spans
+
+    def parse(self, text: str) -> Tuple[UserInput, float]:
+        text = (text or "").lower()
+        spans = self._spans(text)
+
+        times = list(_TIME.finditer(text))
+        max_time: Optional[int] = None
+        if times:
+            m = times[0]
+            if m.group(1):
+                value = int(m.group(1))
+                max_time = value * 60 if m.group(2).startswith("h") else value
+            else:
+                max_time = 30 if m.group(3) == "half an hour" else 60
+
+        covered = [(s, e) for s, e, _ in spans] + [m.span() for m in times]
+        content = uncovered = 0
+        for tok in _TOKEN.finditer(text):
+            word = tok.group()
+            if word in NEGATIONS:
+                return UserInput(), 0.0
+            if word in FILLER:
+                continue
+            content += 1
+            if not any(s <= tok.start() and tok.end() <= e for s, e in covered):
+                uncovered += 1
+
+        ingredients: List[str] = []
+        dietary: List[str] = []
+        cuisines: List[str] = []
+        for _, _, (kind, value) in spans:
+            target = ingredients if kind == INGREDIENT else dietary if kind == DIETARY else cuisines
+            if value not in target:
+                target.append(value)
+
+        result = UserInput(
+            ingredients=ingredients,
+            dietary_restrictions=dietary,
+            max_cooking_time=max_time,
+            cuisine_preference=cuisines[0] if cuisines else None,
+        )
+        # several cuisines or times are ambiguous; leave those to the LLM
+        if content == 0 or len(cuisines) > 1 or len(times) > 1:
+            return result, 0.0
+        return result, (content - uncovered) / content
+
+
+class VersionBoundLexicon:
+    """
+    The lexicon for `version()`, built by `build()` on first use of each
+    version. The last `keep` versions are kept, so requests still pinned to
+    the previous generation do not force rebuilds.
+    """
+    def __init__(self, build: Callable[[], Lexicon], version: Callable[[], str], keep: int = 2):
+        self.build = build
+        self.version = version
+        self.keep = keep
+        self._lexicons: Dict[str, Lexicon] = {}
+        self._lock = threading.Lock()
+
+    def get(self) -> Lexicon:
+        version = self.version()
+        lexicon = self._lexicons.get(version)
+        if lexicon is None:
+            with self._lock:
+                lexicon = self._lexicons.get(version)
+                if lexicon is None:
+                    lexicon = self.build()
+                    lexicons = dict(self._lexicons)
+                    lexicons[version] = lexicon
+                    while len(lexicons) > self.keep:
+                        del lexicons[next(iter(lexicons))]
+                    self._lexicons = lexicons
+        return lexicon
+
+    def parse(self, text: str) -> Tuple[UserInput, float]:
+        return self.get().parse(text)
+
+
+class FastPathStats:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def record(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+FAST_PATH_STATS = FastPathStats()
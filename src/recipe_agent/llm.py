@@ -0,0 +1,108 @@
+"""
+Chat models for every node and agent, routed through the process-wide
+`LLMGateway` (rate limits, priorities, retries, coalescing; see gateway.py).
+
+`chat_model(**kwargs)` takes the usual ChatOpenAI arguments. The client's own
+retries are turned off: the gateway retries, so a retry waits its turn in the
+queue like any other call.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from typing import Any, List, Optional
+
+from langchain_core.messages import BaseMessage
+from langchain_openai import ChatOpenAI
+from pydantic import Field
+
+from .gateway import LLMGateway, get_gateway
+from .metrics import LLM_METRICS
+from .tokens import estimate_tokens
+
+# completion tokens assumed for the rate limit when max_tokens is not set
+# (corrected with the reported usage once the call returns)
+COMPLETION_TOKENS_ESTIMATE = 256
+
+
+def _result_tokens(result) -> Optional[int]:
+    usage = (result.llm_output or {}).get("token_usage") or {}
+    if usage.get("total_tokens") is not None:
+        return usage["total_tokens"]
+    for gen in result.generations:
+        meta = getattr(gen.message, "usage_metadata", None)
+        if meta:
+            return meta.get("total_tokens")
+    return None
+
+
+def _chunk_tokens(chunk) -> Optional[int]:
+    meta = getattr(chunk.message, "usage_metadata", None)
+    return meta.get("total_tokens") if meta else None
+
+
+class GatewayChatOpenAI(ChatOpenAI):
+    """
+    ChatOpenAI whose calls are admitted by an `LLMGateway`. Identical
+    concurrent non-streamed calls (same parameters, messages and bound
+    tools / output schema) share one upstream call.
+    """
+    gateway: Optional[Any] = Field(default=None, exclude=True)
+
+    def _gateway(self) -> LLMGateway:
+        return self.gateway or get_gateway()
+
+    def _estimate(self, messages: List[BaseMessage]) -> int:
+        prompt = sum(estimate_tokens(m.content if isinstance(m.content, str) else str(m.content)) for m in messages)
+        return prompt + (self.max_tokens or COMPLETION_TOKENS_ESTIMATE)
+
+    def _key(self, messages: List[BaseMessage], stop, kwargs) -> str:
+        payload = [
+            self.openai_api_base,
+            self._default_params,
+            [m.model_dump(exclude={"id"}) for m in messages],
+            stop,
+            kwargs,
+        ]
+        return hashlib.sha256(json.dumps(payload, sort_keys=True, default=repr).encode("utf-8")).hexdigest()
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        return self._gateway().invoke(
+            lambda: super(GatewayChatOpenAI, self)._generate(messages, stop, run_manager, **kwargs),
+            tokens=self._estimate(messages),
+            key=self._key(messages, stop, kwargs),
+            usage=_result_tokens,
+        )
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        return await self._gateway().ainvoke(
+            lambda: super(GatewayChatOpenAI, self)._agenerate(messages, stop, run_manager, **kwargs),
+            tokens=self._estimate(messages),
+            key=self._key(messages, stop, kwargs),
+            usage=_result_tokens,
+        )
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        yield from self._gateway().stream(
+            lambda: super(GatewayChatOpenAI, self)._stream(messages, stop, run_manager, **kwargs),
+            tokens=self._estimate(messages),
+            usage=_chunk_tokens,
+        )
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        async for chunk in self._gateway().astream(
+            lambda: super(GatewayChatOpenAI, self)._astream(messages, stop, run_manager, **kwargs),
+            tokens=self._estimate(messages),
+            usage=_chunk_tokens,
+        ):
+            yield chunk
+
+
+def chat_model(**kwargs: Any) -> GatewayChatOpenAI:
+    """
+    A chat model on the shared gateway, reporting to the LLM metrics.
+    """
+    kwargs.setdefault("callbacks", [LLM_METRICS])
+    kwargs.setdefault("max_retries", 0)
+    return GatewayChatOpenAI(**kwargs)
@@ -0,0 +1,328 @@
+"""
+Latency, token and cache instrumentation.
+
+Events are flat dicts ({"kind", "name", "seconds", ...fields}) recorded for
+every graph node ("node"), every chat model call ("llm") and every ADK turn
+("adk"), and fanned out to pluggable sinks:
+- `HistogramRegistry`: in-process latency histograms plus per-field totals,
+  rendered in Prometheus text format by `to_prometheus()`;
+- `JsonlSink`: one JSON object per line, appended to a file;
+- `serve_prometheus(port)`: a `/metrics` endpoint over the default registry.
+
+Code running inside a span (a node, an ADK turn) adds fields with
+`annotate(cache_hit=True)`; LLM calls made inside a node add their token
+counts to that node's event as well.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from .config import METRICS_HOST, METRICS_JSONL
+
+logger = logging.getLogger(__name__)
+
+Event = Dict[str, Any]
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# (name, fields) of the innermost open span
+_SPAN: ContextVar[Optional[Tuple[str, Dict[str, Any]]]] = ContextVar("recipe_agent_metrics_span", default=None)
+
+
+def annotate(**fields: Any) -> None:
+    """
+    Add fields to the event of the innermost open span (no-op outside one).
+    """
+    span = _SPAN.get()
+    if span is not None:
+        span[1].update(fields)
+
+
+def _add(span: Dict[str, Any], field: str, value: Optional[int]) -> None:
+    if value is not None:
+        span[field] = span.get(field, 0) + value
+
+
+# ---------------------- sinks ----------------------
+class HistogramRegistry:
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS, prefix: str = "recipe_agent"):
+        self.buckets = tuple(sorted(buckets))
+        self.prefix = prefix
+        self._series: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, event: Event) -> None:
+        key = (event["kind"], event["name"])
+        seconds = float(event["seconds"])
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = {"count": 0, "sum": 0.0, "buckets": [0] * len(self.buckets), "totals": {}}
+                self._series[key] = series
+            series["count"] += 1
+            series["sum"] += seconds
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    series["buckets"][i] += 1
+            for field, value in event.items():
+                # numbers and flags become running totals (cache_hit -> hits)
+                if field not in ("kind", "name", "seconds", "ts") and isinstance(value, (int, float)):
+                    series["totals"][field] = series["totals"].get(field, 0) + value
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {
+                f"{kind}:{name}": {
+                    "count": s["count"],
+                    "sum": s["sum"],
+                    "buckets": dict(zip(self.buckets, s["buckets"])),
+                    "totals": dict(s["totals"]),
+                }
+                for (kind, name), s in self._series.items()
+            }
+
+    def quantile(self, kind: str, name: str, q: float) -> Optional[float]:
+        """
+        Upper bucket bound below which a `q` share of observations fall.
+        """
+        with self._lock:
+            series = self._series.get((kind, name))
+            if series is None or not series["count"]:
+                return None
+            target = q * series["count"]
+            for bound, count in zip(self.buckets, series["buckets"]):
+                if count >= target:
+                    return bound
+            return float("inf")
+
+    def reset(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+    def to_prometheus(self) -> str:
+        with self._lock:
+            series = sorted(self._series.items())
+        lines: List[str] = []
+        typed = set()
+        for (kind, name), s in series:
+            metric = f"{self.prefix}_{kind}_seconds"
+            label = name.replace("\\", "\\\\").replace('"', '\\"')
+            if metric not in typed:
+                lines.append(f"# TYPE {metric} histogram")
+                typed.add(metric)
+            for bound, count in zip(self.buckets, s["buckets"]):
+                lines.append(f'{metric}_bucket{{name="{label}",le="{bound}"}} {count}')
+            lines.append(f'{metric}_bucket{{name="{label}",le="+Inf"}} {s["count"]}')
+            lines.append(f'{metric}_sum{{name="{label}"}} {s["sum"]}')
+            lines.append(f'{metric}_count{{name="{label}"}} {s["count"]}')
+            for field, total in sorted(s["totals"].items()):
+                counter = f"{self.prefix}_{kind}_{field}_total"
+                if counter not in typed:
+                    lines.append(f"# TYPE {counter} counter")
+                    typed.add(counter)
+                lines.append(f'{counter}{{name="{label}"}} {total}')
+        return "\n".join(lines) + "\n"
+
+
+class JsonlSink:
+    def __init__(self, path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+    def record(self, event: Event) -> None:
+        line = json.dumps(event, default=str)
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+
+# ---------------------- recording ----------------------
+class Metrics:
+    def __init__(self, sinks=()):
+        self.sinks = list(sinks)
+
+    def add_sink(self, sink) -> None:
+        self.sinks.append(sink)
+
+    def remove_sink(self, sink) -> None:
+        self.sinks.remove(sink)
+
+    def record(self, kind: str, name: str, seconds: float, **fields: Any) -> None:
+        event = {"ts": time.time(), "kind": kind, "name": name, "seconds": seconds, **fields}
+        for sink in list(self.sinks):
+            try:
+                sink.record(event)
+            except Exception:
+                logger.exception("Metrics sink %r failed", sink)
+
+    @contextmanager
+    def span(self, kind: str, name: str, **fields: Any) -> Iterator[Dict[str, Any]]:
+        """
+        Time the block and record one event; the yielded dict (also reachable
+        through `annotate`) becomes the event's extra fields.
+        """
+        data: Dict[str, Any] = dict(fields)
+        token = _SPAN.set((name, data))
+        start = time.perf_counter()
+        try:
+            yield data
+        except BaseException as exc:
+            data["error"] = type(exc).__name__
+            raise
+        finally:
+            seconds = time.perf_counter() - start
+            _SPAN.reset(token)
+            self.record(kind, name, seconds, **data)
+
+
+REGISTRY = HistogramRegistry()
+METRICS = Metrics([REGISTRY])
+if METRICS_JSONL:
+    METRICS.add_sink(JsonlSink(METRICS_JSONL))
+
+
+def _node_fields(out: Any) -> Dict[str, Any]:
+    if not isinstance(out, dict):
+        return {}
+    fields: Dict[str, Any] = {}
+    if "matched_recipes" in out:
+        fields["candidates"] = len(out["matched_recipes"] or [])
+    if "total_matches" in out:
+        fields["total_matches"] = out["total_matches"]
+    return fields
+
+
+def instrument_node(fn, metrics: Optional[Metrics] = None):
+    """
+    Wrap a node (and its `afunc`, if any) so each run records a "node" event
+    with wall time and candidate counts.
+    """
+    metrics = metrics or METRICS
+    name = fn.__name__
+
+    def node(state):
+        with metrics.span("node", name) as span:
+            out = fn(state)
+            span.update(_node_fields(out))
+            return out
+
+    node.__name__ = name
+    afunc = getattr(fn, "afunc", None)
+    if afunc is not None:
+        async def anode(state):
+            with metrics.span("node", name) as span:
+                out = await afunc(state)
+                span.update(_node_fields(out))
+                return out
+
+        node.afunc = anode
+    return node
+
+
+# ---------------------- LLM calls ----------------------
+def _usage(response) -> Tuple[Optional[int], Optional[int]]:
+    usage = (response.llm_output or {}).get("token_usage") or {}
+    if usage:
+        return usage.get("prompt_tokens"), usage.get("completion_tokens")
+    for gens in response.generations:
+        for gen in gens:
+            meta = getattr(getattr(gen, "message", None), "usage_metadata", None)
+            if meta:
+                return meta.get("input_tokens"), meta.get("output_tokens")
+    return None, None
+
+
+class LLMMetricsHandler(BaseCallbackHandler):
+    """
+    LangChain callback: one "llm" event per chat model call, named after the
+    model, with prompt/completion tokens and the enclosing node (if any).
+    """
+    def __init__(self, metrics: Optional[Metrics] = None):
+        self.metrics = metrics or METRICS
+        self._runs: Dict[Any, Tuple[float, str, Optional[Tuple[str, Dict[str, Any]]]]] = {}
+        self._lock = threading.Lock()
+
+    def _start(self, run_id, serialized, kwargs) -> None:
+        params = kwargs.get("invocation_params") or {}
+        model = (
+            params.get("model_name") or params.get("model")
+            or (kwargs.get("metadata") or {}).get("ls_model_name")
+            or (serialized or {}).get("name") or "llm"
+        )
+        with self._lock:
+            self._runs[run_id] = (time.perf_counter(), str(model), _SPAN.get())
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs) -> None:
+        self._start(run_id, serialized, kwargs)
+
+    def on_llm_start(self, serialized, prompts, *, run_id, **kwargs) -> None:
+        self._start(run_id, serialized, kwargs)
+
+    def _finish(self, run_id, **fields: Any) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            started = self._runs.pop(run_id, None)
+        if started is None:
+            return None
+        start, model, parent = started
+        if parent is not None:
+            fields["node"] = parent[0]
+        self.metrics.record("llm", model, time.perf_counter() - start, **fields)
+        return parent[1] if parent is not None else None
+
+    def on_llm_end(self, response, *, run_id, **kwargs) -> None:
+        prompt_tokens, completion_tokens = _usage(response)
+        fields = {k: v for k, v in (("prompt_tokens", prompt_tokens), ("completion_tokens", completion_tokens)) if v is not None}
+        parent = self._finish(run_id, **fields)
+        if parent is not None:
+            _add(parent, "prompt_tokens", prompt_tokens)
+            _add(parent, "completion_tokens", completion_tokens)
+
+    def on_llm_error(self, error, *, run_id, **kwargs) -> None:
+        self._finish(run_id, error=type(error).__name__)
+
+
+LLM_METRICS = LLMMetricsHandler()
+
+
+# ---------------------- Prometheus endpoint ----------------------
+def serve_prometheus(
+    port: int,
+    host: str = METRICS_HOST,
+    registry: Optional[HistogramRegistry] = None,
+) -> ThreadingHTTPServer:
+    """
+    Serve `registry.to_prometheus()` at /metrics from a daemon thread (on
+    loopback unless RECIPE_METRICS_HOST says otherwise).
+    """
+    registry = registry or REGISTRY
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.to_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name="recipe-agent-metrics", daemon=True).start()
+    return server
@@ -1,11 +1,17 @@
-from .search_recipes import search_recipes
+from .search_recipes import search_recipes, search_recipes_factory
 from .extract_user_preferences import extract_user_preferences_factory
-from .rank_recipes import rank_recipes_factory
+from .rank_recipes import rank_recipes_factory, get_ranker, LLMRanker, LocalRanker
 from .generate_recommendation import generate_recommendation_factory
+from .rank_and_recommend import rank_and_recommend_factory
 
 __all__ = [
     "search_recipes",
+    "search_recipes_factory",
     "extract_user_preferences_factory",
     "rank_recipes_factory",
+    "get_ranker",
+    "LLMRanker",
+    "LocalRanker",
     "generate_recommendation_factory",
+    "rank_and_recommend_factory",
 ]
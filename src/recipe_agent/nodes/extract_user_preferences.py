@@ -1,25 +1,114 @@
 from __future__ import annotations
-from typing import Dict, Any
+import hashlib
+import logging
+from typing import TYPE_CHECKING, Dict, Any, Optional
 
-from langchain_openai import ChatOpenAI
+from ..cache import TieredCache, make_cache_key, model_name, normalize_text
+from ..config import FAST_PATH_THRESHOLD
+from ..lexicon import FAST_PATH_STATS, Lexicon, VersionBoundLexicon
+from ..metrics import annotate
 from ..schemas import UserInput
 from ..prompts import EXTRACTION_SYSTEM
 from ..state import RecipeAgentState
 
+if TYPE_CHECKING:
+    from langchain_openai import ChatOpenAI
+
+logger = logging.getLogger(__name__)
+
+PROMPT_HASH = hashlib.sha256(EXTRACTION_SYSTEM.encode("utf-8")).hexdigest()
+
 def build_extractor(llm: ChatOpenAI):
     return llm.with_structured_output(UserInput)
 
-def extract_user_preferences_factory(llm: ChatOpenAI):
+def _message_text(message) -> tuple:
+    if isinstance(message, dict):
+        return message.get("role", ""), normalize_text(message.get("content", ""))
+    return getattr(message, "type", ""), normalize_text(getattr(message, "content", ""))
+
+def extraction_cache_key(llm: ChatOpenAI, messages) -> str:
+    """
+    Normalized message text + extraction prompt hash + model name.
+    """
+    return make_cache_key("extract", model_name(llm), PROMPT_HASH, [_message_text(m) for m in messages])
+
+def _as_update(response: UserInput) -> Dict[str, Any]:
+    return {
+        "ingredients": response.ingredients,
+        "dietary_restrictions": response.dietary_restrictions,
+        "max_cooking_time": response.max_cooking_time,
+        "cuisine_preference": response.cuisine_preference,
+    }
+
+def parse_fast_path(lexicon: Lexicon | VersionBoundLexicon, text: str, threshold: float) -> Optional[UserInput]:
+    """
+    The lexicon's parse of `text` if its confidence is at least `threshold`,
+    else None (the LLM extracts). Records the fast-path hit rate.
+    """
+    result, confidence = lexicon.parse(text)
+    hit = confidence >= threshold
+    FAST_PATH_STATS.record(hit)
+    annotate(fast_path=hit)
+    logger.debug("Fast-path confidence %.2f (%s), hit rate %.2f",
+                 confidence, "hit" if hit else "miss", FAST_PATH_STATS.hit_rate)
+    return result if hit else None
+
+def extract_user_preferences_factory(
+    llm: ChatOpenAI,
+    cache: Optional[TieredCache] = None,
+    lexicon: Optional[Lexicon | VersionBoundLexicon] = None,
+    threshold: float = FAST_PATH_THRESHOLD,
+):
+    """
+    Build the extraction node. The returned function is the sync node; its
+    `afunc` attribute is the async variant (uses `extractor.ainvoke`).
+
+    With a `lexicon`, single-message turns are parsed locally first and the
+    LLM is skipped when the parse confidence is at least `threshold`.
+    """
     extractor = build_extractor(llm)
 
+    def _fast_path(state: RecipeAgentState) -> Optional[UserInput]:
+        messages = state["messages"]
+        if lexicon is None or len(messages) != 1:
+            return None
+        text = messages[0].get("content", "") if isinstance(messages[0], dict) else messages[0].content
+        return parse_fast_path(lexicon, text, threshold)
+
+    def _lookup(state: RecipeAgentState):
+        if cache is None:
+            return None, None
+        key = extraction_cache_key(llm, state["messages"])
+        cached = cache.get(key)
+        annotate(cache_hit=cached is not None)
+        return key, (UserInput.model_validate_json(cached) if cached is not None else None)
+
+    def _store(key: Optional[str], response) -> None:
+        if cache is not None and isinstance(response, UserInput):
+            cache.set(key, response.model_dump_json())
+
+    def _messages(state: RecipeAgentState):
+        return [{"role": "system", "content": EXTRACTION_SYSTEM}] + list(state["messages"])
+
     def extract_user_preferences(state: RecipeAgentState) -> Dict[str, Any]:
-        messages = [{"role": "system", "content": EXTRACTION_SYSTEM}] + list(state["messages"])
-        response = extractor.invoke(messages)
-        return {
-            "ingredients": response.ingredients,
-            "dietary_restrictions": response.dietary_restrictions,
-            "max_cooking_time": response.max_cooking_time,
-            "cuisine_preference": response.cuisine_preference,
-        }
+        fast = _fast_path(state)
+        if fast is not None:
+            return _as_update(fast)
+        key, response = _lookup(state)
+        if response is None:
+            response = extractor.invoke(_messages(state))
+            _store(key, response)
+        return _as_update(response)
+
+    async def aextract_user_preferences(state: RecipeAgentState) -> Dict[str, Any]:
+        fast = _fast_path(state)
+        if fast is not None:
+            return _as_update(fast)
+        key, response = _lookup(state)
+        if response is None:
+            response = await extractor.ainvoke(_messages(state))
+            _store(key, response)
+        return _as_update(response)
 
+    extract_user_preferences.afunc = aextract_user_preferences
     return extract_user_preferences
@@ -1,32 +1,75 @@
 from __future__ import annotations
-from typing import Dict, Any
+import hashlib
+from typing import TYPE_CHECKING, Dict, Any, List, Optional
 
-from langchain_openai import ChatOpenAI
 from langchain_core.messages import SystemMessage, AIMessage
 
+from ..cache import make_cache_key, model_name
+from ..config import RECOMMEND_PROMPT_TOKENS
+from ..metrics import annotate
+from ..prompt_format import format_candidates, format_preferences
 from ..state import RecipeAgentState
+from ..streaming import graph_writer
 
-def generate_recommendation_factory(llm: ChatOpenAI):
-    def generate_recommendation(state: RecipeAgentState) -> Dict[str, Any]:
-        recipes = state.get("matched_recipes", []) or []
-        ingredients = state.get("ingredients", []) or []
+if TYPE_CHECKING:
+    from langchain_openai import ChatOpenAI
 
-        if not ingredients:
-            return {"messages": [AIMessage(content="Tell me what ingredients you have so I can recommend recipes.")]}
-        if not recipes:
-            return {"messages": [AIMessage(content="I couldn’t find a matching recipe. Want to relax constraints or add more ingredients?")]}
+NO_INGREDIENTS_REPLY = "Tell me what ingredients you have so I can recommend recipes."
+NO_MATCH_REPLY = "I couldn’t find a matching recipe. Want to relax constraints or add more ingredients?"
+
+def prompt_hash(build_prompt) -> str:
+    """
+    Hash of a node's prompt template (rendered without preferences or candidates).
+    """
+    return hashlib.sha256(build_prompt({}, []).encode("utf-8")).hexdigest()
+
+def recommendation_cache_key(
+    llm: ChatOpenAI,
+    state: RecipeAgentState,
+    recipes: List[dict],
+    template_hash: Optional[str] = None,
+) -> str:
+    """
+    Canonical key over the prompt template hash (default: this node's), the
+    model, the extracted preferences and the ordered candidate ids.
+    """
+    return make_cache_key(
+        "recommend",
+        model_name(llm),
+        template_hash or PROMPT_HASH,
+        sorted(set(i.lower().strip() for i in state.get("ingredients", []) or [])),
+        sorted(set(state.get("dietary_restrictions", []) or [])),
+        state.get("max_cooking_time", None),
+        (state.get("cuisine_preference", None) or "").lower().strip(),
+        [r.get("id", r.get("name")) for r in recipes],
+    )
 
-        prompt = f"""
+def format_recommendation(recipes: List[dict]) -> str:
+    """
+    Render the final response format locally from already-ordered recipes.
+    """
+    top = recipes[:3]
+    lines = [f"Based on your ingredients and preferences, here are {len(top)} recipes:"]
+    lines += [f"{i}. {r['name']} ({r['cooking_time']} min) - {r['cuisine']}" for i, r in enumerate(top, 1)]
+    lines.append("Which one would you like the full recipe for?")
+    return "\n".join(lines)
+
+RECOMMEND_COLUMNS = ("name", "time", "cuisine", "diet", "ingredients")
+
+def build_recommendation_prompt(
+    state: RecipeAgentState,
+    recipes: List[dict],
+    token_budget: Optional[int] = RECOMMEND_PROMPT_TOKENS,
+) -> str:
+    table, _ = format_candidates(recipes, RECOMMEND_COLUMNS, token_budget)
+    return f"""
 You are a friendly cooking assistant.
 
 User preferences:
-- Ingredients: {state.get("ingredients", [])}
-- Dietary restrictions: {state.get("dietary_restrictions", [])}
-- Max cooking time: {state.get("max_cooking_time", None)}
-- Cuisine preference: {state.get("cuisine_preference", None)}
+{format_preferences(state)}
 
 Candidate recipes (use ONLY these, do not invent new recipes):
-{recipes}
+{table}
 
 Task:
 1) Pick the BEST 3 recipes from the candidates for this user.
@@ -40,7 +83,79 @@ Which one would you like the full recipe for?
 
 No extra text. No explanations. Only the formatted response.
 """
-        response = llm.invoke([SystemMessage(content=prompt)])
-        return {"messages": [AIMessage(content=response.content)]}
 
+PROMPT_HASH = prompt_hash(build_recommendation_prompt)
+
+def generate_recommendation_factory(llm: ChatOpenAI, cache: Optional[Any] = None, streaming: bool = False):
+    """
+    Build the final response node. The returned function is the sync node; its
+    `afunc` attribute is the async variant (uses `llm.ainvoke`).
+
+    With `streaming=True` the reply is generated with `llm.stream` / `llm.astream`
+    and each text chunk is written to the graph's custom stream as it arrives
+    (`graph.stream(..., stream_mode="custom")`). The final message is the same.
+    """
+    def _early_reply(state: RecipeAgentState):
+        """
+        Reply that needs no LLM call (missing input or a cache hit), plus the cache key.
+        """
+        recipes = state.get("matched_recipes", []) or []
+        ingredients = state.get("ingredients", []) or []
+
+        if not ingredients:
+            return NO_INGREDIENTS_REPLY, None
+        if not recipes:
+            return NO_MATCH_REPLY, None
+        if cache is None:
+            return None, None
+
+        key = recommendation_cache_key(llm, state, recipes)
+        cached = cache.get(key)
+        annotate(cache_hit=cached is not None)
+        return cached, key
+
+    def _reply(key: Optional[str], content) -> Dict[str, Any]:
+        if cache is not None and key is not None and isinstance(content, str):
+            cache.set(key, content)
+        return {"messages": [AIMessage(content=content)]}
+
+    def generate_recommendation(state: RecipeAgentState) -> Dict[str, Any]:
+        early, key = _early_reply(state)
+        if early is not None:
+            if streaming:
+                graph_writer()(early)
+            return {"messages": [AIMessage(content=early)]}
+
+        messages = [SystemMessage(content=build_recommendation_prompt(state, state["matched_recipes"]))]
+        if not streaming:
+            return _reply(key, llm.invoke(messages).content)
+
+        write = graph_writer()
+        parts = []
+        for chunk in llm.stream(messages):
+            if chunk.content:
+                parts.append(chunk.content)
+                write(chunk.content)
+        return _reply(key, "".join(parts))
+
+    async def agenerate_recommendation(state: RecipeAgentState) -> Dict[str, Any]:
+        early, key = _early_reply(state)
+        if early is not None:
+            if streaming:
+                graph_writer()(early)
+            return {"messages": [AIMessage(content=early)]}
+
+        messages = [SystemMessage(content=build_recommendation_prompt(state, state["matched_recipes"]))]
+        if not streaming:
+            return _reply(key, (await llm.ainvoke(messages)).content)
+
+        write = graph_writer()
+        parts = []
+        async for chunk in llm.astream(messages):
+            if chunk.content:
+                parts.append(chunk.content)
+                write(chunk.content)
+        return _reply(key, "".join(parts))
+
+    generate_recommendation.afunc = agenerate_recommendation
     return generate_recommendation
@@ -0,0 +1,115 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING, Dict, Any, List, Optional
+
+from langchain_core.messages import SystemMessage, AIMessage
+
+from ..config import RANK_AND_RECOMMEND_PROMPT_TOKENS
+from ..metrics import annotate
+from ..prompt_format import format_candidates, format_preferences
+from ..schemas import RankedRecommendation
+from ..state import RecipeAgentState
+from ..streaming import graph_writer
+from .generate_recommendation import (
+    NO_INGREDIENTS_REPLY,
+    NO_MATCH_REPLY,
+    format_recommendation,
+    prompt_hash,
+    recommendation_cache_key,
+)
+
+if TYPE_CHECKING:
+    from langchain_openai import ChatOpenAI
+
+RANK_AND_RECOMMEND_COLUMNS = ("id", "name", "time", "cuisine", "score")
+
+def build_rank_and_recommend_prompt(
+    state: RecipeAgentState,
+    recipes: List[dict],
+    token_budget: Optional[int] = RANK_AND_RECOMMEND_PROMPT_TOKENS,
+) -> str:
+    table, _ = format_candidates(recipes, RANK_AND_RECOMMEND_COLUMNS, token_budget)
+    return f"""
+You are a friendly cooking assistant.
+
+User preferences:
+{format_preferences(state)}
+
+Candidate recipes (use ONLY these, do not invent new recipes):
+{table}
+
+Task:
+Rank the candidates from best to worst for this user; return their ids in
+that order as recipe_ids.
+"""
+
+PROMPT_HASH = prompt_hash(build_rank_and_recommend_prompt)
+
+def apply_ranked_recommendation(recipes: List[dict], result: RankedRecommendation) -> Dict[str, Any]:
+    """
+    Reorder candidates by the returned ids (ids outside the candidate set are
+    dropped) and render the reply locally from that order, so the user never
+    sees a recipe that is not in the catalog.
+    """
+    by_id = {r.get("id"): r for r in recipes}
+    seen = set()
+    ranked = []
+    for rid in result.recipe_ids:
+        if rid in by_id and rid not in seen:
+            seen.add(rid)
+            ranked.append(by_id[rid])
+
+    remaining = sorted((r for r in recipes if r.get("id") not in seen), key=lambda r: r.get("score", 0), reverse=True)
+    ordered = ranked + remaining
+    return {"matched_recipes": ordered, "messages": [AIMessage(content=format_recommendation(ordered))]}
+
+def rank_and_recommend_factory(llm: ChatOpenAI, cache: Optional[Any] = None, streaming: bool = False):
+    """
+    Fused rank + final response node: one structured-output call returns the
+    ordered recipe ids, and the reply is rendered from them. Replaces
+    rank_recipes + generate_recommendation in the "fused" graph. With `streaming=True` the
+    final text is written to the graph's custom stream once it is ready.
+    """
+    ranker = llm.with_structured_output(RankedRecommendation)
+
+    def _early(state: RecipeAgentState):
+        recipes = state.get("matched_recipes", []) or []
+        if not (state.get("ingredients", []) or []):
+            return {"matched_recipes": recipes, "messages": [AIMessage(content=NO_INGREDIENTS_REPLY)]}, None
+        if not recipes:
+            return {"matched_recipes": [], "messages": [AIMessage(content=NO_MATCH_REPLY)]}, None
+        if cache is None:
+            return None, None
+        key = recommendation_cache_key(llm, state, recipes, PROMPT_HASH)
+        cached = cache.get(key)
+        annotate(cache_hit=cached is not None)
+        if cached is None:
+            return None, key
+        return apply_ranked_recommendation(recipes, RankedRecommendation.model_validate_json(cached)), key
+
+    def _finish(state: RecipeAgentState, key: Optional[str], result) -> Dict[str, Any]:
+        if cache is not None and key is not None and isinstance(result, RankedRecommendation):
+            cache.set(key, result.model_dump_json())
+        return apply_ranked_recommendation(state["matched_recipes"], result)
+
+    def _emit(out: Dict[str, Any]) -> Dict[str, Any]:
+        if streaming:
+            graph_writer()(out["messages"][-1].content)
+        return out
+
+    def _messages(state: RecipeAgentState):
+        return [SystemMessage(content=build_rank_and_recommend_prompt(state, state["matched_recipes"]))]
+
+    def rank_and_recommend(state: RecipeAgentState) -> Dict[str, Any]:
+        out, key = _early(state)
+        if out is None:
+            out = _finish(state, key, ranker.invoke(_messages(state)))
+        return _emit(out)
+
+    async def arank_and_recommend(state: RecipeAgentState) -> Dict[str, Any]:
+        out, key = _early(state)
+        if out is None:
+            out = _finish(state, key, await ranker.ainvoke(_messages(state)))
+        return _emit(out)
+
+    rank_and_recommend.afunc = arank_and_recommend
+    return rank_and_recommend
@@ -1,44 +1,181 @@
 from __future__ import annotations
-from typing import Dict, Any
+from typing import TYPE_CHECKING, Dict, Any, List, Optional, Protocol
 
-from langchain_openai import ChatOpenAI
 from langchain_core.messages import SystemMessage
 
+from ..config import RANK_PROMPT_TOKENS
+from ..data import recipes_db
+from ..data.ingredients import IngredientIndex, canonical_key
+from ..prompt_format import format_candidates, format_preferences
 from ..state import RecipeAgentState
 
-def rank_recipes_factory(llm: ChatOpenAI):
-    def rank_recipes(state: RecipeAgentState) -> Dict[str, Any]:
-        recipes = state.get("matched_recipes", []) or []
-        if not recipes:
-            return {"matched_recipes": []}
+if TYPE_CHECKING:
+    from langchain_openai import ChatOpenAI
 
-        prompt = (
-            "You are a cooking assistant.\n"
-            "Rank the following recipes from best to worst for the user.\n\n"
-            "User preferences:\n"
-            f"- Ingredients: {state.get('ingredients', [])}\n"
-            f"- Dietary: {state.get('dietary_restrictions', [])}\n"
-            f"- Max time: {state.get('max_cooking_time', None)}\n"
-            f"- Cuisine: {state.get('cuisine_preference', None)}\n\n"
-            "Recipes:\n"
-        )
 
-        for r in recipes:
-            prompt += (
-                f"- {r['name']} | cuisine={r['cuisine']} | "
-                f"time={r['cooking_time']} | score={r['score']}\n"
-            )
+class Ranker(Protocol):
+    def rank(self, state: RecipeAgentState, recipes: List[dict]) -> List[dict]:
+        """Return `recipes` ordered from best to worst for the user in `state`."""
+        ...
 
-        prompt += "\nReturn ONLY a comma-separated list of recipe names ranked from best to worst."
-        response = llm.invoke([SystemMessage(content=prompt)])
 
-        ranked_names = [x.strip() for x in response.content.split(",") if x.strip()]
+class LLMRanker:
+    """
+    Asks the LLM for a comma-separated ranking of recipe names; anything it
+    leaves out (or misnames), including candidates cut by the prompt's token
+    budget, follows in score order.
+    """
+    COLUMNS = ("name", "time", "cuisine", "score")
+
+    def __init__(self, llm: ChatOpenAI, token_budget: Optional[int] = RANK_PROMPT_TOKENS):
+        self.llm = llm
+        self.token_budget = token_budget
+
+    def build_prompt(self, state: RecipeAgentState, recipes: List[dict]) -> str:
+        table, _ = format_candidates(recipes, self.COLUMNS, self.token_budget)
+        return "\n".join([
+            "You are a cooking assistant.",
+            "Rank the following recipes from best to worst for the user.",
+            "",
+            "User preferences:",
+            format_preferences(state),
+            "",
+            "Recipes:",
+            table,
+            "",
+            "Return ONLY a comma-separated list of recipe names ranked from best to worst.",
+        ])
+
+    @staticmethod
+    def apply_response(recipes: List[dict], content: str) -> List[dict]:
+        ranked_names = [x.strip() for x in content.split(",") if x.strip()]
         name_to_recipe = {r["name"]: r for r in recipes}
         ranked = [name_to_recipe[n] for n in ranked_names if n in name_to_recipe]
 
         remaining = [r for r in recipes if r["name"] not in ranked_names]
         remaining = sorted(remaining, key=lambda r: r["score"], reverse=True)
 
-        return {"matched_recipes": ranked + remaining}
+        return ranked + remaining
+
+    def rank(self, state: RecipeAgentState, recipes: List[dict]) -> List[dict]:
+        response = self.llm.invoke([SystemMessage(content=self.build_prompt(state, recipes))])
+        return self.apply_response(recipes, response.content)
+
+    async def arank(self, state: RecipeAgentState, recipes: List[dict]) -> List[dict]:
+        response = await self.llm.ainvoke([SystemMessage(content=self.build_prompt(state, recipes))])
+        return self.apply_response(recipes, response.content)
+
+
+class LocalRanker:
+    """
+    Deterministic feature-based ranking, no LLM call.
+
+    Features: ingredient overlap ratio, missing-ingredient count, time slack
+    under max_cooking_time, cuisine match and dietary fit. Ties keep the
+    search score order, then the incoming order.
+
+    Ingredients are compared by canonical id in `index` (default: the catalog
+    in use), resolved the way search resolves them, so synonyms such as
+    "scallions" / "green onion" count as overlap.
+    """
+    def __init__(
+        self,
+        overlap_weight: float = 3.0,
+        missing_weight: float = 0.5,
+        time_weight: float = 1.0,
+        cuisine_weight: float = 2.0,
+        dietary_weight: float = 1.0,
+        index: Optional[IngredientIndex] = None,
+    ):
+        self.overlap_weight = overlap_weight
+        self.missing_weight = missing_weight
+        self.time_weight = time_weight
+        self.cuisine_weight = cuisine_weight
+        self.dietary_weight = dietary_weight
+        self.index = index
+
+    def _index(self) -> IngredientIndex:
+        return self.index if self.index is not None else recipes_db.get_recipes_db().ingredient_index
+
+    @staticmethod
+    def _keys(names, resolve) -> set:
+        # names the index does not know fall back to their canonical key
+        keys = set()
+        for name in names or []:
+            cid = resolve(name)
+            keys.add(cid if cid is not None else canonical_key(name))
+        return keys
+
+    def score(self, state: RecipeAgentState, recipe: dict, index: Optional[IngredientIndex] = None) -> float:
+        index = index if index is not None else self._index()
+        user_ings = self._keys(state.get("ingredients", []), index.resolve)
+        r_ings = self._keys(recipe.get("ingredients", []), index.resolve_exact)
+        overlap = len(user_ings & r_ings)
+        overlap_ratio = overlap / len(r_ings) if r_ings else 0.0
+        missing = len(r_ings) - overlap
+
+        max_time = state.get("max_cooking_time", None)
+        cooking_time = recipe.get("cooking_time")
+        time_slack = 0.0
+        if max_time and cooking_time is not None:
+            time_slack = max(0.0, min(1.0, (max_time - cooking_time) / max_time))
+
+        cuisine_pref = (state.get("cuisine_preference", "") or "").lower()
+        cuisine_match = 1.0 if cuisine_pref and str(recipe.get("cuisine", "")).lower() == cuisine_pref else 0.0
+
+        wanted = set(state.get("dietary_restrictions", []) or [])
+        dietary_fit = len(wanted & set(recipe.get("dietary", []) or [])) / len(wanted) if wanted else 1.0
+
+        return (
+            self.overlap_weight * overlap_ratio
+            - self.missing_weight * missing
+            + self.time_weight * time_slack
+            + self.cuisine_weight * cuisine_match
+            + self.dietary_weight * dietary_fit
+        )
+
+    def rank(self, state: RecipeAgentState, recipes: List[dict]) -> List[dict]:
+        index = self._index()
+        keyed = [
+            (-self.score(state, r, index), -r.get("score", 0), pos, r)
+            for pos, r in enumerate(recipes)
+        ]
+        return [r for *_, r in sorted(keyed, key=lambda x: x[:3])]
+
+
+def get_ranker(mode: str, llm: Optional[ChatOpenAI] = None) -> Ranker:
+    if mode == "local":
+        return LocalRanker()
+    if mode == "llm":
+        if llm is None:
+            raise ValueError("The llm ranker needs an llm")
+        return LLMRanker(llm)
+    raise ValueError(f"Unknown ranker mode: {mode!r}")
+
+
+def rank_recipes_factory(llm: Optional[ChatOpenAI] = None, ranker: Optional[Ranker] = None):
+    """
+    Build the rank node. Pass a `ranker` explicitly, or an `llm` to rank with
+    the LLM; with neither, the local feature-based ranker is used. Rankers
+    may provide `arank` for the async variant (`afunc`).
+    """
+    if ranker is None:
+        ranker = LLMRanker(llm) if llm is not None else LocalRanker()
+
+    def rank_recipes(state: RecipeAgentState) -> Dict[str, Any]:
+        recipes = state.get("matched_recipes", []) or []
+        if not recipes:
+            return {"matched_recipes": []}
+        return {"matched_recipes": ranker.rank(state, recipes)}
+
+    async def arank_recipes(state: RecipeAgentState) -> Dict[str, Any]:
+        recipes = state.get("matched_recipes", []) or []
+        if not recipes:
+            return {"matched_recipes": []}
+        if hasattr(ranker, "arank"):
+            return {"matched_recipes": await ranker.arank(state, recipes)}
+        # local ranking of a capped candidate list is cheap enough for the loop
+        return {"matched_recipes": ranker.rank(state, recipes)}
 
+    rank_recipes.afunc = arank_recipes
     return rank_recipes
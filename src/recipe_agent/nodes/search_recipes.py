@@ -1,29 +1,81 @@
 from __future__ import annotations
-from typing import Dict, Any
+import heapq
+from typing import Dict, Any, Optional
 
+from ..config import SEARCH_TOP_K, CANDIDATE_TOKEN_BUDGET
 from ..state import RecipeAgentState
-from ..data.recipes_db import RECIPES_DB
+from ..data import recipes_db
+from ..data.store import as_recipe_store
+from ..executor import run_blocking
+from ..prompt_format import CANDIDATE_COLUMNS, header_tokens, row_tokens
 
-def search_recipes(state: RecipeAgentState) -> Dict[str, Any]:
-    ingredients = set(i.lower() for i in state.get("ingredients", []))
-    dietary = set(state.get("dietary_restrictions", []))
-    max_time = state.get("max_cooking_time", None)
-    cuisine_pref = (state.get("cuisine_preference", "") or "").lower()
+# Catalog override (e.g. a list of recipe dicts); the shared, lazily loaded
+# catalog is used while this is None.
+RECIPES_DB = None
+
+def select_candidates(store, rows, scores, top_k: Optional[int], token_budget: Optional[int]) -> Dict[str, Any]:
+    """
+    Turn (rows, scores) from the store into the capped, best-first candidate list
+    and the state fields describing the cap.
+    """
+    rows, scores = rows.tolist(), scores.tolist()
+    order = range(len(rows))
+    key = lambda i: (scores[i], -i)
+    if top_k is not None and top_k < len(rows):
+        top = heapq.nlargest(top_k, order, key=key)
+    else:
+        top = sorted(order, key=key, reverse=True)
 
     matches = []
-    for r in RECIPES_DB:
-        r_ings = set(x.lower() for x in r["ingredients"])
+    # measured as the compact prompt table, not the full record (instructions
+    # are never sent)
+    used = header_tokens(CANDIDATE_COLUMNS)
+    for i in top:
+        recipe = {**store.record(rows[i]), "score": scores[i]}
+        if token_budget is not None:
+            used += row_tokens(recipe, CANDIDATE_COLUMNS)
+            # always keep the best candidate, even if it alone is over budget
+            if matches and used > token_budget:
+                break
+        matches.append(recipe)
+
+    return {
+        "matched_recipes": matches,
+        "total_matches": len(rows),
+        "candidate_limit": top_k if top_k is not None else len(rows),
+    }
+
+def search_query(state: RecipeAgentState):
+    return (
+        state.get("ingredients", []),
+        state.get("dietary_restrictions", []),
+        state.get("max_cooking_time", None),
+        state.get("cuisine_preference", None),
+    )
+
+def search_recipes_factory(
+    top_k: Optional[int] = SEARCH_TOP_K,
+    token_budget: Optional[int] = CANDIDATE_TOKEN_BUDGET,
+):
+    """
+    Build a search node that passes at most `top_k` candidates downstream, and
+    no more than fit in `token_budget` prompt tokens. Candidates are ordered by
+    score (best first), ties broken by catalog order, so the cut is deterministic.
+    `None` disables the respective cap. The async variant (`afunc`) runs the
+    search in the bounded blocking pool.
+    """
+    def search_recipes(state: RecipeAgentState) -> Dict[str, Any]:
+        store = as_recipe_store(RECIPES_DB if RECIPES_DB is not None else recipes_db.get_recipes_db())
 
-        if dietary and (not dietary.issubset(set(r["dietary"]))):
-            continue
-        if max_time is not None and r["cooking_time"] > max_time:
-            continue
+        # Filters run as vectorized masks over the columnar store; only the
+        # selected rows are turned back into dicts.
+        rows, scores = store.search(*search_query(state))
+        return select_candidates(store, rows, scores, top_k, token_budget)
 
-        overlap = len(ingredients.intersection(r_ings)) if ingredients else 0
-        if ingredients and overlap == 0:
-            continue
+    async def asearch_recipes(state: RecipeAgentState) -> Dict[str, Any]:
+        return await run_blocking(search_recipes, state)
 
-        score = overlap + (2 if cuisine_pref and r["cuisine"].lower() == cuisine_pref else 0)
-        matches.append({**r, "score": score})
+    search_recipes.afunc = asearch_recipes
+    return search_recipes
 
-    return {"matched_recipes": matches}
+search_recipes = search_recipes_factory()
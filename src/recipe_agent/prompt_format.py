@@ -0,0 +1,84 @@
+"""
+Compact candidate tables for LLM prompts.
+
+Each node lists only the columns it needs, one recipe per line:
+
+    id|name|time|cuisine
+    3|Egg Fried Rice|15|Chinese
+
+Rows are added in the given (best-first) order until the next row would push
+the table past the node's token budget (`estimate_tokens`), so the cut is
+deterministic. The first row is always kept. The search node sizes its
+candidate list with the same measure over `CANDIDATE_COLUMNS`.
+"""
+
+from __future__ import annotations
+
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from .state import RecipeAgentState
+from .tokens import estimate_tokens
+
+
+def _join(values) -> str:
+    return ",".join(str(v) for v in values or [])
+
+
+# column name -> value getter
+COLUMNS: Dict[str, Callable[[dict], object]] = {
+    "id": lambda r: r.get("id", ""),
+    "name": lambda r: r.get("name", ""),
+    "time": lambda r: r.get("cooking_time", ""),
+    "cuisine": lambda r: r.get("cuisine", ""),
+    "diet": lambda r: _join(r.get("dietary")),
+    "ingredients": lambda r: _join(r.get("ingredients")),
+    "score": lambda r: r.get("score", ""),
+}
+
+
+# every column a node may send: what the search node's budget is measured on
+CANDIDATE_COLUMNS = tuple(COLUMNS)
+
+
+def _cell(value) -> str:
+    return " ".join(str(value).replace("|", "/").split())
+
+
+def format_row(recipe: dict, columns: Sequence[str]) -> str:
+    return "|".join(_cell(COLUMNS[c](recipe)) for c in columns)
+
+
+def header_tokens(columns: Sequence[str]) -> int:
+    return estimate_tokens("|".join(columns))
+
+
+def row_tokens(recipe: dict, columns: Sequence[str]) -> int:
+    return estimate_tokens(format_row(recipe, columns)) + 1  # + newline
+
+
+def format_candidates(
+    recipes: List[dict],
+    columns: Sequence[str],
+    token_budget: Optional[int] = None,
+) -> Tuple[str, int]:
+    """
+    Return (table, rows included). `None` disables the budget.
+    """
+    lines = ["|".join(columns)]
+    used = header_tokens(columns)
+    for recipe in recipes:
+        cost = row_tokens(recipe, columns)
+        if token_budget is not None and len(lines) > 1 and used + cost > token_budget:
+            break
+        lines.append(format_row(recipe, columns))
+        used += cost
+    return "\n".join(lines), len(lines) - 1
+
+
+def format_preferences(state: RecipeAgentState) -> str:
+    return "\n".join([
+        f"- Ingredients: {_join(state.get('ingredients')) or 'none'}",
+        f"- Dietary restrictions: {_join(state.get('dietary_restrictions')) or 'none'}",
+        f"- Max cooking time: {state.get('max_cooking_time') or 'any'}",
+        f"- Cuisine preference: {state.get('cuisine_preference') or 'any'}",
+    ])
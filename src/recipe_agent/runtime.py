@@ -1,5 +1,3 @@
-from __future__ import annotations
-
 """
 Runtime helpers that mirror the interactive workflow from
 `experiments/adk_practise.ipynb`, but packaged as reusable Python code.
@@ -8,30 +6,78 @@ Key utilities:
 - `create_session` to start an ADK session.
 - `call_adk` to send a user query through the recipe manager agent and get the
   final assistant text.
+- `call_adk_stream` to get the same answer as incremental text chunks.
+- `warmup` to build the lazily created pieces (catalog, price index, wallet,
+  graph, runner) up front, e.g. before a server starts taking traffic.
 """
 
+from __future__ import annotations
+
+import asyncio
 import os
+import time
 import uuid
-from typing import Optional
+from typing import AsyncIterator, Dict, Optional
 
 from dotenv import load_dotenv
+from google.adk.agents.run_config import RunConfig, StreamingMode
 from google.adk.runners import Runner
-from google.adk.sessions import InMemorySessionService
 from google.genai import types
 
+from . import app
 from .app import root_agent
+from .data import recipes_db
+from .lazy import Lazy
+from .metrics import METRICS
+from .sessions import build_session_service
+from .streaming import stream_to
 
 # Load environment variables (OPENAI_API_KEY, GOOGLE_API_KEY, etc.)
 load_dotenv()
 
 # ---------------------- ADK runtime wiring ----------------------
 APP_NAME = "recipe_app"
-_session_service = InMemorySessionService()
-runner = Runner(
-    agent=root_agent,
-    app_name=APP_NAME,
-    session_service=_session_service,
-)
+# bounded in memory; backed by SQLite when RECIPE_SESSION_DB is set
+_session_service = build_session_service()
+
+def _build_runner() -> Runner:
+    return Runner(
+        agent=root_agent,
+        app_name=APP_NAME,
+        session_service=_session_service,
+    )
+
+_RUNNER: Lazy[Runner] = Lazy(_build_runner)
+
+def get_runner() -> Runner:
+    # an explicitly assigned `runtime.runner` (custom wiring, tests) wins
+    return globals().get("runner") or _RUNNER.get()
+
+def __getattr__(name: str):
+    # `runtime.runner` keeps working; the Runner is created on first access
+    if name == "runner":
+        return get_runner()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def warmup() -> Dict[str, float]:
+    """
+    Build everything that is otherwise created on first use and return the
+    seconds each step took. Safe to call more than once (later calls are no-ops).
+    """
+    steps = [
+        ("recipes", recipes_db.get_recipes_db),
+        ("prices", lambda: recipes_db.get_price_index().lookup([])),
+        ("wallet", lambda: recipes_db.get_wallet().open()),
+        ("graph", app.get_graph),
+        ("runner", get_runner),
+    ]
+    timings: Dict[str, float] = {}
+    for name, step in steps:
+        start = time.perf_counter()
+        step()
+        timings[name] = time.perf_counter() - start
+    return timings
 
 
 async def create_session(user_id: Optional[str] = None):
@@ -51,16 +97,81 @@ async def call_adk(query: str, *, session_id: str, user_id: str) -> str:
     content = types.Content(role="user", parts=[types.Part(text=query)])
 
     final_text: Optional[str] = None
-    async for event in runner.run_async(
-        user_id=user_id,
-        session_id=session_id,
-        new_message=content,
-    ):
-        if event.is_final_response():
-            if event.content and event.content.parts:
-                final_text = event.content.parts[0].text
-            else:
-                final_text = event.error_message or "No final text returned."
-            break
+    with METRICS.span("adk", "call_adk"), recipes_db.pinned_snapshot():
+        async for event in get_runner().run_async(
+            user_id=user_id,
+            session_id=session_id,
+            new_message=content,
+        ):
+            if event.is_final_response():
+                if event.content and event.content.parts:
+                    final_text = event.content.parts[0].text
+                else:
+                    final_text = event.error_message or "No final text returned."
+                break
 
     return final_text or "No response."
+
+
+def _event_text(event) -> str:
+    if not event.content or not event.content.parts:
+        return ""
+    return "".join(p.text for p in event.content.parts if getattr(p, "text", None))
+
+
+async def call_adk_stream(query: str, *, session_id: str, user_id: str) -> AsyncIterator[str]:
+    """
+    Streaming variant of `call_adk`: yields text chunks as they are produced.
+
+    Recipe recommendations stream token by token from the generation node
+    (forwarded by the recommend_recipes tool); other routes stream the agent's
+    own partial text (SSE mode). Once the tool has streamed, the agent's echo
+    of the same text is not repeated.
+    """
+    content = types.Content(role="user", parts=[types.Part(text=query)])
+    queue: asyncio.Queue = asyncio.Queue()
+
+    async def pump() -> None:
+        try:
+            with METRICS.span("adk", "call_adk_stream"), recipes_db.pinned_snapshot(), \
+                    stream_to(lambda text: queue.put_nowait(("tool", text))):
+                async for event in get_runner().run_async(
+                    user_id=user_id,
+                    session_id=session_id,
+                    new_message=content,
+                    run_config=RunConfig(streaming_mode=StreamingMode.SSE),
+                ):
+                    if event.partial:
+                        queue.put_nowait(("partial", _event_text(event)))
+                    elif event.is_final_response():
+                        final = _event_text(event) or event.error_message or "No final text returned."
+                        queue.put_nowait(("final", final))
+                        break
+        except Exception as exc:
+            queue.put_nowait(("error", exc))
+        finally:
+            queue.put_nowait(("done", None))
+
+    task = asyncio.create_task(pump())
+    streamed = tool_streamed = False
+    try:
+        while True:
+            kind, payload = await queue.get()
+            if kind == "done":
+                break
+            if kind == "error":
+                raise payload
+            if kind == "tool":
+                tool_streamed = streamed = True
+                yield payload
+            elif kind == "partial" and payload and not tool_streamed:
+                streamed = True
+                yield payload
+            elif kind == "final" and not streamed:
+                streamed = True
+                yield payload
+        if not streamed:
+            yield "No response."
+    finally:
+        if not task.done():
+            task.cancel()
@@ -10,3 +10,6 @@ class UserInput(BaseModel):
     )
     max_cooking_time: Optional[int] = Field(default=None, description="Minutes")
     cuisine_preference: Optional[str] = Field(default=None, description="Cuisine name, if any")
+
+class RankedRecommendation(BaseModel):
+    recipe_ids: List[int] = Field(default_factory=list, description="Candidate recipe ids, best first")
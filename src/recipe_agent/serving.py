@@ -0,0 +1,152 @@
+"""
+A2A serving with a worker model.
+
+`serve(factory, workers=N)` runs N uvicorn worker processes on one socket.
+Before they start, the parent compiles the recipe catalog artifact when it is
+stale, and the workers only read it (RECIPE_CATALOG_ARTIFACT=use): every
+worker memory-maps the same files (shared page cache) instead of parsing
+recipes.csv, and none of them rewrites it.
+
+`create_app` turns an ADK agent into the A2A Starlette app with a warmup
+step that runs in the app's startup hook, i.e. in each worker before uvicorn
+accepts its connections, plus two probes:
+- `GET /healthz`: the process is up;
+- `GET /ready`: 200 once warmup finished (503 before), with its timings.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import time
+from typing import TYPE_CHECKING, Awaitable, Callable, Dict, Optional
+
+from .config import CATALOG_ARTIFACT, RECIPES_CSV
+from .executor import run_blocking
+
+if TYPE_CHECKING:
+    from google.adk.agents import BaseAgent
+    from google.adk.runners import Runner
+    from langchain_openai import ChatOpenAI
+    from starlette.applications import Starlette
+
+logger = logging.getLogger(__name__)
+
+Warmup = Callable[[], Awaitable[Dict[str, float]]]
+
+# seconds allowed for the request that opens an LLM client's connections
+LLM_WARMUP_TIMEOUT = 10.0
+
+
+def prepare_shared_data(csv_path=RECIPES_CSV) -> None:
+    """
+    Compile the catalog artifact once, in the parent process, so the workers
+    map it instead of each parsing the CSV (and racing to write it).
+    """
+    if CATALOG_ARTIFACT == "off":
+        return
+    from .data.artifact import compile_catalog, is_fresh
+
+    if not is_fresh(csv_path):
+        start = time.perf_counter()
+        out_dir = compile_catalog(csv_path)
+        logger.info("Compiled %s in %.2fs", out_dir, time.perf_counter() - start)
+
+
+async def warm_llm_connections(*llms: ChatOpenAI) -> float:
+    """
+    Open the HTTP connection pools of chat clients (sync and async) with a
+    cheap request, so the first user request skips DNS and TLS setup. Returns
+    the seconds taken. Failures are logged, not raised: the worker still serves.
+    """
+    import openai
+
+    start = time.perf_counter()
+    for llm in llms:
+        options = {"timeout": LLM_WARMUP_TIMEOUT, "max_retries": 0}
+        # with_options copies share the client's connection pool
+        sync_client = llm.root_client.with_options(**options)
+        async_client = llm.root_async_client.with_options(**options)
+        results = await asyncio.gather(
+            run_blocking(sync_client.models.retrieve, llm.model_name),
+            async_client.models.retrieve(llm.model_name),
+            return_exceptions=True,
+        )
+        for result in results:
+            # an error status (e.g. a bad key) still came over an open connection
+            if isinstance(result, Exception) and not isinstance(result, openai.APIStatusError):
+                logger.warning("Could not warm up the %s client: %s", llm.model_name, result)
+    return time.perf_counter() - start
+
+
+def add_readiness(app: Starlette, warmup: Warmup) -> Starlette:
+    """
+    Run `warmup` on startup and serve `/healthz` and `/ready`.
+    """
+    from starlette.responses import JSONResponse
+
+    app.state.ready = False
+    app.state.warmup = {}
+
+    async def warm() -> None:
+        start = time.perf_counter()
+        timings = await warmup()
+        app.state.warmup = {**timings, "total": time.perf_counter() - start}
+        app.state.ready = True
+        logger.info("Worker %d ready in %.2fs", os.getpid(), app.state.warmup["total"])
+
+    async def healthz(request):
+        return JSONResponse({"status": "ok", "pid": os.getpid()})
+
+    async def ready(request):
+        body = {"ready": app.state.ready, "pid": os.getpid(), "warmup": app.state.warmup}
+        return JSONResponse(body, status_code=200 if app.state.ready else 503)
+
+    app.add_event_handler("startup", warm)
+    app.add_route("/healthz", healthz, methods=["GET"])
+    app.add_route("/ready", ready, methods=["GET"])
+    return app
+
+
+def create_app(
+    agent: BaseAgent,
+    *,
+    host: str,
+    port: int,
+    warmup: Warmup,
+    runner: Optional[Runner] = None,
+) -> Starlette:
+    """
+    A2A app for `agent`. Without a `runner`, one is built over the bounded
+    session service (sessions live in each worker).
+    """
+    from google.adk.a2a.utils.agent_to_a2a import to_a2a
+    from google.adk.runners import Runner
+
+    from .sessions import build_session_service
+
+    if runner is None:
+        runner = Runner(agent=agent, app_name=agent.name, session_service=build_session_service())
+    return add_readiness(to_a2a(agent, host=host, port=port, runner=runner), warmup)
+
+
+def serve(factory: str, *, workers: int, host: str, port: int, shared_data: bool = True) -> None:
+    """
+    Serve the app returned by `factory` ("module:function", called with
+    host= and port=) from `workers` processes.
+    """
+    import uvicorn
+    from uvicorn.importer import import_from_string
+
+    if shared_data:
+        prepare_shared_data()
+    if workers <= 1:
+        uvicorn.run(import_from_string(factory)(host=host, port=port), host=host, port=port)
+        return
+    # worker processes are fresh interpreters: settings travel in the environment
+    os.environ["RECIPE_SERVER_HOST"] = host
+    os.environ["RECIPE_SERVER_PORT"] = str(port)
+    if shared_data:
+        os.environ.setdefault("RECIPE_CATALOG_ARTIFACT", "use")
+    uvicorn.run(factory, factory=True, host=host, port=port, workers=workers)
@@ -0,0 +1,269 @@
+"""
+Bounded ADK session storage.
+
+`BoundedSessionService` is ADK's `InMemorySessionService` with limits:
+- at most `max_events` events per session (older turns are dropped, cutting
+  at a user message so tool calls keep their responses);
+- sessions idle for `idle_ttl` seconds leave memory;
+- least recently used sessions leave memory while the estimated size of all
+  sessions (serialized events + state) is over `max_bytes`.
+
+With a `persistent` service (ADK's `SqliteSessionService` when
+RECIPE_SESSION_DB is set), every create / append / delete is written through,
+and a session that is no longer in memory is loaded back from it (its most
+recent `max_events` events) on the next access, including after a restart.
+Without one, an evicted session is gone.
+"""
+
+from __future__ import annotations
+
+import json
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, Optional, Tuple
+
+from google.adk.events.event import Event
+from google.adk.sessions import BaseSessionService, InMemorySessionService, Session
+from google.adk.sessions import _session_util
+from google.adk.sessions.base_session_service import GetSessionConfig, ListSessionsResponse
+
+from .config import SESSION_DB, SESSION_IDLE_TTL, SESSION_MAX_BYTES, SESSION_MAX_EVENTS
+
+Key = Tuple[str, str, str]
+
+
+@dataclass
+class _Usage:
+    last_used: float
+    state_bytes: int = 0
+    event_bytes: Deque[int] = field(default_factory=deque)
+
+    @property
+    def size(self) -> int:
+        return self.state_bytes + sum(self.event_bytes)
+
+
+def _json_size(value: Any) -> int:
+    return len(json.dumps(value, default=str))
+
+
+class BoundedSessionService(InMemorySessionService):
+    def __init__(
+        self,
+        max_events: int = SESSION_MAX_EVENTS,
+        idle_ttl: Optional[float] = SESSION_IDLE_TTL,
+        max_bytes: Optional[int] = SESSION_MAX_BYTES,
+        persistent: Optional[BaseSessionService] = None,
+        clock=time.monotonic,
+    ):
+        super().__init__()
+        self.max_events = max_events
+        self.idle_ttl = idle_ttl
+        self.max_bytes = max_bytes
+        self.persistent = persistent
+        self._clock = clock
+        # resident sessions, least recently used first
+        self._usage: "OrderedDict[Key, _Usage]" = OrderedDict()
+        self._bytes = 0
+        self.evictions = 0
+
+    # ---------------------- bookkeeping ----------------------
+    def __len__(self) -> int:
+        return len(self._usage)
+
+    @property
+    def resident_bytes(self) -> int:
+        return self._bytes
+
+    def _storage(self, key: Key) -> Optional[Session]:
+        app_name, user_id, session_id = key
+        return self.sessions.get(app_name, {}).get(user_id, {}).get(session_id)
+
+    def _touch(self, key: Key) -> None:
+        usage = self._usage.get(key)
+        if usage is not None:
+            usage.last_used = self._clock()
+            self._usage.move_to_end(key)
+
+    def _track(self, key: Key) -> None:
+        storage = self._storage(key)
+        usage = _Usage(self._clock(), _json_size(storage.state))
+        usage.event_bytes.extend(len(e.model_dump_json(exclude_none=True)) for e in storage.events)
+        self._forget(key)
+        self._usage[key] = usage
+        self._bytes += usage.size
+
+    def _forget(self, key: Key) -> None:
+        usage = self._usage.pop(key, None)
+        if usage is not None:
+            self._bytes -= usage.size
+
+    def _drop(self, key: Key) -> None:
+        """
+        Remove a session from memory only.
+        """
+        self._forget(key)
+        app_name, user_id, session_id = key
+        users = self.sessions.get(app_name, {})
+        users.get(user_id, {}).pop(session_id, None)
+        if user_id in users and not users[user_id]:
+            del users[user_id]
+            if self.persistent is not None:
+                # reloaded with the user's next session
+                self.user_state.get(app_name, {}).pop(user_id, None)
+
+    def _evict(self, keep: Optional[Key] = None) -> None:
+        """
+        Drop idle sessions, then least recently used ones while over budget.
+        `keep` (the session being used) is not dropped for the budget.
+        """
+        if self.idle_ttl is not None:
+            cutoff = self._clock() - self.idle_ttl
+            while self._usage:
+                key, usage = next(iter(self._usage.items()))
+                if usage.last_used > cutoff:
+                    break
+                self._drop(key)
+                self.evictions += 1
+        if self.max_bytes is not None:
+            for key in list(self._usage):
+                if self._bytes <= self.max_bytes:
+                    break
+                if key != keep:
+                    self._drop(key)
+                    self.evictions += 1
+
+    def _trim(self, key: Key) -> None:
+        storage = self._storage(key)
+        usage = self._usage[key]
+        excess = len(storage.events) - self.max_events
+        if excess <= 0:
+            return
+        cut = excess
+        while cut < len(storage.events) and storage.events[cut].author != "user":
+            cut += 1
+        if cut == len(storage.events):
+            # one turn longer than the cap: plain cut
+            cut = excess
+        del storage.events[:cut]
+        for _ in range(cut):
+            self._bytes -= usage.event_bytes.popleft()
+
+    async def _restore(self, app_name: str, user_id: str, session_id: str) -> bool:
+        """
+        Load a session evicted from memory back from the persistent tier.
+        """
+        if self.persistent is None:
+            return False
+        loaded = await self.persistent.get_session(
+            app_name=app_name,
+            user_id=user_id,
+            session_id=session_id,
+            config=GetSessionConfig(num_recent_events=self.max_events),
+        )
+        if loaded is None:
+            return False
+        # the last `max_events` may start mid-turn; start at a user message like _trim
+        events = loaded.events
+        start = next((i for i, e in enumerate(events) if e.author == "user"), 0)
+        state = _session_util.extract_state_delta(loaded.state)
+        self.app_state[app_name] = state["app"]
+        self.user_state.setdefault(app_name, {})[user_id] = state["user"]
+        self.sessions.setdefault(app_name, {}).setdefault(user_id, {})[session_id] = Session(
+            app_name=app_name,
+            user_id=user_id,
+            id=session_id,
+            state=state["session"],
+            events=events[start:],
+            last_update_time=loaded.last_update_time,
+        )
+        key = (app_name, user_id, session_id)
+        self._track(key)
+        self._trim(key)
+        return True
+
+    # ---------------------- BaseSessionService ----------------------
+    async def create_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        state: Optional[Dict[str, Any]] = None,
+        session_id: Optional[str] = None,
+    ) -> Session:
+        if self.persistent is not None:
+            # raises AlreadyExistsError for ids that exist in either tier
+            created = await self.persistent.create_session(
+                app_name=app_name, user_id=user_id, state=state, session_id=session_id,
+            )
+            session_id = created.id
+        session = await super().create_session(
+            app_name=app_name, user_id=user_id, state=state, session_id=session_id,
+        )
+        key = (app_name, user_id, session.id)
+        self._track(key)
+        self._evict(keep=key)
+        return session
+
+    async def get_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        config: Optional[GetSessionConfig] = None,
+    ) -> Optional[Session]:
+        key = (app_name, user_id, session_id)
+        self._evict()
+        if key in self._usage:
+            self._touch(key)
+        elif not await self._restore(app_name, user_id, session_id):
+            return None
+        self._evict(keep=key)
+        return await super().get_session(app_name=app_name, user_id=user_id, session_id=session_id, config=config)
+
+    async def list_sessions(self, *, app_name: str, user_id: Optional[str] = None) -> ListSessionsResponse:
+        if self.persistent is not None:
+            # every session is written through, so the persistent tier has them all
+            return await self.persistent.list_sessions(app_name=app_name, user_id=user_id)
+        return await super().list_sessions(app_name=app_name, user_id=user_id)
+
+    async def delete_session(self, *, app_name: str, user_id: str, session_id: str) -> None:
+        self._forget((app_name, user_id, session_id))
+        await super().delete_session(app_name=app_name, user_id=user_id, session_id=session_id)
+        if self.persistent is not None:
+            await self.persistent.delete_session(app_name=app_name, user_id=user_id, session_id=session_id)
+
+    async def append_event(self, session: Session, event: Event) -> Event:
+        if event.partial:
+            return event
+        key = (session.app_name, session.user_id, session.id)
+        if key not in self._usage:
+            # evicted while a turn was running
+            await self._restore(*key)
+        if self.persistent is not None:
+            # a throwaway copy: the persistent service appends to the object it is given
+            await self.persistent.append_event(session.model_copy(update={"events": [], "state": {}}), event)
+        event = await super().append_event(session, event)
+
+        usage = self._usage.get(key)
+        if usage is None:
+            return event
+        size = len(event.model_dump_json(exclude_none=True))
+        usage.event_bytes.append(size)
+        self._bytes += size
+        self._touch(key)
+        self._trim(key)
+        self._evict(keep=key)
+        return event
+
+
+def build_session_service() -> BoundedSessionService:
+    persistent = None
+    if SESSION_DB is not None:
+        from google.adk.sessions.sqlite_session_service import SqliteSessionService
+
+        SESSION_DB.parent.mkdir(parents=True, exist_ok=True)
+        persistent = SqliteSessionService(str(SESSION_DB))
+    return BoundedSessionService(persistent=persistent)
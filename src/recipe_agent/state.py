@@ -13,3 +13,5 @@ class RecipeAgentState(TypedDict, total=False):
     cuisine_preference: Optional[str]
 
     matched_recipes: List[dict]
+    total_matches: int  # matches before the top-k / token-budget cap
+    candidate_limit: int  # top-k cap applied to matched_recipes
@@ -0,0 +1,53 @@
+"""
+Plumbing for streaming partial text from graph nodes to the caller.
+
+- Inside the graph, nodes call `graph_writer()` and write text chunks; LangGraph
+  surfaces them under `stream_mode="custom"` (and drops them otherwise).
+- Across the ADK runner, `runtime.call_adk_stream` installs a sink with
+  `stream_to(...)`; ADK tools forward chunks to it with `emit(...)`.
+"""
+
+from __future__ import annotations
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterator, Optional
+
+Sink = Callable[[str], None]
+
+_sink: ContextVar[Optional[Sink]] = ContextVar("recipe_agent_stream_sink", default=None)
+
+
+def graph_writer() -> Sink:
+    """
+    LangGraph's custom stream writer, or a no-op outside a graph run.
+    """
+    try:
+        from langgraph.config import get_stream_writer
+        return get_stream_writer()
+    except RuntimeError:
+        return lambda chunk: None
+
+
+def current_sink() -> Optional[Sink]:
+    return _sink.get()
+
+
+def emit(text: str) -> bool:
+    """
+    Send `text` to the active sink. Returns False when nobody is listening.
+    """
+    sink = _sink.get()
+    if sink is None or not text:
+        return False
+    sink(text)
+    return True
+
+
+@contextmanager
+def stream_to(sink: Sink) -> Iterator[None]:
+    token = _sink.set(sink)
+    try:
+        yield
+    finally:
+        _sink.reset(token)
@@ -0,0 +1,19 @@
+"""
+Local token estimates for prompt budgeting (no tokenizer download or API call).
+
+Roughly follows BPE behaviour: short words are one token, long words are split
+every ~4 characters, and each punctuation mark counts on its own.
+"""
+
+from __future__ import annotations
+import math
+import re
+
+_PIECE = re.compile(r"\w+|[^\w\s]")
+
+
+def estimate_tokens(text: str) -> int:
+    return sum(
+        math.ceil(len(p) / 4) if p[0].isalnum() or p[0] == "_" else 1
+        for p in _PIECE.findall(text or "")
+    )
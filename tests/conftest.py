@@ -3,8 +3,20 @@ from __future__ import annotations
 import sys
 from pathlib import Path
 
+import pytest
+
 # Ensure src/ is on sys.path for tests
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 SRC_PATH = PROJECT_ROOT / "src"
 if str(SRC_PATH) not in sys.path:
-    sys.path.insert(0, str(SRC_PATH))
\ No newline at end of file
+    sys.path.insert(0, str(SRC_PATH))
+
+@pytest.fixture(autouse=True)
+def _fresh_shared_caches():
+    # graphs and batches share response caches per process; tests reuse
+    # prompts with different LLM doubles (all keyed as "Mock")
+    yield
+    graph = sys.modules.get("src.recipe_agent.graph")
+    if graph is not None:
+        for lazy in (graph._EXTRACT_CACHE, graph._LEXICON, *graph._RECOMMEND_CACHES.values()):
+            lazy.reset()
@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from src.recipe_agent.config import RECIPES_CSV
+from src.recipe_agent.data import artifact
+from src.recipe_agent.data.artifact import StringPool, compile_catalog, is_fresh, load_catalog
+from src.recipe_agent.data.ingredients import IngredientIndex
+from src.recipe_agent.data.recipes_db import load_recipes_db
+from src.recipe_agent.data.store import RecipeStore
+
+QUERIES = [
+    (["tomato", "onion"], [], None, None),
+    (["rice", "eggs"], ["vegetarian"], 30, None),
+    (["chicken"], [], 45, "Indian"),
+]
+
+
+def _csv(tmp_path):
+    path = tmp_path / "recipes.csv"
+    shutil.copy(RECIPES_CSV, path)
+    return path
+
+
+def test_string_pool_round_trips_unicode():
+    pool = StringPool.build(["crème brûlée", "", "寿司", "plain"])
+    assert len(pool) == 4
+    assert list(pool) == ["crème brûlée", "", "寿司", "plain"]
+    assert pool[-1] == "plain"
+    assert pool[1:3] == ["", "寿司"]
+
+
+def test_loaded_catalog_matches_csv_store(tmp_path):
+    path = _csv(tmp_path)
+    csv_store = RecipeStore.from_frame(pd.read_csv(path))
+    out = compile_catalog(path)
+
+    assert out == artifact.artifact_dir(path)
+    assert is_fresh(path)
+    mapped = load_catalog(out)
+    assert isinstance(mapped.ids, np.memmap)
+    assert list(mapped) == list(csv_store)
+    for query in QUERIES:
+        rows, scores = mapped.search(*query)
+        expected_rows, expected_scores = csv_store.search(*query)
+        assert rows.tolist() == expected_rows.tolist()
+        assert scores.tolist() == expected_scores.tolist()
+
+
+def test_load_recipes_db_modes(tmp_path):
+    path = _csv(tmp_path)
+
+    load_recipes_db(path, artifact="off")
+    assert not artifact.artifact_dir(path).exists()
+
+    load_recipes_db(path, artifact="use")
+    assert not artifact.artifact_dir(path).exists()
+
+    first = load_recipes_db(path, artifact="auto")
+    assert is_fresh(path)
+    second = load_recipes_db(path, artifact="auto")
+    assert isinstance(second.ids, np.memmap)
+    assert list(second) == list(first)
+
+
+def test_stale_artifact_falls_back_to_csv(tmp_path):
+    path = _csv(tmp_path)
+    compile_catalog(path)
+    frame = pd.read_csv(path).head(3)
+    frame.to_csv(path, index=False)
+    stat = path.stat()
+    os.utime(path, (stat.st_atime, stat.st_mtime + 10))
+
+    assert not is_fresh(path)
+    assert len(load_recipes_db(path, artifact="use")) == 3
+
+
+def test_recompile_swaps_versions(tmp_path):
+    path = _csv(tmp_path)
+    out = artifact.artifact_dir(path)
+    out.mkdir()  # a plain directory left by an older build
+    (out / "meta.json").write_text("{}")
+
+    compile_catalog(path)
+    first = out.resolve()
+    assert out.is_symlink() and first.name.startswith("recipes.catalog.v-")
+    assert first.stat().st_mode & 0o777 == 0o755
+    held = load_catalog(out)
+
+    compile_catalog(path)
+    second = out.resolve()
+    assert second != first and first.exists()  # the replaced version stays for readers
+    compile_catalog(path)
+    assert not first.exists()
+    assert list(held) == list(load_catalog(out))
+    assert sorted(p.name for p in tmp_path.iterdir() if p.name.startswith("recipes.catalog.")) == sorted(
+        [second.name, out.resolve().name]
+    )
+
+
+def test_broken_artifact_falls_back_to_csv(tmp_path):
+    path = _csv(tmp_path)
+    out = compile_catalog(path)
+    (out / "ids.npy").unlink()
+
+    assert is_fresh(path)
+    store = load_recipes_db(path, artifact="use")
+    assert not isinstance(store.ids, np.memmap)
+    assert len(store) == len(pd.read_csv(path))
+
+
+def test_postings_recomputed_for_a_different_ingredient_index(tmp_path):
+    path = _csv(tmp_path)
+    out = compile_catalog(path)
+    # an index that already knows other ingredients assigns different ids
+    index = IngredientIndex(["saffron", "unobtainium"])
+    mapped = load_catalog(out, ingredient_index=index)
+    baseline = load_catalog(out)
+
+    for query in QUERIES:
+        assert mapped.search(*query)[0].tolist() == baseline.search(*query)[0].tolist()
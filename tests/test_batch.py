@@ -0,0 +1,117 @@
+import threading
+import time
+from types import SimpleNamespace
+
+from src.recipe_agent.batch import recommend_recipes_batch, FAILED_REPLY
+from src.recipe_agent.data.recipes_db import RECIPES_DB
+from src.recipe_agent.nodes.generate_recommendation import NO_INGREDIENTS_REPLY
+from src.recipe_agent.nodes.search_recipes import search_recipes_factory
+from src.recipe_agent.schemas import UserInput
+
+
+class StubLLM:
+    """Deterministic LLM double that records how often each stage runs."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.extract_calls = 0
+        self.generate_calls = 0
+        self.max_concurrency_seen = []
+        self._lock = threading.Lock()
+
+    def _batch(self, fn, inputs, config=None, return_exceptions=False):
+        from concurrent.futures import ThreadPoolExecutor
+
+        self.max_concurrency_seen.append((config or {}).get("max_concurrency"))
+        with ThreadPoolExecutor(max_workers=(config or {}).get("max_concurrency") or 1) as pool:
+            return list(pool.map(fn, inputs))
+
+    def with_structured_output(self, schema):
+        llm = self
+
+        def extract(messages):
+            time.sleep(llm.delay)
+            with llm._lock:
+                llm.extract_calls += 1
+            text = messages[-1].content
+            if "boom" in text:
+                return ValueError("boom")
+            if "nothing" in text:
+                return UserInput()
+            return UserInput(ingredients=[w for w in ("rice", "egg", "tofu") if w in text])
+
+        return SimpleNamespace(
+            batch=lambda inputs, config=None, return_exceptions=False: self._batch(extract, inputs, config),
+            invoke=extract,
+        )
+
+    def invoke(self, messages):
+        time.sleep(self.delay)
+        with self._lock:
+            self.generate_calls += 1
+        return SimpleNamespace(content="recommendation")
+
+    def batch(self, inputs, config=None, return_exceptions=False):
+        return self._batch(self.invoke, inputs, config)
+
+
+def test_recommend_recipes_batch_dedupes_and_keeps_order():
+    llm = StubLLM()
+    messages = ["rice and egg", "tofu", "  Rice and EGG ", "nothing here", "boom"]
+
+    out = recommend_recipes_batch(messages, llm=llm, max_concurrency=3, ranker="local", fast_path_threshold=2)
+
+    assert out == ["recommendation", "recommendation", "recommendation", NO_INGREDIENTS_REPLY, FAILED_REPLY]
+    assert llm.extract_calls == 4  # duplicate message extracted once
+    assert llm.generate_calls == 2
+    assert llm.max_concurrency_seen == [3, 3]
+
+
+def test_batch_search_matches_single_search():
+    queries = [(["rice", "egg"], [], None, "Chinese"), ([], ["vegan"], 30, None), (["onion"], ["keto"], None, None)]
+    single = search_recipes_factory()
+    for (ingredients, dietary, max_time, cuisine), (rows, scores) in zip(queries, RECIPES_DB.search_many(queries)):
+        expected = single({
+            "ingredients": ingredients,
+            "dietary_restrictions": dietary,
+            "max_cooking_time": max_time,
+            "cuisine_preference": cuisine,
+        })
+        assert expected["total_matches"] == len(rows)
+        assert sorted(r["score"] for r in expected["matched_recipes"]) == sorted(scores.tolist())
+
+
+def test_batch_throughput_scales_with_concurrency():
+    messages = [f"rice and egg {i}" for i in range(8)]
+
+    start = time.perf_counter()
+    recommend_recipes_batch(messages, llm=StubLLM(delay=0.05), max_concurrency=8, ranker="local", fast_path_threshold=2)
+    elapsed = time.perf_counter() - start
+
+    # 8 extractions + 8 generations at 50ms each would take 0.8s serially
+    assert elapsed < 0.5
+
+
+def test_batch_shares_the_graph_caches_and_fast_path(monkeypatch):
+    from langchain_core.messages import HumanMessage
+
+    from src.recipe_agent.graph import build_recipe_graph
+
+    llm = StubLLM()
+    messages = ["rice and egg", "I'd love something with tofu tonight"]
+
+    # the lexicon parses the plain ingredient list, the LLM extracts the other
+    first = recommend_recipes_batch(messages, llm=llm, ranker="local", fast_path_threshold=0.9)
+    assert first == ["recommendation", "recommendation"]
+    assert (llm.extract_calls, llm.generate_calls) == (1, 2)
+
+    # a later batch is served from the caches
+    assert recommend_recipes_batch(messages, llm=llm, ranker="local", fast_path_threshold=0.9) == first
+    assert (llm.extract_calls, llm.generate_calls) == (1, 2)
+
+    # ... and so is an interactive request for the same message
+    monkeypatch.setattr("src.recipe_agent.graph.get_llm", lambda: llm)
+    graph = build_recipe_graph(ranker="local", mode="sequential", fast_path_threshold=0.9)
+    reply = graph.invoke({"messages": [HumanMessage(content=messages[1])]})["messages"][-1].content
+    assert reply == "recommendation"
+    assert (llm.extract_calls, llm.generate_calls) == (1, 2)
@@ -0,0 +1,21 @@
+from benchmarks.run import compare, run
+from benchmarks.synthetic import recipes_frame
+
+
+def test_synthetic_catalog_is_deterministic():
+    a, b = recipes_frame(50, seed=3), recipes_frame(50, seed=3)
+    assert a.equals(b)
+    assert len(a) == 50 and a["ingredients"].str.len().min() > 0
+
+
+def test_suite_runs_offline_and_flags_regressions():
+    result = run([300], queries=10, graph_runs=3)
+    benches = result["results"]["300"]
+    assert set(benches) == {
+        "load_recipes_db", "compile_catalog", "load_catalog", "search_recipes", "price_index_build", "get_best_ingredient_prices",
+        "wallet_import", "wallet_ops", "graph_invoke",
+    }
+
+    assert compare(result, result, tolerance=0.5) == []
+    faster = {"results": {"300": {"graph_invoke": {"median_ms": benches["graph_invoke"]["median_ms"] / 10}}}}
+    assert [r.split(":")[0] for r in compare(result, faster, tolerance=0.5)] == ["300/graph_invoke/median_ms"]
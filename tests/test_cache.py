@@ -0,0 +1,53 @@
+import time
+
+from src.recipe_agent.cache import LRUCache, SQLiteCache, TieredCache, make_cache_key
+
+
+def test_lru_cache_evicts_by_entries_and_bytes():
+    cache = LRUCache(max_entries=2)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    assert cache.get("a") == "1"  # a is now most recent
+    cache.set("c", "3")
+    assert cache.get("b") is None
+    assert cache.get("a") == "1" and cache.get("c") == "3"
+
+    sized = LRUCache(max_entries=10, max_bytes=5)
+    sized.set("a", "xxx")
+    sized.set("b", "yyy")
+    assert sized.get("a") is None and sized.get("b") == "yyy"
+    sized.set("big", "z" * 6)  # larger than the whole budget, not stored
+    assert sized.get("big") is None
+
+
+def test_lru_cache_ttl():
+    cache = LRUCache(ttl=0.01)
+    cache.set("a", "1")
+    time.sleep(0.02)
+    assert cache.get("a") is None
+
+
+def test_sqlite_cache_persists_and_evicts(tmp_path):
+    path = tmp_path / "c.sqlite"
+    cache = SQLiteCache(path, max_entries=3)
+    cache.EVICT_EVERY = 1
+    for i in range(5):
+        cache.set(f"k{i}", str(i))
+    assert len(cache) == 3
+    assert cache.get("k0") is None
+
+    reopened = SQLiteCache(path, max_entries=3)
+    assert reopened.get("k4") == "4"
+
+
+def test_tiered_cache_promotes_hits(tmp_path):
+    persistent = SQLiteCache(tmp_path / "c.sqlite")
+    persistent.set("k", "v")
+    cache = TieredCache(LRUCache(), persistent)
+    assert cache.get("k") == "v"
+    assert cache.memory.get("k") == "v"
+
+
+def test_make_cache_key_is_stable():
+    assert make_cache_key("a", [1, 2]) == make_cache_key("a", [1, 2])
+    assert make_cache_key("a", [1, 2]) != make_cache_key("a", [2, 1])
@@ -63,4 +63,22 @@ def test_extract_user_preferences_empty(mock_llm):
     assert result["ingredients"] == []
     assert result["dietary_restrictions"] == []
     assert result["max_cooking_time"] is None
-    assert result["cuisine_preference"] is None
\ No newline at end of file
+    assert result["cuisine_preference"] is None
+
+def test_extract_user_preferences_cache_hit_skips_llm(mock_llm, tmp_path):
+    from src.recipe_agent.cache import LRUCache, SQLiteCache, TieredCache
+
+    cache = TieredCache(LRUCache(), SQLiteCache(tmp_path / "extract.sqlite"))
+    extract_func = extract_user_preferences_factory(mock_llm, cache=cache)
+    extractor = mock_llm.with_structured_output.return_value
+
+    first = extract_func({"messages": [HumanMessage(content="I have rice, vegetables, beans and 20 minutes.")]})
+    # same text modulo case / whitespace
+    second = extract_func({"messages": [HumanMessage(content="  i have rice,  vegetables, beans and 20 minutes. ")]})
+    assert first == second
+    extractor.invoke.assert_called_once()
+
+    # persistent tier survives a new process-level memory cache
+    cold = extract_user_preferences_factory(mock_llm, cache=TieredCache(LRUCache(), SQLiteCache(tmp_path / "extract.sqlite")))
+    assert cold({"messages": [HumanMessage(content="I have rice, vegetables, beans and 20 minutes.")]}) == first
+    extractor.invoke.assert_called_once()
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+import httpx
+
+from src.recipe_agent.gateway import BATCH, LLMGateway, TokenBucket, priority
+from src.recipe_agent.llm import chat_model
+
+
+def _completion(content="hi"):
+    return {
+        "id": "chatcmpl-test",
+        "object": "chat.completion",
+        "created": 0,
+        "model": "gpt-4o-mini",
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+        "usage": {"prompt_tokens": 5, "completion_tokens": 1, "total_tokens": 6},
+    }
+
+
+def test_token_bucket_refills():
+    now = [0.0]
+    bucket = TokenBucket(60, capacity=2, clock=lambda: now[0])
+    assert bucket.wait_time(2) == 0
+    bucket.take(2)
+    assert bucket.wait_time(1) == 1.0
+    now[0] = 0.5
+    assert bucket.wait_time(1) == 0.5
+    bucket.adjust(-10)  # usage below the estimate: capped at capacity
+    assert bucket.level == 2
+    assert bucket.wait_time(100) == 0  # oversized requests wait for a full bucket only
+
+
+def test_interactive_calls_go_first():
+    gateway = LLMGateway(requests_per_minute=0, tokens_per_minute=0, max_concurrency=1)
+    order = []
+
+    async def main():
+        release = asyncio.Event()
+
+        async def call(name, wait=None):
+            async def run():
+                if wait is not None:
+                    await wait.wait()
+                order.append(name)
+                return name
+            return await gateway.ainvoke(run)
+
+        first = asyncio.create_task(call("first", release))
+        await asyncio.sleep(0.01)
+        with priority(BATCH):
+            batch = [asyncio.create_task(call(f"batch{i}")) for i in range(2)]
+        await asyncio.sleep(0.01)
+        interactive = asyncio.create_task(call("interactive"))
+        await asyncio.sleep(0.01)
+        release.set()
+        await asyncio.gather(first, *batch, interactive)
+
+    asyncio.run(main())
+    assert order == ["first", "interactive", "batch0", "batch1"]
+
+
+def test_request_rate_is_limited():
+    gateway = LLMGateway(requests_per_minute=0, tokens_per_minute=0)
+    gateway.requests = TokenBucket(1200, capacity=1)  # one request per 50ms
+    start = time.monotonic()
+    for _ in range(3):
+        gateway.invoke(lambda: None)
+    assert time.monotonic() - start >= 0.09
+
+
+def test_chat_model_coalesces_and_retries():
+    requests = []
+
+    async def handler(request):
+        requests.append(request)
+        if len(requests) == 1:
+            return httpx.Response(429, json={"error": {"message": "slow down"}}, headers={"retry-after": "0.01"})
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, json=_completion())
+
+    gateway = LLMGateway(requests_per_minute=0, tokens_per_minute=0, base_delay=0.01)
+
+    async def main():
+        llm = chat_model(
+            model="gpt-4o-mini",
+            api_key="test",
+            temperature=0,
+            gateway=gateway,
+            http_async_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+        )
+        return await asyncio.gather(*(llm.ainvoke("same prompt") for _ in range(5)))
+
+    replies = asyncio.run(main())
+    assert [r.content for r in replies] == ["hi"] * 5
+    assert len({id(r) for r in replies}) == 5  # each caller gets its own copy
+    assert len(requests) == 2  # one 429, one retry, shared by all five callers
+    assert gateway.stats["coalesced"] == 4
+    assert gateway.stats["rate_limited"] == 1
@@ -2,7 +2,7 @@ import pytest
 from unittest.mock import Mock
 from langchain_core.messages import HumanMessage
 
-from src.recipe_agent.graph import build_recipe_graph
+from src.recipe_agent.graph import build_recipe_graph, get_recommend_cache
 
 
 @pytest.fixture
@@ -43,4 +43,81 @@ def test_build_recipe_graph(mock_llm, monkeypatch):
     result = graph.invoke(initial_state)
 
     assert "messages" in result
-    assert len(result["messages"]) > 1  # Should have added responses
\ No newline at end of file
+    assert len(result["messages"]) > 1  # Should have added responses
+
+def test_recipe_graph_ainvoke_runs_sessions_concurrently(monkeypatch):
+    import asyncio
+    import time
+    from types import SimpleNamespace
+
+    from src.recipe_agent.schemas import UserInput
+
+    class SlowAsyncLLM:
+        model_name = "stub"
+
+        def with_structured_output(self, schema):
+            class Extractor:
+                async def ainvoke(self, messages):
+                    await asyncio.sleep(0.2)
+                    return UserInput(ingredients=["rice", "egg"], max_cooking_time=20)
+            return Extractor()
+
+        async def ainvoke(self, messages):
+            await asyncio.sleep(0.2)
+            return SimpleNamespace(content="Based on your ingredients...")
+
+    monkeypatch.setattr("src.recipe_agent.graph.get_llm", lambda: SlowAsyncLLM())
+    graph = build_recipe_graph(ranker="local")
+
+    async def run_many(n):
+        return await asyncio.gather(*[
+            graph.ainvoke({"messages": [HumanMessage(content=f"rice and egg #{i}")]}) for i in range(n)
+        ])
+
+    start = time.perf_counter()
+    results = asyncio.run(run_many(4))
+    elapsed = time.perf_counter() - start
+
+    assert all(r["messages"][-1].content == "Based on your ingredients..." for r in results)
+    # 4 sessions x 2 sequential LLM calls x 0.2s would take 1.6s if serialized
+    assert elapsed < 1.0
+
+
+def test_fused_graph_single_llm_call_renders_the_reply_locally(monkeypatch):
+    from src.recipe_agent.schemas import RankedRecommendation, UserInput
+
+    llm = Mock()
+    extractor = Mock()
+    extractor.invoke.return_value = UserInput(ingredients=["rice", "egg"])
+    fused = Mock()
+    # valid ids, but prose naming a recipe that is not a candidate
+    fused.invoke.return_value = RankedRecommendation.model_validate(
+        {"recipe_ids": [10, 3], "response": "1. Made-up Pie (5 min) - Martian"}
+    )
+
+    def structured(schema):
+        return extractor if schema is UserInput else fused
+
+    llm.with_structured_output.side_effect = structured
+    monkeypatch.setattr("src.recipe_agent.graph.get_llm", lambda: llm)
+
+    graph = build_recipe_graph(mode="fused")
+    result = graph.invoke({"messages": [HumanMessage(content="rice and egg")]})
+
+    ordered = result["matched_recipes"]
+    assert [r["id"] for r in ordered][:2] == [10, 3]
+    text = result["messages"][-1].content
+    assert "Made-up Pie" not in text
+    assert text.splitlines()[1:3] == [
+        f"{i}. {r['name']} ({r['cooking_time']} min) - {r['cuisine']}" for i, r in enumerate(ordered[:2], 1)
+    ]
+    fused.invoke.assert_called_once()
+    llm.invoke.assert_not_called()
+
+    # an id outside the candidate set is dropped
+    get_recommend_cache("fused").clear()
+    fused.invoke.return_value = RankedRecommendation(recipe_ids=[999, 3])
+    result = build_recipe_graph(mode="fused").invoke({"messages": [HumanMessage(content="rice and egg")]})
+    assert 999 not in [r["id"] for r in result["matched_recipes"]]
+    assert result["matched_recipes"][0]["id"] == 3
+    assert result["messages"][-1].content.splitlines()[1] == "1. Egg Fried Rice (15 min) - Chinese"
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+from src.recipe_agent.config import RECIPES_CSV
+from src.recipe_agent.data.ingredients import IngredientIndex, canonical_key
+from src.recipe_agent.data.prices import PriceIndex
+from src.recipe_agent.data.recipes_db import get_best_ingredient_prices, get_recipes_db, load_recipes_db
+from src.recipe_agent.data.store import RecipeStore
+
+
+def test_canonical_key_singularizes_and_strips():
+    assert canonical_key(" Tomatoes ") == "tomato"
+    assert canonical_key("Berries") == "berry"
+    assert canonical_key("extra-virgin Olive Oil!") == "extra virgin olive oil"
+    assert canonical_key("hummus") == "hummus"
+
+
+def test_resolve_plurals_synonyms_modifiers_and_typos():
+    index = IngredientIndex(["tomato", "spring onion", "chickpeas", "broccoli", "egg"])
+    tomato = index.resolve("tomato")
+
+    assert index.resolve("Tomatoes") == tomato
+    assert index.resolve("Roma tomatoes") == tomato
+    assert index.resolve("fresh ripe tomatoes") == tomato
+    assert index.resolve("scallions") == index.resolve("spring onion")
+    assert index.resolve("chickpea") == index.resolve("garbanzo beans")
+    assert index.resolve("brocoli") == index.resolve("broccoli")
+    assert index.resolve("eggs") == index.resolve("egg")
+    assert index.resolve("unobtainium") is None
+    assert index.resolve("peas") is None
+
+
+def test_synonym_ids_do_not_depend_on_insertion_order():
+    names = ["cherry tomatoes", "tomato", "scallions", "spring onion", "garbanzo beans", "chickpeas"]
+    forward, backward = IngredientIndex(names), IngredientIndex(names[::-1])
+    for index in (forward, backward):
+        assert len(index) == 3
+        assert index.resolve("cherry tomato") == index.resolve("tomato")
+        assert index.resolve("green onion") == index.resolve("spring onion")
+        assert index.resolve_exact("chick pea") == index.resolve_exact("chickpeas")
+    assert [forward.resolve(n) for n in names] == [0, 0, 1, 1, 2, 2]
+    assert [backward.resolve(n) for n in names] == [2, 2, 1, 1, 0, 0]
+
+
+def test_different_products_do_not_resolve():
+    index = IngredientIndex([
+        "chicken", "cheese", "honey", "rice", "tomato", "onion", "bread", "olive oil", "spices", "paneer", "yogurt",
+    ])
+    for name in [
+        "chicken broth", "cheesecake", "honeydew", "rice flour", "tomato paste", "onion powder",
+        "garlic bread", "olives", "spicy", "cottage cheese", "curd",
+    ]:
+        assert index.resolve(name) is None, name
+    # typos stay within a small edit distance of a single-word name
+    assert index.resolve("tomatoe") == index.resolve("tomato")
+    assert index.resolve_exact("tomatoe") is None
+
+
+def test_prices_are_not_guessed(tmp_path):
+    path = tmp_path / "prices.csv"
+    path.write_text("ingredient,store,price_usd,unit\nchicken,A,5.99,1lb\ntomato,B,0.5,each\n")
+    prices = PriceIndex(path)
+    assert prices.best("Tomatoes")["store"] == "B"
+    for name in ["chicken broth", "tomato paste", "tomatoe", "fresh tomatoes"]:
+        assert prices.best(name) is None, name
+        assert prices.lookup([name])[0]["price_usd"] is None
+
+
+def test_store_search_matches_canonical_ingredients():
+    records = [
+        {"id": 1, "name": "Salad", "cuisine": "X", "cooking_time": 5, "dietary": [], "ingredients": ["tomato", "cucumber"]},
+        {"id": 2, "name": "Toast", "cuisine": "X", "cooking_time": 5, "dietary": [], "ingredients": ["bread"]},
+    ]
+    store = RecipeStore.from_records(records)
+    rows, scores = store.search(["Roma tomatoes", "cucumbers"], [], None, None)
+    assert rows.tolist() == [0]
+    assert scores.tolist() == [2]
+    assert [r.tolist() for r, _ in store.search_many([(["Tomatoes"], [], None, None)])] == [[0]]
+
+
+def test_price_lookup_shares_recipe_ids(tmp_path):
+    assert get_best_ingredient_prices(["Tomatoes"])[0]["ingredient"] == "tomato"
+    assert get_best_ingredient_prices(["scallions"])[0]["ingredient"] == "spring onion"
+
+    # a private catalog: the price index registers "saffron" in the shared ids
+    store = load_recipes_db(RECIPES_CSV, artifact="off")
+    keys = len(store.ingredient_index)
+    path = tmp_path / "prices.csv"
+    path.write_text("ingredient,store,price_usd,unit\nSaffron,A,9.0,g\nrice,B,1.0,kg\n")
+    index = PriceIndex(path, index=store.ingredient_index)
+    assert index.best("saffron")["store"] == "A"
+    assert index.best("Rice")["store"] == "B"
+    assert len(store.ingredient_index) == keys + 1
+    # ids registered by the price index do not disturb the catalog search
+    assert len(store.search(["saffron"], [], None, None)[0]) == 0
+    assert get_recipes_db().ingredient_index.resolve_exact("saffron") is None
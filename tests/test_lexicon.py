@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+from unittest.mock import Mock
+
+from langchain_core.messages import HumanMessage
+
+from src.recipe_agent.data.recipes_db import RECIPES_DB
+from src.recipe_agent.lexicon import Lexicon
+from src.recipe_agent.nodes.extract_user_preferences import extract_user_preferences_factory
+from src.recipe_agent.schemas import UserInput
+
+
+def _lexicon():
+    return Lexicon.from_store(RECIPES_DB)
+
+
+def test_parse_simple_ingredient_list():
+    result, confidence = _lexicon().parse("Rice, eggs, spring onions, under 15 min, vegetarian")
+
+    assert result.ingredients == ["rice", "egg", "spring onion"]
+    assert result.dietary_restrictions == ["vegetarian"]
+    assert result.max_cooking_time == 15
+    assert result.cuisine_preference is None
+    assert confidence == 1.0
+
+
+def test_parse_cuisine_hours_and_multiword_terms():
+    result, confidence = _lexicon().parse("I have bell pepper and chickpea, 1 hour, gluten free Middle Eastern please")
+
+    assert result.ingredients == ["bell pepper", "chickpeas"]
+    assert result.dietary_restrictions == ["gluten-free"]
+    assert result.max_cooking_time == 60
+    assert result.cuisine_preference == "Middle Eastern"
+    assert confidence == 1.0
+
+
+def test_parse_unknown_words_lower_confidence():
+    result, confidence = _lexicon().parse("rice, eggs, peas")
+
+    assert result.ingredients == ["rice", "egg"]
+    assert 0 < confidence < 1
+
+
+def test_parse_negation_and_ambiguity_fall_back():
+    lex = _lexicon()
+    assert lex.parse("rice but no egg")[1] == 0.0
+    assert lex.parse("rice, Italian or Chinese")[1] == 0.0
+    assert lex.parse("")[1] == 0.0
+
+
+def test_extractor_skips_llm_above_threshold():
+    llm = Mock()
+    extractor = llm.with_structured_output.return_value
+    extractor.invoke.return_value = UserInput(ingredients=["rice", "peas"])
+    extract = extract_user_preferences_factory(llm, lexicon=_lexicon(), threshold=0.9)
+
+    fast = extract({"messages": [HumanMessage(content="rice and tofu, 20 minutes")]})
+    assert fast["ingredients"] == ["rice", "tofu"]
+    assert fast["max_cooking_time"] == 20
+    extractor.invoke.assert_not_called()
+
+    slow = extract({"messages": [HumanMessage(content="rice and peas")]})
+    assert slow["ingredients"] == ["rice", "peas"]
+    extractor.invoke.assert_called_once()
+
+
+def test_version_bound_lexicon_follows_the_catalog():
+    from src.recipe_agent.lexicon import VersionBoundLexicon
+
+    version = ["v1"]
+    vocab = {"v1": ["rice", "egg"], "v2": ["rice", "saffron"]}
+    built = []
+
+    def build():
+        built.append(version[0])
+        return Lexicon(vocab[version[0]], [], [])
+
+    lexicon = VersionBoundLexicon(build, lambda: version[0])
+    assert lexicon.parse("rice and egg")[0].ingredients == ["rice", "egg"]
+    assert lexicon.parse("rice and saffron")[1] < 1
+
+    version[0] = "v2"
+    result, confidence = lexicon.parse("rice and saffron")
+    assert result.ingredients == ["rice", "saffron"] and confidence == 1.0
+    assert lexicon.parse("rice and egg")[0].ingredients == ["rice"]
+
+    # a request still on the previous version does not rebuild it
+    version[0] = "v1"
+    lexicon.parse("egg")
+    assert built == ["v1", "v2"]
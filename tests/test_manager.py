@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import functools
+import os
+import shutil
+import time
+
+import pandas as pd
+
+from src.recipe_agent.config import PRICES_CSV, RECIPES_CSV
+from src.recipe_agent.data.manager import DataManager
+from src.recipe_agent.data.recipes_db import load_recipes_db
+from src.recipe_agent.data.store import RecipeStore
+
+
+def _touch(path, frame=None):
+    if frame is not None:
+        frame.to_csv(path, index=False)
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def _setup(tmp_path, artifact="off"):
+    recipes, prices = tmp_path / "recipes.csv", tmp_path / "prices.csv"
+    shutil.copy(RECIPES_CSV, recipes)
+    shutil.copy(PRICES_CSV, prices)
+    manager = DataManager(recipes, prices, load_recipes=functools.partial(load_recipes_db, artifact=artifact))
+    return manager, recipes, prices
+
+
+def _by_id(store):
+    return {r["id"]: r for r in store}
+
+
+def _edit(frame):
+    frame = frame.copy()
+    frame.loc[frame["id"] == frame["id"].iloc[0], "cooking_time"] = 99
+    frame.loc[frame["id"] == frame["id"].iloc[1], "ingredients"] = "saffron|rice"
+    added = frame.iloc[[2]].assign(id=frame["id"].max() + 1, name="Saffron Rice", cuisine="Persian")
+    return pd.concat([frame[frame["id"] != frame["id"].iloc[3]], added], ignore_index=True)
+
+
+def test_apply_changes_matches_a_full_rebuild():
+    frame = pd.read_csv(RECIPES_CSV)
+    store = RecipeStore.from_frame(frame)
+    edited = _edit(frame)
+    changed = edited[~edited["id"].isin(frame["id"]) | edited["id"].isin(frame["id"].iloc[:2])]
+
+    updated = store.apply_changes(changed, [int(frame["id"].iloc[3])])
+    rebuilt = RecipeStore.from_frame(edited, ingredient_index=store.ingredient_index)
+
+    assert list(updated) == list(rebuilt)
+    for query in [(["rice"], [], None, None), (["saffron"], [], None, "persian"), ([], ["vegan"], 30, None)]:
+        rows, scores = updated.search(*query)
+        expected_rows, expected_scores = rebuilt.search(*query)
+        assert rows.tolist() == expected_rows.tolist()
+        assert scores.tolist() == expected_scores.tolist()
+    # the original store is untouched
+    assert list(store) == list(RecipeStore.from_frame(frame))
+
+
+def test_refresh_publishes_a_new_generation_and_pins_the_old_one(tmp_path):
+    manager, recipes, _ = _setup(tmp_path)
+    frame = pd.read_csv(recipes)
+    assert manager.refresh() is False
+
+    with manager.pin() as pinned:
+        _touch(recipes, _edit(frame))
+        assert manager.refresh() is True
+        assert manager.snapshot() is pinned
+        assert _by_id(manager.snapshot().recipes) == _by_id(RecipeStore.from_frame(frame))
+
+    latest = manager.current()
+    assert latest.generation == pinned.generation + 1
+    assert _by_id(latest.recipes) == _by_id(RecipeStore.from_frame(_edit(frame)))
+    assert latest.prices is pinned.prices
+    rows, _ = latest.recipes.search(["saffron"], [], None, None)
+    assert [latest.recipes[int(r)]["id"] for r in rows] == [int(frame["id"].iloc[1])]
+
+
+def test_price_changes_are_applied_incrementally(tmp_path):
+    manager, _, prices = _setup(tmp_path)
+    old = manager.current().prices
+    untouched = old.offers("tofu")
+    assert old.best("rice") is not None
+
+    frame = pd.read_csv(prices)
+    frame.loc[frame["ingredient"] == "chickpeas", "price_usd"] = 0.01
+    frame = frame[frame["ingredient"] != "rice"]
+    frame = pd.concat([frame, pd.DataFrame([{"ingredient": "saffron", "store": "Spice Co", "price_usd": 4.5, "unit": "g"}])])
+    _touch(prices, frame)
+    assert manager.refresh() is True
+
+    new = manager.current().prices
+    assert new.best("chickpeas")["price_usd"] == 0.01
+    assert new.best("rice") is None
+    assert new.best("Saffron")["store"] == "Spice Co"
+    assert new._offers()[new.index.resolve("tofu")] is old._offers()[old.index.resolve("tofu")]
+    assert old.offers("tofu") == untouched
+    assert old.best("chickpeas")["price_usd"] > 0.01
+
+
+def test_catalog_loaded_from_artifact_is_not_reparsed_until_it_changes(tmp_path, monkeypatch):
+    recipes = tmp_path / "recipes.csv"
+    shutil.copy(RECIPES_CSV, recipes)
+    load_recipes_db(recipes, artifact="auto")
+
+    manager = DataManager(recipes, PRICES_CSV, load_recipes=functools.partial(load_recipes_db, artifact="use"))
+    frame = pd.read_csv(recipes)
+    reads = []
+    read = manager._read_recipes
+    monkeypatch.setattr(manager, "_read_recipes", lambda: reads.append(1) or read())
+    assert manager.refresh() is False
+    assert manager.refresh() is False
+    assert reads == []
+
+    _touch(recipes, _edit(frame))
+    assert manager.refresh() is True
+    assert _by_id(manager.current().recipes) == _by_id(RecipeStore.from_frame(_edit(frame)))
+    # the next change is diffed against the hashes taken above
+    edited = _edit(frame)
+    edited.loc[edited["id"] == edited["id"].iloc[5], "cooking_time"] = 7
+    _touch(recipes, edited)
+    assert manager.refresh() is True
+    assert _by_id(manager.current().recipes) == _by_id(RecipeStore.from_frame(edited))
+    assert reads == [1, 1]
+
+
+def test_watcher_picks_up_edits(tmp_path):
+    manager, recipes, _ = _setup(tmp_path)
+    manager.current()
+    manager.start(0.02)
+    try:
+        _touch(recipes, _edit(pd.read_csv(recipes)))
+        deadline = time.monotonic() + 5
+        while manager.current().generation == 0 and time.monotonic() < deadline:
+            time.sleep(0.02)
+    finally:
+        manager.stop()
+    assert manager.current().generation == 1
@@ -0,0 +1,108 @@
+import json
+import urllib.request
+from uuid import uuid4
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration, LLMResult
+
+from src.recipe_agent.metrics import (
+    HistogramRegistry,
+    JsonlSink,
+    LLMMetricsHandler,
+    Metrics,
+    annotate,
+    instrument_node,
+    serve_prometheus,
+)
+
+
+def test_span_records_fields_annotations_and_errors(tmp_path):
+    registry = HistogramRegistry(buckets=(0.1, 1.0))
+    metrics = Metrics([registry, JsonlSink(tmp_path / "events.jsonl")])
+
+    with metrics.span("node", "extract"):
+        annotate(cache_hit=True)
+    with pytest.raises(ValueError):
+        with metrics.span("node", "extract"):
+            raise ValueError("boom")
+
+    snap = registry.snapshot()["node:extract"]
+    assert snap["count"] == 2
+    assert snap["buckets"][1.0] == 2
+    assert snap["totals"] == {"cache_hit": 1}
+
+    events = [json.loads(line) for line in (tmp_path / "events.jsonl").read_text().splitlines()]
+    assert [e.get("error") for e in events] == [None, "ValueError"]
+    assert events[0]["cache_hit"] is True
+
+
+def test_instrument_node_records_candidate_counts():
+    registry = HistogramRegistry()
+    node = instrument_node(lambda state: {"matched_recipes": [1, 2, 3], "total_matches": 7}, Metrics([registry]))
+    node({})
+    node({})
+    assert registry.snapshot()["node:<lambda>"]["totals"] == {"candidates": 6, "total_matches": 14}
+
+
+def test_llm_handler_tokens_roll_up_into_node():
+    registry = HistogramRegistry()
+    metrics = Metrics([registry])
+    handler = LLMMetricsHandler(metrics)
+    run_id = uuid4()
+    result = LLMResult(
+        generations=[[ChatGeneration(message=AIMessage(content="ok"))]],
+        llm_output={"token_usage": {"prompt_tokens": 120, "completion_tokens": 30}},
+    )
+
+    with metrics.span("node", "generate_recommendation"):
+        handler.on_chat_model_start({}, [[HumanMessage(content="hi")]], run_id=run_id,
+                                    invocation_params={"model_name": "gpt-4o-mini"})
+        handler.on_llm_end(result, run_id=run_id)
+
+    snap = registry.snapshot()
+    assert snap["llm:gpt-4o-mini"]["totals"] == {"prompt_tokens": 120, "completion_tokens": 30}
+    assert snap["node:generate_recommendation"]["totals"] == {"prompt_tokens": 120, "completion_tokens": 30}
+
+
+def test_prometheus_text_and_endpoint():
+    registry = HistogramRegistry(buckets=(0.5,))
+    registry.record({"kind": "adk", "name": "call_adk", "seconds": 0.2, "cache_hit": True})
+    text = registry.to_prometheus()
+    assert 'recipe_agent_adk_seconds_bucket{name="call_adk",le="0.5"} 1' in text
+    assert 'recipe_agent_adk_seconds_count{name="call_adk"} 1' in text
+    assert 'recipe_agent_adk_cache_hit_total{name="call_adk"} 1' in text
+
+    server = serve_prometheus(0, registry=registry)
+    try:
+        # loopback unless configured otherwise
+        assert server.server_address[0] == "127.0.0.1"
+        url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+        assert urllib.request.urlopen(url).read().decode() == text
+    finally:
+        server.shutdown()
+
+
+def test_graph_nodes_are_instrumented(monkeypatch):
+    from unittest.mock import Mock
+
+    from src.recipe_agent.graph import build_recipe_graph
+    from src.recipe_agent.metrics import METRICS
+    from src.recipe_agent.schemas import UserInput
+
+    llm = Mock()
+    llm.with_structured_output.return_value.invoke.return_value = UserInput(ingredients=["rice"])
+    llm.invoke.return_value = Mock(content="reply")
+    monkeypatch.setattr("src.recipe_agent.graph.get_llm", lambda: llm)
+
+    registry = HistogramRegistry()
+    METRICS.add_sink(registry)
+    try:
+        build_recipe_graph(fast_path_threshold=2).invoke({"messages": [HumanMessage(content="rice please")]})
+    finally:
+        METRICS.remove_sink(registry)
+
+    snap = registry.snapshot()
+    assert {"node:extract_user_preferences", "node:search_recipes", "node:rank_recipes",
+            "node:generate_recommendation"} <= set(snap)
+    assert snap["node:search_recipes"]["totals"]["candidates"] > 0
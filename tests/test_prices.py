@@ -0,0 +1,44 @@
+import os
+
+import pandas as pd
+
+from src.recipe_agent.config import PRICES_CSV
+from src.recipe_agent.data.prices import PriceIndex
+from src.recipe_agent.data.recipes_db import get_best_ingredient_prices
+
+
+def _scan_best_prices(path, ingredients):
+    df = pd.read_csv(path)
+    df["ingredient"] = df["ingredient"].astype(str).str.lower().str.strip()
+    results = []
+    for ing in ingredients:
+        ing2 = ing.lower().strip()
+        sub = df[df["ingredient"] == ing2]
+        if sub.empty:
+            results.append({"ingredient": ing2, "store": None, "price_usd": None, "unit": None})
+        else:
+            best = sub.sort_values("price_usd", ascending=True).iloc[0]
+            results.append({"ingredient": ing2, "store": str(best["store"]),
+                            "price_usd": float(best["price_usd"]), "unit": str(best["unit"])})
+    return results
+
+
+def test_get_best_ingredient_prices_matches_csv_scan():
+    basket = ["Chickpeas", " rice ", "unobtainium", "tofu"]
+    assert get_best_ingredient_prices(basket) == _scan_best_prices(PRICES_CSV, basket)
+    assert get_best_ingredient_prices(basket)[0]["store"] == "Walmart"
+
+
+def test_price_index_k_cheapest_and_reload(tmp_path):
+    path = tmp_path / "prices.csv"
+    path.write_text(
+        "ingredient,store,price_usd,unit\n"
+        "Milk,A,2.0,1l\nmilk,B,1.5,1l\nmilk,C,3.0,1l\nmilk,D,1.0,1l\n"
+    )
+    index = PriceIndex(path, k=2)
+    assert [o["store"] for o in index.offers("milk")] == ["D", "B"]
+    assert index.best("MILK")["price_usd"] == 1.0
+
+    path.write_text("ingredient,store,price_usd,unit\nmilk,E,0.5,1l\n")
+    os.utime(path, ns=(1, 1))  # make sure the fingerprint changes
+    assert index.best("milk")["store"] == "E"
@@ -0,0 +1,39 @@
+from src.recipe_agent.nodes.generate_recommendation import build_recommendation_prompt
+from src.recipe_agent.nodes.rank_recipes import LLMRanker
+from src.recipe_agent.prompt_format import format_candidates, format_row
+from src.recipe_agent.tokens import estimate_tokens
+
+
+RECIPES = [
+    {"id": i, "name": f"Dish {i}", "cuisine": "Thai", "cooking_time": 10 + i, "dietary": ["vegan"],
+     "ingredients": ["rice", "tofu"], "instructions": "Cook it all slowly. " * 20, "score": 5 - i}
+    for i in range(5)
+]
+
+
+def test_table_has_only_requested_columns():
+    table, n = format_candidates(RECIPES[:2], ("id", "name", "time"))
+    assert n == 2
+    assert table.splitlines() == ["id|name|time", "0|Dish 0|10", "1|Dish 1|11"]
+    assert format_row({"name": "A|B\nC", "ingredients": ["x", "y"]}, ("name", "ingredients")) == "A/B C|x,y"
+
+
+def test_budget_truncates_deterministically_and_keeps_first_row():
+    columns = ("name", "time", "cuisine")
+    full, _ = format_candidates(RECIPES, columns)
+    table, n = format_candidates(RECIPES, columns, token_budget=estimate_tokens(full) - 1)
+    assert 0 < n < len(RECIPES)
+    assert estimate_tokens(table) <= estimate_tokens(full) - 1
+    assert full.startswith(table)
+    assert format_candidates(RECIPES, columns, token_budget=1)[1] == 1
+    assert format_candidates(RECIPES, columns, token_budget=1) == format_candidates(RECIPES, columns, token_budget=1)
+
+
+def test_prompts_leave_out_instructions():
+    state = {"ingredients": ["rice"], "dietary_restrictions": [], "max_cooking_time": None}
+    prompt = build_recommendation_prompt(state, RECIPES)
+    assert "Cook it all" not in prompt
+    assert "Dish 0|10|Thai|vegan|rice,tofu" in prompt
+
+    rank_prompt = LLMRanker(llm=None, token_budget=None).build_prompt(state, RECIPES)
+    assert "Dish 4|14|Thai|1" in rank_prompt
@@ -92,4 +92,53 @@ def test_rank_recipes_invalid_names(mock_llm):
     assert len(ranked) == 2
     # Should fall back to score sorting
     assert ranked[0]["name"] == "Veggie Rice Bowl"
-    assert ranked[1]["name"] == "Vegetable Fried Rice"
\ No newline at end of file
+    assert ranked[1]["name"] == "Vegetable Fried Rice"
+
+def test_local_ranker_needs_no_llm():
+    rank_func = rank_recipes_factory()
+
+    state: RecipeAgentState = {
+        "ingredients": ["rice", "egg", "soy sauce"],
+        "dietary_restrictions": [],
+        "max_cooking_time": 30,
+        "cuisine_preference": "Chinese",
+        "matched_recipes": [
+            {"name": "Tofu Buddha Bowl", "cuisine": "Asian", "cooking_time": 30, "score": 2,
+             "dietary": ["vegan"], "ingredients": ["tofu", "rice", "spinach", "carrot", "soy sauce"]},
+            {"name": "Egg Fried Rice", "cuisine": "Chinese", "cooking_time": 15, "score": 5,
+             "dietary": [], "ingredients": ["rice", "egg", "soy sauce", "spring onion", "garlic"]},
+        ],
+    }
+
+    ranked = rank_func(state)["matched_recipes"]
+    assert [r["name"] for r in ranked] == ["Egg Fried Rice", "Tofu Buddha Bowl"]
+    assert rank_func(state)["matched_recipes"] == ranked  # deterministic
+
+
+def test_get_ranker_modes(mock_llm):
+    from src.recipe_agent.nodes.rank_recipes import get_ranker, LLMRanker, LocalRanker
+
+    assert isinstance(get_ranker("local"), LocalRanker)
+    assert isinstance(get_ranker("llm", mock_llm), LLMRanker)
+    with pytest.raises(ValueError):
+        get_ranker("llm")
+
+    rank_func = rank_recipes_factory(ranker=get_ranker("llm", mock_llm))
+    rank_func({"matched_recipes": [{"name": "Veggie Rice Bowl", "cuisine": "Fusion", "cooking_time": 18, "score": 4}]})
+    mock_llm.invoke.assert_called_once()
+
+
+def test_local_ranker_counts_synonyms_as_overlap():
+    from src.recipe_agent.data.ingredients import IngredientIndex
+    from src.recipe_agent.nodes.rank_recipes import LocalRanker
+
+    ranker = LocalRanker(index=IngredientIndex(["spring onion", "rice", "noodle", "egg"]))
+    state: RecipeAgentState = {"ingredients": ["scallions", "rice"]}
+    with_synonym = {"name": "Spring Onion Rice", "score": 2, "ingredients": ["rice", "green onion"]}
+    without = {"name": "Egg Noodles", "score": 2, "ingredients": ["noodle", "egg"]}
+
+    spelled_out = {**with_synonym, "ingredients": ["rice", "spring onion"]}
+    unrelated = {**with_synonym, "ingredients": ["rice", "leek"]}
+    assert ranker.score(state, with_synonym) == ranker.score(state, spelled_out)
+    assert ranker.score(state, with_synonym) > ranker.score(state, unrelated)
+    assert [r["name"] for r in ranker.rank(state, [without, with_synonym])] == ["Spring Onion Rice", "Egg Noodles"]
@@ -1,3 +1,5 @@
+import os
+
 import pytest
 from unittest.mock import Mock
 from langchain_core.messages import AIMessage
@@ -63,4 +65,62 @@ def test_generate_recommendation_no_recipes(mock_llm):
 
     assert "I couldn’t find a matching recipe" in result["messages"][0].content
 
-    mock_llm.invoke.assert_not_called()
\ No newline at end of file
+    mock_llm.invoke.assert_not_called()
+
+def test_generate_recommendation_cache(mock_llm, tmp_path):
+    from src.recipe_agent.cache import FileBoundCache, LRUCache
+
+    csv = tmp_path / "recipes.csv"
+    csv.write_text("id,name\n1,a\n")
+    original = csv.stat()
+    cache = FileBoundCache(LRUCache(max_entries=8), csv)
+    recommend_func = generate_recommendation_factory(mock_llm, cache=cache)
+
+    recipes = [
+        {"id": 1, "name": "Veggie Rice Bowl", "cooking_time": 18, "cuisine": "Fusion"},
+        {"id": 2, "name": "Vegetable Fried Rice", "cooking_time": 15, "cuisine": "Asian"},
+    ]
+    state: RecipeAgentState = {"ingredients": ["rice", "beans"], "matched_recipes": recipes}
+    same_prefs: RecipeAgentState = {"ingredients": ["Beans", "rice"], "matched_recipes": recipes}
+
+    first = recommend_func(state)
+    assert recommend_func(same_prefs) == first
+    mock_llm.invoke.assert_called_once()
+
+    # candidate order is part of the key
+    recommend_func({"ingredients": ["rice", "beans"], "matched_recipes": recipes[::-1]})
+    assert mock_llm.invoke.call_count == 2
+
+    # editing the catalog invalidates cached recommendations
+    csv.write_text("id,name\n1,a\n2,b\n")
+    recommend_func(state)
+    assert mock_llm.invoke.call_count == 3
+
+    # going back to the old version finds its entries again
+    csv.write_text("id,name\n1,a\n")
+    os.utime(csv, ns=(original.st_atime_ns, original.st_mtime_ns))
+    recommend_func(state)
+    assert mock_llm.invoke.call_count == 3
+
+
+def test_recommendation_cache_key_covers_the_prompt_template(mock_llm, monkeypatch):
+    from src.recipe_agent.cache import LRUCache
+    from src.recipe_agent.nodes import generate_recommendation, rank_and_recommend
+
+    recipes = [{"id": 1, "name": "Veggie Rice Bowl", "cooking_time": 18, "cuisine": "Fusion"}]
+    state: RecipeAgentState = {"ingredients": ["rice"], "matched_recipes": recipes}
+    recommend_func = generate_recommendation_factory(mock_llm, cache=LRUCache(max_entries=8))
+
+    recommend_func(state)
+    recommend_func(state)
+    assert mock_llm.invoke.call_count == 1
+
+    # editing the prompt template invalidates replies generated from the old one
+    monkeypatch.setattr(generate_recommendation, "PROMPT_HASH", "edited")
+    recommend_func(state)
+    assert mock_llm.invoke.call_count == 2
+
+    # the fused node's prompt is keyed separately
+    assert rank_and_recommend.PROMPT_HASH != generate_recommendation.prompt_hash(
+        generate_recommendation.build_recommendation_prompt
+    )
@@ -1,6 +1,7 @@
 import pytest
-from src.recipe_agent.nodes.search_recipes import search_recipes
+from src.recipe_agent.nodes.search_recipes import search_recipes, search_recipes_factory
 from src.recipe_agent.state import RecipeAgentState
+from src.recipe_agent.tokens import estimate_tokens
 
 
 def test_search_recipes_with_ingredients():
@@ -121,4 +122,65 @@ def test_search_recipes_all_filters():
     # Check scoring
     for r in recipes:
         expected_score = len(user_ings.intersection(set(x.lower() for x in r["ingredients"]))) + (2 if r["cuisine"].lower() == "asian" else 0)
-        assert r["score"] == expected_score
\ No newline at end of file
+        assert r["score"] == expected_score
+
+def _scan_search(recipes, state):
+    ingredients = set(i.lower() for i in state.get("ingredients", []))
+    dietary = set(state.get("dietary_restrictions", []))
+    max_time = state.get("max_cooking_time", None)
+    cuisine_pref = (state.get("cuisine_preference", "") or "").lower()
+    out = []
+    for r in recipes:
+        r_ings = set(x.lower() for x in r["ingredients"])
+        if dietary and not dietary.issubset(set(r["dietary"])):
+            continue
+        if max_time is not None and r["cooking_time"] > max_time:
+            continue
+        overlap = len(ingredients & r_ings) if ingredients else 0
+        if ingredients and overlap == 0:
+            continue
+        out.append({**r, "score": overlap + (2 if cuisine_pref and r["cuisine"].lower() == cuisine_pref else 0)})
+    return out
+
+
+@pytest.mark.parametrize("state", [
+    {"ingredients": ["Rice", "egg", "garlic"], "cuisine_preference": "chinese"},
+    {"ingredients": ["onion", "spinach"], "max_cooking_time": 25},
+    {"ingredients": [], "dietary_restrictions": ["vegan"]},
+    {"ingredients": ["yogurt"], "dietary_restrictions": ["vegetarian", "gluten-free"]},
+])
+def test_search_recipes_index_matches_full_scan(state):
+    from src.recipe_agent.data.recipes_db import RECIPES_DB
+
+    expected = sorted(_scan_search(RECIPES_DB, state), key=lambda r: r["score"], reverse=True)
+    assert search_recipes_factory(None, None)(state)["matched_recipes"] == expected
+
+
+def test_search_recipes_top_k_is_deterministic():
+    state: RecipeAgentState = {"ingredients": ["garlic", "onion", "rice", "soy sauce"]}
+    full = search_recipes_factory(None, None)(state)
+    out = search_recipes_factory(top_k=2, token_budget=None)(state)
+
+    assert out["total_matches"] == len(full["matched_recipes"]) > 2
+    assert out["candidate_limit"] == 2
+    assert out["matched_recipes"] == full["matched_recipes"][:2]
+    scores = [r["score"] for r in out["matched_recipes"]]
+    assert scores == sorted(scores, reverse=True)
+
+
+def test_search_recipes_token_budget_caps_candidates():
+    state: RecipeAgentState = {"ingredients": ["garlic", "onion", "rice"]}
+    out = search_recipes_factory(top_k=None, token_budget=1)(state)
+    # best candidate is always kept, the rest do not fit
+    assert len(out["matched_recipes"]) == 1
+    assert out["total_matches"] > 1
+
+
+def test_search_recipes_token_budget_matches_the_prompt_table():
+    from src.recipe_agent.prompt_format import CANDIDATE_COLUMNS, format_candidates
+
+    state: RecipeAgentState = {"ingredients": ["garlic", "onion", "rice"]}
+    full = search_recipes_factory(None, None)(state)["matched_recipes"]
+    table, _ = format_candidates(full[:3], CANDIDATE_COLUMNS)
+    out = search_recipes_factory(top_k=None, token_budget=estimate_tokens(table) + 3)(state)
+    assert out["matched_recipes"] == full[:3]
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import asyncio
+import shutil
+
+from starlette.applications import Starlette
+from starlette.testclient import TestClient
+
+from src.recipe_agent.config import RECIPES_CSV
+from src.recipe_agent.data.artifact import is_fresh
+from src.recipe_agent.serving import add_readiness, prepare_shared_data, warm_llm_connections
+
+
+def test_ready_only_after_warmup():
+    calls = []
+
+    async def warmup():
+        calls.append("warm")
+        return {"data": 0.5}
+
+    app = add_readiness(Starlette(), warmup)
+    client = TestClient(app)
+    # no lifespan yet: warmup has not run
+    assert client.get("/healthz").status_code == 200
+    assert client.get("/ready").status_code == 503
+
+    with TestClient(app) as client:
+        response = client.get("/ready")
+    assert response.status_code == 200
+    body = response.json()
+    assert body["ready"] is True
+    assert body["warmup"]["data"] == 0.5 and "total" in body["warmup"]
+    assert calls == ["warm"]
+
+
+def test_prepare_shared_data_compiles_once(tmp_path):
+    recipes = tmp_path / "recipes.csv"
+    shutil.copy(RECIPES_CSV, recipes)
+    prepare_shared_data(recipes)
+    assert is_fresh(recipes)
+    meta = (tmp_path / "recipes.catalog" / "meta.json").stat().st_mtime_ns
+    prepare_shared_data(recipes)
+    assert (tmp_path / "recipes.catalog" / "meta.json").stat().st_mtime_ns == meta
+
+
+def test_llm_warmup_failure_does_not_raise():
+    from langchain_openai import ChatOpenAI
+
+    # nothing listens on port 9
+    llm = ChatOpenAI(model="gpt-4o-mini", api_key="test", base_url="http://127.0.0.1:9/v1")
+    assert asyncio.run(warm_llm_connections(llm)) >= 0
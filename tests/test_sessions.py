@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import asyncio
+
+from google.adk.events.event import Event
+from google.adk.events.event_actions import EventActions
+from google.adk.sessions.sqlite_session_service import SqliteSessionService
+from google.genai import types
+
+from src.recipe_agent.sessions import BoundedSessionService
+
+APP = "recipe_app"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _event(author: str, text: str, **state) -> Event:
+    return Event(
+        author=author,
+        invocation_id="inv",
+        content=types.Content(role="user" if author == "user" else "model", parts=[types.Part(text=text)]),
+        actions=EventActions(state_delta=state),
+    )
+
+
+async def _turn(service, session, text: str, replies: int = 1):
+    await service.append_event(session, _event("user", text))
+    for i in range(replies):
+        await service.append_event(session, _event("recipe_manager", f"{text} reply {i}"))
+
+
+def test_event_cap_cuts_at_a_user_turn():
+    async def scenario():
+        service = BoundedSessionService(max_events=5, idle_ttl=None, max_bytes=None)
+        session = await service.create_session(app_name=APP, user_id="u", session_id="s")
+        for text in ("one", "two", "three"):
+            await _turn(service, session, text, replies=2)
+        stored = await service.get_session(app_name=APP, user_id="u", session_id="s")
+        return [e.content.parts[0].text for e in stored.events], service
+
+    texts, service = asyncio.run(scenario())
+    assert texts == ["three", "three reply 0", "three reply 1"]
+    assert service.resident_bytes > 0
+
+
+def test_idle_ttl_and_memory_budget_evict_least_recently_used():
+    async def scenario():
+        clock = FakeClock()
+        service = BoundedSessionService(max_events=100, idle_ttl=60, max_bytes=None, clock=clock)
+        for sid in ("a", "b"):
+            await service.create_session(app_name=APP, user_id="u", session_id=sid)
+        clock.now = 30
+        assert await service.get_session(app_name=APP, user_id="u", session_id="b") is not None
+        clock.now = 70
+        idle_gone = await service.get_session(app_name=APP, user_id="u", session_id="a")
+        still_there = await service.get_session(app_name=APP, user_id="u", session_id="b")
+
+        budget = BoundedSessionService(max_events=100, idle_ttl=None, max_bytes=2000, clock=clock)
+        sessions = [await budget.create_session(app_name=APP, user_id="u", session_id=str(i)) for i in range(3)]
+        await budget.get_session(app_name=APP, user_id="u", session_id="0")
+        for session in sessions[1:]:
+            await _turn(budget, session, "x" * 400, replies=1)
+        resident = [str(i) for i in range(3) if await budget.get_session(app_name=APP, user_id="u", session_id=str(i))]
+        return idle_gone, still_there, resident, budget
+
+    idle_gone, still_there, resident, budget = asyncio.run(scenario())
+    assert idle_gone is None
+    assert still_there is not None
+    assert "2" in resident and len(resident) < 3
+    assert budget.resident_bytes <= 2000
+    assert budget.evictions >= 1
+
+
+def test_persistent_tier_restores_evicted_sessions_and_survives_restart(tmp_path):
+    db = str(tmp_path / "sessions.sqlite")
+
+    async def scenario():
+        service = BoundedSessionService(max_events=3, idle_ttl=None, max_bytes=1, persistent=SqliteSessionService(db))
+        first = await service.create_session(app_name=APP, user_id="u", session_id="first", state={"user:name": "Ana"})
+        await _turn(service, first, "hello", replies=1)
+        await service.append_event(first, _event("recipe_manager", "noted", pantry="rice"))
+        # the budget keeps only the session in use, so this evicts "first"
+        other = await service.create_session(app_name=APP, user_id="v", session_id="other")
+        await _turn(service, other, "hi")
+        assert len(service) == 1
+
+        restored = await service.get_session(app_name=APP, user_id="u", session_id="first")
+        restored_texts = [e.content.parts[0].text for e in restored.events]
+        await _turn(service, restored, "again")
+
+        restarted = BoundedSessionService(max_events=3, persistent=SqliteSessionService(db))
+        after_restart = await restarted.get_session(app_name=APP, user_id="u", session_id="first")
+        listed = await restarted.list_sessions(app_name=APP)
+        await restarted.delete_session(app_name=APP, user_id="u", session_id="first")
+        deleted = await BoundedSessionService(persistent=SqliteSessionService(db)).get_session(
+            app_name=APP, user_id="u", session_id="first",
+        )
+        return restored, restored_texts, after_restart, listed, deleted
+
+    restored, restored_texts, after_restart, listed, deleted = asyncio.run(scenario())
+    assert restored.state == {"pantry": "rice", "user:name": "Ana"}
+    assert restored_texts == ["hello", "hello reply 0", "noted"]
+    assert [e.content.parts[0].text for e in after_restart.events] == ["again", "again reply 0"]
+    assert after_restart.state["user:name"] == "Ana"
+    assert {s.id for s in listed.sessions} == {"first", "other"}
+    assert deleted is None
@@ -0,0 +1,37 @@
+import subprocess
+import sys
+
+from tests.conftest import PROJECT_ROOT
+
+
+def test_import_does_no_eager_work():
+    probe = (
+        "import sys\n"
+        "import src.recipe_agent.app as app\n"
+        "from src.recipe_agent.data import recipes_db\n"
+        "from src.recipe_agent import runtime\n"
+        "assert not app._GRAPH.initialized\n"
+        "assert not recipes_db._DATA.initialized\n"
+        "assert not runtime._RUNNER.initialized\n"
+        "assert 'pandas' not in sys.modules\n"
+        "assert 'langchain_openai' not in sys.modules\n"
+    )
+    # no OPENAI_API_KEY needed until the graph is built
+    env = {"PATH": "", "PYTHONPATH": str(PROJECT_ROOT)}
+    subprocess.run([sys.executable, "-c", probe], cwd=PROJECT_ROOT, env=env, check=True)
+
+
+def test_lazy_attributes_and_warmup(monkeypatch, tmp_path):
+    from src.recipe_agent import runtime
+    from src.recipe_agent.data import recipes_db
+    from src.recipe_agent.data.wallet import WalletStore
+    from src.recipe_agent.lazy import Lazy
+
+    assert recipes_db.RECIPES_DB is recipes_db.get_recipes_db()
+    assert recipes_db.PRICE_INDEX is recipes_db.get_price_index()
+
+    monkeypatch.setattr(recipes_db, "_WALLET", Lazy(lambda: WalletStore(tmp_path / "wallet.sqlite")))
+    monkeypatch.setattr("src.recipe_agent.app._GRAPH", Lazy(lambda: "graph"))
+    timings = runtime.warmup()
+    assert set(timings) == {"recipes", "prices", "wallet", "graph", "runner"}
+    assert runtime.runner is runtime.get_runner()
@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+
+from src.recipe_agent.config import RECIPES_CSV
+from src.recipe_agent.data.recipes_db import load_recipes_db
+from src.recipe_agent.data.store import RecipeStore, as_recipe_store
+
+
+def test_load_recipes_db_returns_columnar_store():
+    store = load_recipes_db()
+    df = pd.read_csv(RECIPES_CSV)
+
+    assert isinstance(store, RecipeStore)
+    assert len(store) == len(df)
+    assert store.cooking_time.dtype == np.int64
+    assert store.cuisine_codes.dtype == np.int32
+    assert len(store.ing_offsets) == len(store) + 1
+
+    first = store[0]
+    assert first["name"] == df.loc[0, "name"]
+    assert first["ingredients"] == [x.strip() for x in df.loc[0, "ingredients"].split("|")]
+    # empty dietary cell -> []
+    egg_rice = next(r for r in store if r["name"] == "Egg Fried Rice")
+    assert egg_rice["dietary"] == []
+
+
+def test_store_filter_mask_is_vectorized_and_exact():
+    store = load_recipes_db()
+    mask = store.filter_mask(["vegan", "gluten-free"], 20)
+    expected = [
+        {"vegan", "gluten-free"}.issubset(r["dietary"]) and r["cooking_time"] <= 20 for r in store
+    ]
+    assert mask.tolist() == expected
+    assert not store.filter_mask(["keto"], None).any()
+
+
+def test_from_records_keeps_dict_views():
+    records = [
+        {"id": 7, "name": "A", "cuisine": "Thai", "cooking_time": 10, "dietary": [], "ingredients": ["Rice", "lime"]},
+        {"id": 8, "name": "B", "cuisine": "thai", "cooking_time": 40, "dietary": ["vegan"], "ingredients": ["rice"]},
+    ]
+    store = as_recipe_store(records)
+    assert as_recipe_store(records) is store
+    assert store[0] == records[0]
+
+    rows, scores = store.search(["rice"], [], None, "THAI")
+    assert rows.tolist() == [0, 1]
+    assert scores.tolist() == [3, 3]
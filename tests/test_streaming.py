@@ -0,0 +1,95 @@
+import asyncio
+from types import SimpleNamespace
+
+from langchain_core.messages import HumanMessage
+
+from src.recipe_agent import runtime
+from src.recipe_agent.graph import build_recipe_graph, get_recommend_cache
+from src.recipe_agent.schemas import UserInput
+from src.recipe_agent.streaming import emit
+
+
+class StreamingLLM:
+    model_name = "stub"
+    chunks = ["Based on ", "your ingredients", "..."]
+
+    def with_structured_output(self, schema):
+        extractor = SimpleNamespace()
+        extractor.invoke = lambda messages: UserInput(ingredients=["rice", "egg"])
+
+        async def ainvoke(messages):
+            return extractor.invoke(messages)
+
+        extractor.ainvoke = ainvoke
+        return extractor
+
+    def stream(self, messages):
+        for c in self.chunks:
+            yield SimpleNamespace(content=c)
+
+    async def astream(self, messages):
+        for c in self.chunks:
+            yield SimpleNamespace(content=c)
+
+
+def test_graph_streams_generation_tokens(monkeypatch):
+    monkeypatch.setattr("src.recipe_agent.graph.get_llm", lambda: StreamingLLM())
+    graph = build_recipe_graph(ranker="local", streaming=True)
+    inputs = {"messages": [HumanMessage(content="rice and egg")]}
+
+    async def collect(g):
+        return [c async for c in g.astream(inputs, stream_mode="custom")]
+
+    assert asyncio.run(collect(graph)) == StreamingLLM.chunks
+    # graphs share the recommendation cache: a repeated query is a hit, streamed as one chunk
+    other = build_recipe_graph(ranker="local", streaming=True)
+    assert list(other.stream(inputs, stream_mode="custom")) == ["".join(StreamingLLM.chunks)]
+
+    get_recommend_cache().clear()
+    assert list(other.stream(inputs, stream_mode="custom")) == StreamingLLM.chunks
+    assert list(graph.stream(inputs, stream_mode="custom")) == ["".join(StreamingLLM.chunks)]
+    assert graph.invoke(inputs)["messages"][-1].content == "".join(StreamingLLM.chunks)
+
+
+def _event(text, partial=False, final=False):
+    return SimpleNamespace(
+        partial=partial,
+        content=SimpleNamespace(parts=[SimpleNamespace(text=text)]),
+        error_message=None,
+        is_final_response=lambda: final,
+    )
+
+
+class FakeRunner:
+    def __init__(self, tool_chunks, events):
+        self.tool_chunks = tool_chunks
+        self.events = events
+
+    async def run_async(self, **kwargs):
+        for chunk in self.tool_chunks:  # what recommend_recipes forwards
+            emit(chunk)
+            await asyncio.sleep(0)
+        for event in self.events:
+            yield event
+
+
+def _collect(monkeypatch, fake):
+    monkeypatch.setattr(runtime, "runner", fake)
+
+    async def run():
+        return [c async for c in runtime.call_adk_stream("hi", session_id="s", user_id="u")]
+
+    return asyncio.run(run())
+
+
+def test_call_adk_stream_forwards_tool_tokens_without_echo(monkeypatch):
+    fake = FakeRunner(["Based on ", "rice"], [_event("Based on rice", final=True)])
+    assert _collect(monkeypatch, fake) == ["Based on ", "rice"]
+
+
+def test_call_adk_stream_agent_partials_then_final(monkeypatch):
+    fake = FakeRunner([], [_event("Your ", partial=True), _event("balance", partial=True), _event("Your balance", final=True)])
+    assert _collect(monkeypatch, fake) == ["Your ", "balance"]
+
+    only_final = FakeRunner([], [_event("Done", final=True)])
+    assert _collect(monkeypatch, only_final) == ["Done"]
@@ -0,0 +1,50 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.recipe_agent.data.wallet import WalletStore
+
+
+@pytest.fixture()
+def wallet(tmp_path):
+    csv_path = tmp_path / "wallet.csv"
+    csv_path.write_text("user_id,balance_usd,pin\nuser_001,25.0,1234\nuser_002,12.5,0567\n")
+    return WalletStore(tmp_path / "wallet.sqlite", csv_path)
+
+
+def test_wallet_imports_csv_once(wallet, tmp_path):
+    assert wallet.authenticate("user_001", "1234")
+    assert wallet.authenticate("user_002", "0567")
+    assert not wallet.authenticate("user_001", "0000")
+    assert not wallet.authenticate("nobody", "1234")
+    assert wallet.balance("user_002") == 12.5
+
+    wallet.deduct("user_001", 5)
+    # the CSV is not re-imported over the database on reopen
+    reopened = WalletStore(tmp_path / "wallet.sqlite", tmp_path / "wallet.csv")
+    assert reopened.balance("user_001") == 20.0
+
+
+def test_wallet_deduct_errors(wallet):
+    with pytest.raises(ValueError, match="User not found"):
+        wallet.deduct("nobody", 1)
+    with pytest.raises(ValueError, match="Insufficient funds"):
+        wallet.deduct("user_002", 12.51)
+    with pytest.raises(ValueError):
+        wallet.deduct("user_002", -1)
+    assert wallet.deduct("user_002", 12.5) == 0.0
+
+
+def test_wallet_concurrent_deductions_are_not_lost(wallet):
+    def spend(_):
+        try:
+            wallet.deduct("user_001", 0.25)
+            return True
+        except ValueError:
+            return False
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        ok = sum(pool.map(spend, range(120)))
+
+    assert ok == 100
+    assert wallet.balance("user_001") == 0.0
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import importlib
+import random
+from datetime import date, timedelta
+
+
+def test_prioritize_batch_matches_prioritize(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    waste = importlib.import_module("waste_reduction_agent")
+
+    today = date.today()
+    dates = [
+        None, "", "  ", "2026-02-30", "0001-01-01", "garbage",
+        "Jan 20 2026", "2026/03/01", " 2026-01-16 ", "2025-12-31T23:00:00+05:00",
+        *((today + timedelta(days=d)).isoformat() for d in (-2, 0, 3, 5, 5, 6, 40)),
+    ]
+    names = ["Milk", " spinach ", "", "RICE", None, "eggs"]
+    rng = random.Random(0)
+    for _ in range(50):
+        inventory = [
+            {"ingredient": rng.choice(names), "expiry_date": rng.choice(dates)}
+            for _ in range(rng.randint(0, 40))
+        ]
+        assert waste.prioritize_batch(inventory, 5) == waste.prioritize(inventory, 5)
+
+
+class _FakeLLM:
+    def __init__(self):
+        self.prompts = []
+
+    def invoke(self, messages):
+        self.prompts.append(messages[0].content)
+        return type("Reply", (), {"content": "enhanced plan"})()
+
+
+def test_plan_is_rendered_without_the_llm(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    waste = importlib.import_module("waste_reduction_agent")
+    fake = _FakeLLM()
+    monkeypatch.setattr(waste, "llm", fake)
+
+    today = date.today()
+    plan = waste.prioritize_batch([
+        {"ingredient": "Spinach", "expiry_date": (today + timedelta(days=1)).isoformat()},
+        {"ingredient": "chicken breasts", "expiry_date": (today - timedelta(days=1)).isoformat()},
+        {"ingredient": "milk", "expiry_date": (today + timedelta(days=2)).isoformat()},
+        {"ingredient": "rice", "expiry_date": None},
+        {"ingredient": "green beans", "expiry_date": (today + timedelta(days=9)).isoformat()},
+    ], 5)
+    text = waste.make_plan_text(plan, "Italian", 30, mode="template")
+    assert fake.prompts == []
+
+    use_first, actions, mini_plan = text.split("\n\n")
+    assert use_first.splitlines() == [
+        "USE-FIRST (next 3 items):",
+        f"- chicken breasts (expired {(today - timedelta(days=1)).isoformat()}, 1 day ago)",
+        f"- spinach (expires {(today + timedelta(days=1)).isoformat()}, 1 day left)",
+        f"- milk (expires {(today + timedelta(days=2)).isoformat()}, 2 days left)",
+    ]
+    tips = dict(line[2:].split(": ", 1) for line in actions.splitlines()[1:])
+    assert tips["spinach"].startswith("wrap in a dry paper towel")
+    assert tips["green beans"].startswith("keep in the crisper drawer")
+    assert "past the date" in tips["chicken breasts"]
+    # expired items are not cooked
+    assert mini_plan.splitlines()[1:] == [
+        "Day 1: Cook an Italian dish (under 30 min) with spinach.",
+        "Day 2: Cook an Italian dish (under 30 min) with milk.",
+    ]
+
+    assert waste.make_plan_text(plan, "Italian", 30, mode="enhanced") == "enhanced plan"
+    assert text in fake.prompts[0]
+
+
+def test_storage_keys_match_after_canonicalization(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    waste = importlib.import_module("waste_reduction_agent")
+
+    for category, keys, _ in waste.STORAGE_TIPS:
+        for key in keys:
+            assert waste.storage_category(key) == category, key
+    assert waste.storage_category("Chickpeas") == "pantry"
+    assert waste.storage_category("canned chickpeas") == "pantry"
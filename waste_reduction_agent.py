@@ -1,19 +1,28 @@
+import math
 import os
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from datetime import date
 
+import numpy as np
 import pandas as pd
 from dotenv import load_dotenv
 from pydantic import BaseModel, Field
 
-from langchain_openai import ChatOpenAI
 from langchain_core.messages import SystemMessage
 
 from google.adk import Agent
 
+from src.recipe_agent.data.ingredients import canonical_key
+from src.recipe_agent.llm import chat_model
+
 load_dotenv()
 
-llm = ChatOpenAI(
+# "template": make_plan_text renders the plan locally (no LLM call);
+# "enhanced": the LLM rewrites the rendered plan
+PLAN_MODE = os.getenv("WASTE_PLAN_MODE", "template")
+
+# same gateway (rate limits, retries, coalescing) as the recipe graph
+llm = chat_model(
     model=os.getenv("OPENAI_MODEL", "gpt-4o-mini"),
     api_key=os.getenv("OPENAI_API_KEY"),
     temperature=0,
@@ -86,7 +95,201 @@ def prioritize(inventory: List[Dict[str, Any]], days_threshold: int) -> Dict[str
     non_urgent.sort(key=lambda x: x["days_left"])
     return {"urgent": urgent, "non_urgent": non_urgent, "unknown_expiry": unknown}
 
-def make_plan_text(plan: Dict[str, Any], cuisine: Optional[str], max_time: Optional[int]) -> str:
+# dates the vectorized path parses itself; anything else goes through parse_date
+_ISO_DATE = r"\d{4}-\d{2}-\d{2}"
+
+def prioritize_batch(
+    inventory: List[Dict[str, Any]], days_threshold: int, today: Optional[date] = None
+) -> Dict[str, Any]:
+    """
+    Same result as `prioritize`, computed column-wise for large inventories
+    (thousands of lines from store systems): YYYY-MM-DD dates are parsed in one
+    vectorized step, days_left is one array subtraction, and each group is
+    ordered with a stable argsort. Other date formats fall back to parse_date.
+    """
+    today = today or date.today()
+    names = pd.Series([item.get("ingredient") or "" for item in inventory], dtype=object).str.strip().str.lower()
+    raw = pd.Series([item.get("expiry_date") for item in inventory], dtype=object)
+
+    iso = raw.str.fullmatch(_ISO_DATE).fillna(False).to_numpy(dtype=bool)
+    expiry = pd.to_datetime(raw.where(iso), format="%Y-%m-%d", errors="coerce").to_numpy().astype("datetime64[D]")
+    for i in np.flatnonzero(~iso & (raw.str.strip().str.len() > 0).fillna(False).to_numpy(dtype=bool)):
+        parsed = parse_date(raw.iat[i])
+        if parsed is not None:
+            expiry[i] = np.datetime64(parsed, "D")
+
+    named = (names != "").to_numpy()
+    known = ~np.isnat(expiry)
+    days_left = (expiry - np.datetime64(today, "D")).astype(np.int64)
+    urgent = days_left <= days_threshold
+
+    def rows(mask: np.ndarray) -> List[Dict[str, Any]]:
+        idx = np.flatnonzero(mask)
+        idx = idx[np.argsort(days_left[idx], kind="stable")]
+        return [
+            {"ingredient": ing, "expiry_date": exp, "days_left": left}
+            for ing, exp, left in zip(
+                names.to_numpy()[idx].tolist(),
+                np.datetime_as_string(expiry[idx], unit="D").tolist(),
+                days_left[idx].tolist(),
+            )
+        ]
+
+    return {
+        "urgent": rows(named & known & urgent),
+        "non_urgent": rows(named & known & ~urgent),
+        "unknown_expiry": [{"ingredient": ing} for ing in names[named & ~known].tolist()],
+    }
+
+# (category, canonical ingredient keys, storage + prep tip); keys are matched
+# against the whole name, then its trailing words ("green bean", "bean")
+STORAGE_TIPS: List[Tuple[str, Tuple[str, ...], str]] = [
+    ("leafy greens", (
+        "spinach", "lettuce", "kale", "arugula", "rocket", "chard", "cabbage", "bok choy", "watercress",
+        "green", "herb", "basil", "parsley", "cilantro", "coriander", "mint", "dill",
+    ), "wrap in a dry paper towel inside a loose bag in the crisper; wilt into soups, omelettes or pesto before they turn slimy"),
+    ("berries", (
+        "berry", "strawberry", "blueberry", "raspberry", "blackberry", "grape", "cherry",
+    ), "keep unwashed in a single layer and rinse just before eating; freeze on a tray for smoothies once soft"),
+    ("fruit", (
+        "apple", "banana", "pear", "peach", "plum", "nectarine", "mango", "orange", "lemon", "lime",
+        "kiwi", "avocado", "melon", "pineapple",
+    ), "refrigerate once ripe, away from vegetables; bake, stew or freeze overripe fruit (peel bananas first)"),
+    ("vegetables", (
+        "tomato", "pepper", "bell pepper", "zucchini", "courgette", "broccoli", "cauliflower", "carrot",
+        "cucumber", "mushroom", "eggplant", "aubergine", "asparagus", "celery", "corn", "pea", "green bean",
+        "radish", "beet", "squash", "pumpkin", "leek",
+    ), "keep in the crisper drawer (tomatoes on the counter until ripe); roast, stir-fry or blanch and freeze what you can't eat in time"),
+    ("roots and alliums", (
+        "onion", "spring onion", "garlic", "potato", "sweet potato", "shallot", "ginger",
+    ), "keep in a cool, dark, dry place outside the fridge, onions apart from potatoes; use sprouting ones first"),
+    ("dairy", (
+        "milk", "cream", "sour cream", "yogurt", "cheese", "butter", "kefir", "ricotta",
+    ), "keep at the back of the fridge, not in the door; turn milk into sauces or pancakes and grate and freeze hard cheese"),
+    ("eggs", ("egg",), "keep in the carton on a fridge shelf; hard-boil them, or whisk and freeze them, before the date"),
+    ("meat", (
+        "chicken", "beef", "pork", "lamb", "turkey", "sausage", "bacon", "ham", "mince", "steak",
+    ), "keep sealed on the bottom shelf; cook it or freeze it in meal-sized portions by the use-by date"),
+    ("seafood", (
+        "fish", "salmon", "tuna", "cod", "shrimp", "prawn", "mussel", "crab",
+    ), "keep in the coldest part of the fridge and cook within a day, or freeze it right away"),
+    ("plant proteins", (
+        "tofu", "tempeh", "hummus",
+    ), "keep opened tofu covered in water in the fridge (change it daily); freeze it for a firmer texture"),
+    ("bread", (
+        "bread", "tortilla", "bun", "bagel", "baguette", "pita", "croissant",
+    ), "keep in a bread bag at room temperature; slice and freeze, and toast stale bread into croutons or crumbs"),
+    ("leftovers", (
+        "leftover", "cooked rice", "soup", "stew", "sauce",
+    ), "cool quickly and refrigerate in shallow sealed containers; eat within 3-4 days or freeze"),
+    ("pantry", (
+        "rice", "pasta", "noodle", "flour", "oat", "lentil", "chickpeas", "quinoa", "cereal", "peanut butter",
+    ), "keep airtight in a cool, dry cupboard and open the oldest pack first"),
+]
+DEFAULT_STORAGE_TIP = "keep it sealed as the label says and plan it into the next meals"
+
+_TIPS = {category: tip for category, _, tip in STORAGE_TIPS}
+_CATEGORY_OF = {canonical_key(key): category for category, keys, _ in STORAGE_TIPS for key in keys}
+
+# ingredients named per line before "and N more"
+_MAX_LISTED = 6
+# ingredients per day in the mini plan
+_MAX_PER_DAY = 4
+
+
+def storage_category(ingredient: str) -> Optional[str]:
+    words = canonical_key(ingredient).split()
+    # longest trailing phrase first: "sweet potato" before "potato"
+    for i in range(len(words)):
+        category = _CATEGORY_OF.get(" ".join(words[i:]))
+        if category is not None:
+            return category
+    for word in reversed(words):
+        if word in _CATEGORY_OF:
+            return _CATEGORY_OF[word]
+    return None
+
+
+def _listing(names: List[str]) -> str:
+    shown = ", ".join(names[:_MAX_LISTED])
+    rest = len(names) - _MAX_LISTED
+    return f"{shown} and {rest} more" if rest > 0 else shown
+
+
+def _days(n: int) -> str:
+    return f"{n} day" if n == 1 else f"{n} days"
+
+
+def _expiry(row: Dict[str, Any]) -> str:
+    left = row["days_left"]
+    if left < 0:
+        return f"expired {row['expiry_date']}, {_days(-left)} ago"
+    if left == 0:
+        return f"expires {row['expiry_date']}, today"
+    return f"expires {row['expiry_date']}, {_days(left)} left"
+
+
+def render_plan_text(plan: Dict[str, Any], cuisine: Optional[str], max_time: Optional[int]) -> str:
+    """
+    USE-FIRST / ACTIONS / 2-DAY MINI PLAN from the prioritized inventory,
+    without an LLM call. Only ingredients from `plan` are mentioned.
+    """
+    urgent, unknown, later = plan["urgent"], plan["unknown_expiry"], plan["non_urgent"]
+    lines = [f"USE-FIRST (next {len(urgent)} items):"]
+    lines += [f"- {row['ingredient']} ({_expiry(row)})" for row in urgent]
+    if not urgent:
+        lines.append("- Nothing is close to expiring.")
+
+    # storage tips per category, urgent items first
+    lines += ["", "ACTIONS (storage + prep):"]
+    expired = [row["ingredient"] for row in urgent if row["days_left"] < 0]
+    if expired:
+        lines.append(f"- {_listing(expired)}: past the date; check look and smell, and discard anything spoiled.")
+    by_category: Dict[Optional[str], List[str]] = {}
+    for row in [row for row in urgent if row["days_left"] >= 0] + unknown + later:
+        names = by_category.setdefault(storage_category(row["ingredient"]), [])
+        if row["ingredient"] not in names:
+            names.append(row["ingredient"])
+    for category, names in by_category.items():
+        lines.append(f"- {_listing(names)}: {_TIPS.get(category, DEFAULT_STORAGE_TIP)}.")
+    if not by_category:
+        lines.append("- Nothing to store.")
+    if unknown:
+        lines.append(f"- {_listing([row['ingredient'] for row in unknown])}: no expiry date given; check the labels and add them to the plan.")
+
+    # soonest-expiring first (expired items are not planned), split over the
+    # two days; then undated items, then the rest
+    usable = [row for row in urgent if row["days_left"] >= 0]
+    queue = list(dict.fromkeys(row["ingredient"] for row in usable + unknown + later))
+    per_day = min(_MAX_PER_DAY, max(1, math.ceil(len(usable) / 2)))
+    if cuisine:
+        dish = f"{'an' if cuisine[0].lower() in 'aeiou' else 'a'} {cuisine} dish"
+    else:
+        dish = "a dish"
+    if max_time:
+        dish += f" (under {max_time} min)"
+    day1, day2 = queue[:per_day], queue[per_day:2 * per_day]
+    lines += [
+        "",
+        "2-DAY MINI PLAN:",
+        f"Day 1: Cook {dish} with {', '.join(day1)}." if day1 else "Day 1: Nothing needs using up.",
+        f"Day 2: Cook {dish} with {', '.join(day2)}." if day2 else "Day 2: Eat the leftovers from Day 1.",
+    ]
+    rest = [row["ingredient"] for row in usable][2 * per_day:]
+    if rest:
+        lines.append(f"Freeze or preserve what won't be cooked in time: {_listing(rest)}.")
+    return "\n".join(lines)
+
+
+def make_plan_text(
+    plan: Dict[str, Any], cuisine: Optional[str], max_time: Optional[int], mode: str = PLAN_MODE
+) -> str:
+    """
+    The rendered plan; in "enhanced" mode the LLM rewrites it.
+    """
+    draft = render_plan_text(plan, cuisine, max_time)
+    if mode != "enhanced":
+        return draft
     prompt = f"""
 You are a waste-reduction assistant. Create an actionable plan to reduce food waste.
 
@@ -114,6 +317,9 @@ Day 1: ...
 Day 2: ...
 
 Do NOT invent ingredients not in inventory.
+
+Start from this draft and improve it:
+{draft}
 """
     resp = llm.invoke([SystemMessage(content=prompt)])
     return resp.content
@@ -132,7 +338,7 @@ def waste_reduction_tool(user_message: str) -> str:
             "'spinach expiring 2026-01-16, milk 2026-01-18, rice (no date)'."
         )
 
-    plan = prioritize(inventory, extracted.days_threshold)
+    plan = prioritize_batch(inventory, extracted.days_threshold)
     return make_plan_text(plan, extracted.cuisine_preference, extracted.max_cooking_time)
 
 